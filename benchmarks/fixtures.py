@@ -0,0 +1,86 @@
+"""
+HTML fixtures for the benchmarks.
+
+Recorded pages saved into benchmarks/fixtures/ (reel_*.html, page_*.html) are
+used as-is. The synthetic generators below fill in the standard sizes so the
+suite runs on a fresh checkout without network access; their markup mimics a
+Facebook reel page (meta tags, JSON-LD, many large inline JSON scripts).
+"""
+from __future__ import annotations
+
+import glob
+import json
+import os
+import random
+from typing import Dict, List
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Approximate target sizes in bytes
+SIZES = {
+    "small": 20_000,
+    "typical": 400_000,
+    "large": 4_000_000,
+}
+
+def _filler_script(rng: random.Random, n: int) -> str:
+    blob = {
+        "require": [["ScheduledServerJS", "handle", None, [{"__bbox": {"id": rng.randrange(10**15), "i": n}}]]],
+        "define": [[f"Module{n}_{rng.randrange(10**6)}", [], {"v": "x" * rng.randrange(50, 400)}, rng.randrange(10**4)]],
+    }
+    return f'<script type="application/json" data-sjs>{json.dumps(blob)}</script>'
+
+def reel_html(size: str = "typical", reel_id: str = "7086752381438446", seed: int = 0) -> str:
+    rng = random.Random(f"{seed}-{reel_id}-{size}")
+    head = f"""<!DOCTYPE html><html lang="en"><head><meta charset="utf-8" />
+<title>Formula 1 | Facebook</title>
+<meta property="og:title" content="Donuts ❌ Slo-mo-nuts ✔️" />
+<meta property="og:image" content="https://scontent.xx.fbcdn.net/v/t15.5256-10/{reel_id}.jpg" />
+<meta property="og:url" content="https://www.facebook.com/reel/{reel_id}/" />
+<script type="application/ld+json">{json.dumps({"@type": "VideoObject", "uploadDate": "2023-11-30T04:59:00+00:00", "author": {"name": "Formula1"}})}</script>
+</head><body><div id="mount"><span>186K plays</span><div>4.8K likes</div><div>88 comments</div><div>365 shares</div>"""
+    tail = f"""<script>{{"page_name":"Formula1","music_title":"F1 · Original audio","playable_duration":"17.74 sec"}}</script>
+</div></body></html>"""
+    parts: List[str] = [head]
+    total = len(head) + len(tail)
+    n = 0
+    while total < SIZES[size]:
+        chunk = _filler_script(rng, n) if n % 3 else f"<div class=\"x{n}\"><p>Suggested reel {n}</p></div>"
+        parts.append(chunk)
+        total += len(chunk)
+        n += 1
+    parts.append(tail)
+    return "".join(parts)
+
+def page_html(size: str = "typical", reels: int = 25, seed: int = 0) -> str:
+    rng = random.Random(f"{seed}-page-{size}")
+    ids = [str(10**15 + rng.randrange(10**15)) for _ in range(reels)]
+    anchors = "".join(f'<a href="/Formula1/reel/{i}/?s=page&amp;ref=tab">Reel</a>' for i in ids)
+    body = reel_html(size, reel_id=ids[0], seed=seed)
+    return body.replace("<div id=\"mount\">", f"<div id=\"mount\">{anchors}", 1)
+
+def load_corpus(kind: str) -> Dict[str, str]:
+    """
+    Return {name: html} for `kind` ("reel" or "page"): recorded fixtures first,
+    then one synthetic fixture per standard size.
+    """
+    corpus: Dict[str, str] = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, f"{kind}_*.html"))):
+        with open(path, "r", encoding="utf-8") as f:
+            corpus[os.path.splitext(os.path.basename(path))[0]] = f.read()
+    gen = reel_html if kind == "reel" else page_html
+    for size in SIZES:
+        corpus.setdefault(f"{kind}_{size}", gen(size))
+    return corpus
+
+def write_fixtures() -> None:
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    for kind, gen in (("reel", reel_html), ("page", page_html)):
+        for size in SIZES:
+            path = os.path.join(FIXTURES_DIR, f"{kind}_{size}.html")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(gen(size))
+            print(f"wrote {path}")
+
+if __name__ == "__main__":
+    write_fixtures()
@@ -0,0 +1,303 @@
+"""
+Benchmark suite for the scraper's hot paths.
+
+    python benchmarks/run_benchmarks.py                 # everything
+    python benchmarks/run_benchmarks.py --only parse    # parse|links|dates|records|export|scrape|startup
+    python benchmarks/run_benchmarks.py --json results.json
+
+Reports parse throughput (pages/s, MB/s) and peak traced memory per fixture,
+date normalization throughput (per value and batched), memory held per parsed record
+(dicts vs ReelRecord), export time per output format, and end-to-end scrape_page throughput against
+a local stub server at several concurrency levels.
+The startup bench times `import main` in a fresh interpreter and exits non-zero if
+it pulls in any of LAZY_MODULES, which are only imported when a run needs them.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+sys.path.insert(0, HERE)
+
+from fixtures import load_corpus  # noqa: E402
+from stub_server import start_stub_server  # noqa: E402
+
+# Imported on first use only; `import main` must not load any of them
+LAZY_MODULES = ("pandas", "numpy", "pyarrow", "openpyxl", "bs4", "lxml", "tqdm", "dateutil", "httpx", "asyncio")
+
+def measure(fn: Callable[[], Any], min_time: float = 1.0, max_runs: int = 200) -> Dict[str, float]:
+    """
+    Call `fn` repeatedly for at least `min_time` seconds; then once more under
+    tracemalloc for the peak allocation.
+    """
+    runs = 0
+    started = time.perf_counter()
+    while runs < max_runs:
+        fn()
+        runs += 1
+        if time.perf_counter() - started >= min_time:
+            break
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"runs": runs, "secPerRun": elapsed / runs, "peakMB": peak / 1e6}
+
+def bench_parse(min_time: float) -> List[Dict[str, Any]]:
+    from extractors.reel_parser import parse_reel_html
+
+    rows = []
+    for name, html in load_corpus("reel").items():
+        mb = len(html.encode("utf-8")) / 1e6
+        for engine in ("bs4", "lxml"):
+            m = measure(lambda: parse_reel_html(html, "https://www.facebook.com/reel/1/", engine=engine), min_time)
+            rows.append({
+                "bench": "parse_reel_html",
+                "fixture": name,
+                "engine": engine,
+                "sizeMB": round(mb, 3),
+                "pagesPerSec": round(1 / m["secPerRun"], 2),
+                "MBPerSec": round(mb / m["secPerRun"], 2),
+                "peakMB": round(m["peakMB"], 2),
+            })
+    return rows
+
+def bench_links(min_time: float) -> List[Dict[str, Any]]:
+    from main import find_reel_links_from_page_html
+
+    rows = []
+    for name, html in load_corpus("page").items():
+        mb = len(html.encode("utf-8")) / 1e6
+        m = measure(lambda: find_reel_links_from_page_html("https://www.facebook.com/Formula1", html, None), min_time)
+        rows.append({
+            "bench": "find_reel_links_from_page_html",
+            "fixture": name,
+            "sizeMB": round(mb, 3),
+            "pagesPerSec": round(1 / m["secPerRun"], 2),
+            "MBPerSec": round(mb / m["secPerRun"], 2),
+            "peakMB": round(m["peakMB"], 2),
+        })
+    return rows
+
+def bench_dates(n_values: int) -> List[Dict[str, Any]]:
+    from datetime import datetime, timedelta
+
+    from extractors import utils_date
+
+    start = datetime(2020, 1, 1)
+    rows = []
+    for fmt in ("%Y-%m-%dT%H:%M:%S", "%d %b %Y %H:%M"):
+        values = [(start + timedelta(minutes=7 * i)).strftime(fmt) for i in range(n_values)]
+        modes: Dict[str, Callable[[], Any]] = {
+            "single": lambda: [utils_date.normalize_datetime(v) for v in values],
+            "batch": lambda: utils_date.normalize_datetime_series(values),
+        }
+        for mode, fn in modes.items():
+            # Cold cache: every value is parsed once, as in a fresh re-normalization job
+            utils_date._normalize_cached.cache_clear()
+            m = measure(fn, min_time=0, max_runs=1)
+            rows.append({
+                "bench": "normalize_datetime",
+                "format": fmt,
+                "mode": mode,
+                "values": n_values,
+                "sec": round(m["secPerRun"], 3),
+                "valuesPerSec": round(n_values / m["secPerRun"]),
+            })
+    return rows
+
+def _sample_records(n: int) -> List[Any]:
+    from extractors.record import ReelRecord
+
+    with open(os.path.join(HERE, "..", "data", "output_sample.json"), "r", encoding="utf-8") as f:
+        base = json.load(f)
+    records = []
+    for i in range(n):
+        r = dict(base[i % len(base)])
+        r["reelId"] = str(10**15 + i)
+        records.append(ReelRecord.from_dict(r))
+    return records
+
+def bench_export(n_records: int) -> List[Dict[str, Any]]:
+    from outputs.exporter import Exporter
+
+    exporter = Exporter()
+    records = _sample_records(n_records)
+    writers: Dict[str, Callable[[str], None]] = {
+        "json": lambda p: exporter.to_json(records, p),
+        "ndjson": lambda p: exporter.to_ndjson(records, p),
+        "csv": lambda p: exporter.to_csv(records, p),
+        "excel": lambda p: exporter.to_excel(records, p),
+        "html": lambda p: exporter.to_html(records, p),
+        "parquet": lambda p: exporter.to_parquet(records, p),
+        "feather": lambda p: exporter.to_feather(records, p),
+    }
+    extensions = {"excel": "xlsx"}
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt, write in writers.items():
+            path = os.path.join(tmp, f"out.{extensions.get(fmt, fmt)}")
+            try:
+                m = measure(lambda: write(path), min_time=0, max_runs=1)
+            except Exception as e:  # optional engines (openpyxl, pyarrow) may be missing
+                rows.append({"bench": "export", "format": fmt, "records": n_records, "error": str(e)})
+                continue
+            rows.append({
+                "bench": "export",
+                "format": fmt,
+                "records": n_records,
+                "sec": round(m["secPerRun"], 3),
+                "recordsPerSec": round(n_records / m["secPerRun"]),
+                "fileMB": round(os.path.getsize(path) / 1e6, 2),
+                "peakMB": round(m["peakMB"], 2),
+            })
+    return rows
+
+def bench_scrape(levels: List[int], reels: int, latency: float) -> List[Dict[str, Any]]:
+    from fixtures import page_html, reel_html
+    from main import build_session, scrape_page
+
+    server, base = start_stub_server(page_html("small", reels=reels), reel_html("typical"), latency=latency)
+    rows = []
+    try:
+        for level in levels:
+            session = build_session(pool_size=max(10, level), max_per_host=level)
+            started = time.perf_counter()
+            records = scrape_page(session, f"{base}/Formula1", None, concurrency=level, progress=False)
+            elapsed = time.perf_counter() - started
+            rows.append({
+                "bench": "scrape_page",
+                "concurrency": level,
+                "reels": len(records),
+                "latencySec": latency,
+                "sec": round(elapsed, 3),
+                "reelsPerSec": round(len(records) / elapsed, 2),
+            })
+    finally:
+        server.shutdown()
+    return rows
+
+def bench_startup(runs: int) -> List[Dict[str, Any]]:
+    src = os.path.join(HERE, "..", "src")
+    probe = (
+        "import sys, time; t = time.perf_counter(); import main; "
+        "print((time.perf_counter() - t) * 1000); "
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    import_ms: List[float] = []
+    total_ms: List[float] = []
+    eager = ""
+    for _ in range(runs):
+        started = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", probe], cwd=src, capture_output=True, text=True, check=True).stdout
+        total_ms.append((time.perf_counter() - started) * 1000)
+        lines = out.splitlines()
+        import_ms.append(float(lines[0]))
+        eager = lines[1] if len(lines) > 1 else ""
+    return [{
+        "bench": "startup",
+        "runs": runs,
+        "importMainMs": round(statistics.median(import_ms), 1),
+        "processMs": round(statistics.median(total_ms), 1),
+        "eagerImports": eager or "-",
+    }]
+
+def bench_records(n_records: int) -> List[Dict[str, Any]]:
+    """
+    Memory held by `n_records` parsed reels as the pre-ReelRecord dicts (every value a
+    string) and as ReelRecords. "fresh" builds every record from newly decoded strings,
+    as parsing does; "shared" reuses the same value strings for every record, so only
+    the containers and converted numbers count.
+    """
+    from extractors.record import FIELDS, ReelRecord
+
+    with open(os.path.join(HERE, "..", "data", "output_sample.json"), "r", encoding="utf-8") as f:
+        base = [{k: None if r.get(k) is None else str(r[k]) for k in FIELDS} for r in json.load(f)]
+    # Values only; the keys are the same constant strings in every parsed dict
+    texts = [json.dumps(list(r.values())) for r in base]
+    builders: Dict[str, Dict[str, Callable[[int], Any]]] = {
+        "fresh": {
+            "dict": lambda i: dict(zip(FIELDS, json.loads(texts[i % len(texts)]))),
+            "ReelRecord": lambda i: ReelRecord.from_dict(dict(zip(FIELDS, json.loads(texts[i % len(texts)])))),
+        },
+        "shared": {
+            "dict": lambda i: dict(base[i % len(base)]),
+            "ReelRecord": lambda i: ReelRecord.from_dict(base[i % len(base)]),
+        },
+    }
+    rows = []
+    for strings, kinds in builders.items():
+        for kind, build in kinds.items():
+            started = time.perf_counter()
+            held = [build(i) for i in range(n_records)]
+            elapsed = time.perf_counter() - started
+            del held
+            tracemalloc.start()
+            held = [build(i) for i in range(n_records)]
+            size, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            rows.append({
+                "bench": "records",
+                "strings": strings,
+                "kind": kind,
+                "records": len(held),
+                "bytesPerRecord": round(size / n_records),
+                "sec": round(elapsed, 3),
+            })
+            del held
+    return rows
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Facebook Reel Scraper benchmarks")
+    parser.add_argument("--only", choices=["parse", "links", "dates", "records", "export", "scrape", "startup"], action="append", help="Run a subset")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Minimum seconds per parse measurement")
+    parser.add_argument("--records", type=int, default=20_000, help="Records per export benchmark")
+    parser.add_argument("--dates", type=int, default=50_000, help="Values per date normalization benchmark")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="scrape_page concurrency levels")
+    parser.add_argument("--reels", type=int, default=32, help="Reels on the stub page")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub server latency per response (seconds)")
+    parser.add_argument("--startup-runs", type=int, default=10, help="Interpreter launches for the startup benchmark")
+    parser.add_argument("--json", default=None, help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    selected = set(args.only or ["parse", "links", "dates", "records", "export", "scrape", "startup"])
+    results: List[Dict[str, Any]] = []
+    if "parse" in selected:
+        results += bench_parse(args.min_time)
+    if "links" in selected:
+        results += bench_links(args.min_time)
+    if "dates" in selected:
+        results += bench_dates(args.dates)
+    if "records" in selected:
+        results += bench_records(args.records)
+    if "export" in selected:
+        results += bench_export(args.records)
+    if "scrape" in selected:
+        results += bench_scrape(args.concurrency, args.reels, args.latency)
+    if "startup" in selected:
+        results += bench_startup(args.startup_runs)
+
+    for row in results:
+        print("  ".join(f"{k}={v}" for k, v in row.items()))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    eager = [r["eagerImports"] for r in results if r["bench"] == "startup" and r["eagerImports"] != "-"]
+    if eager:
+        sys.exit(f"import main loaded lazily imported modules: {', '.join(eager)}")
+
+if __name__ == "__main__":
+    main()
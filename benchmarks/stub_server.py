@@ -0,0 +1,42 @@
+"""
+Local HTTP server that serves fixture pages, so end-to-end scrape_page
+throughput can be measured without network access.
+  /<page>              -> page HTML with reel links
+  /<page>/reel/<id>/   -> reel HTML
+"""
+from __future__ import annotations
+
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+REEL_PATH_RE = re.compile(r"/reel/(\d+)")
+
+def start_stub_server(page: str, reel: str, latency: float = 0.05) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Start the server on a free port in a daemon thread; returns (server, base_url).
+    `latency` is added to every response to stand in for network round trips.
+    """
+    page_body = page.encode("utf-8")
+    reel_body = reel.encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args: object) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            if latency:
+                time.sleep(latency)
+            body = reel_body if REEL_PATH_RE.search(self.path) else page_body
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
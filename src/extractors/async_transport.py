@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+from extractors.http_cache import ResponseCache, cache_lookup, response_text
+from extractors.metrics import METRICS
+from extractors.proxy_manager import ProxyEntry, ProxyPool
+from extractors.rate_limiter import (
+    RETRY_STATUSES,
+    THROTTLE_STATUSES,
+    AdaptiveRateLimiter,
+    RetryPolicy,
+    parse_retry_after,
+)
+from extractors.streaming import CHUNK_BYTES, BodyReader, StopCheck
+
+try:
+    import httpx
+except ImportError:  # optional dependency, only needed for transport "httpx"
+    httpx = None
+
+try:
+    import h2  # noqa: F401
+
+    _HAS_H2 = True
+except ImportError:
+    _HAS_H2 = False
+
+DEFAULT_HEADERS = {
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Cache-Control": "no-cache",
+    "Pragma": "no-cache",
+}
+
+class AsyncFetcher:
+    """
+    asyncio counterpart of fetch_url built on httpx:
+      - HTTP/2 multiplexing (when `h2` is installed) and keep-alive connection reuse
+      - one client per proxy, each with its own connection limits
+      - per-host and global in-flight caps
+      - gzip/deflate/brotli decoding (brotli when the `brotli` package is installed)
+      - streamed bodies, capped at `max_body_bytes` and optionally cut short (see `fetch`)
+    Cache, rate limiter and retry policy are the same objects the requests path uses.
+    """
+
+    def __init__(
+        self,
+        user_agent: str,
+        timeout: float = 20,
+        http2: bool = True,
+        max_connections: int = 100,
+        max_keepalive: int = 20,
+        max_per_host: int = 4,
+        max_in_flight: Optional[int] = None,
+        cache: Optional[ResponseCache] = None,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        proxy: Optional[str] = None,
+        max_body_bytes: Optional[int] = None,
+        early_stop: bool = False,
+    ):
+        if httpx is None:
+            raise RuntimeError("The httpx transport requires httpx (pip install 'httpx[http2,brotli]')")
+        if http2 and not _HAS_H2:
+            logging.warning("h2 is not installed; the httpx transport falls back to HTTP/1.1")
+            http2 = False
+        self.timeout = timeout
+        self.max_per_host = max(1, int(max_per_host))
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.http2 = http2
+        self.max_body_bytes = max_body_bytes
+        self.early_stop = early_stop  # read by the scrapers when choosing a StopCheck
+        self.headers = dict(DEFAULT_HEADERS, **{"User-Agent": user_agent})
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive)
+        self._host_sems: Dict[str, asyncio.Semaphore] = {}
+        self._budget = asyncio.Semaphore(int(max_in_flight)) if max_in_flight else None
+        self._clients: List[Any] = []  # every client made by `client`, closed by `aclose`
+        self._client = self.client(proxy)
+        # Set from ProxyManager.build_pool with `client` as the factory to rotate exits
+        self.proxy_pool: Optional[ProxyPool] = None
+
+    def client(self, proxy: Optional[str] = None) -> Any:
+        """
+        A pooled AsyncClient; each proxy gets its own so connections are reused per exit.
+        The fetcher owns it and closes it in `aclose`.
+        """
+        client = httpx.AsyncClient(
+            http2=self.http2,
+            headers=self.headers,
+            limits=self.limits,
+            timeout=self.timeout,
+            proxy=proxy,
+            follow_redirects=True,
+        )
+        self._clients.append(client)
+        return client
+
+    def _host_sem(self, url: str) -> asyncio.Semaphore:
+        host = (urlparse(url).hostname or "").lower()
+        sem = self._host_sems.get(host)
+        if sem is None:
+            sem = self._host_sems[host] = asyncio.Semaphore(self.max_per_host)
+        return sem
+
+    async def _get(
+        self, client: Any, url: str, headers: Optional[Dict[str, str]], make_stop: Optional[Callable[[], StopCheck]]
+    ) -> Any:
+        async with client.stream("GET", url, headers=headers) as resp:
+            resp.headers_at = time.monotonic()
+            stop = make_stop() if make_stop and resp.status_code < 300 else None
+            reader = BodyReader(resp.headers.get("Content-Type"), self.max_body_bytes, stop)
+            loop = asyncio.get_running_loop()
+            async for chunk in resp.aiter_bytes(CHUNK_BYTES):
+                if not chunk:
+                    continue
+                # A stop check may parse what has arrived so far; keep that off the event loop
+                done = await loop.run_in_executor(None, reader.feed, chunk) if stop else reader.feed(chunk)
+                if done:
+                    break
+            resp.body = reader.finish()
+            resp.wire_bytes = resp.num_bytes_downloaded
+        return resp
+
+    async def _send(
+        self, url: str, headers: Optional[Dict[str, str]], make_stop: Optional[Callable[[], StopCheck]] = None
+    ) -> Optional[Any]:
+        proxy: Optional[ProxyEntry] = self.proxy_pool.acquire() if self.proxy_pool else None
+        client = proxy.session if proxy else self._client
+        METRICS.inc("http.requests")
+        started = time.monotonic()
+        status: Optional[int] = None
+        error = False
+        budgeted = False
+        try:
+            async with self._host_sem(url):
+                if self._budget:
+                    await self._budget.acquire()
+                    budgeted = True
+                started = time.monotonic()
+                try:
+                    resp = await self._get(client, url, headers, make_stop)
+                except httpx.HTTPError as e:
+                    METRICS.inc("http.request_errors")
+                    logging.warning("Request error for %s: %s", url, e)
+                    error = True
+                    return None
+            status = resp.status_code
+            total = time.monotonic() - started
+            ttfb = min(resp.headers_at - started, total)
+            METRICS.observe("http.ttfb", ttfb)
+            METRICS.observe("http.download", total - ttfb)
+            METRICS.inc("http.bytes_downloaded", resp.wire_bytes)
+            if status >= 400:
+                METRICS.inc("http.errors")
+            return resp
+        finally:
+            # Also reached on cancellation (e.g. a page's task being cancelled mid-body)
+            if budgeted:
+                self._budget.release()  # type: ignore[union-attr]
+            if self.proxy_pool and proxy:
+                if error or (status is not None and status >= 400 and status not in self.proxy_pool.NEUTRAL_STATUSES):
+                    METRICS.inc("proxy.errors")
+                self.proxy_pool.release(proxy, time.monotonic() - started, status=status, error=error)
+
+    async def _send_with_retries(
+        self, url: str, headers: Optional[Dict[str, str]], make_stop: Optional[Callable[[], StopCheck]] = None
+    ) -> Optional[Any]:
+        attempts = 1 + (self.retry_policy.max_retries if self.retry_policy else 0)
+        resp = None
+        for attempt in range(attempts):
+            if self.rate_limiter:
+                wait = self.rate_limiter.reserve(url)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            resp = await self._send(url, headers, make_stop)
+            status = resp.status_code if resp is not None else None
+            retry_after = parse_retry_after(resp.headers.get("Retry-After")) if resp is not None else None
+            if status in THROTTLE_STATUSES:
+                METRICS.inc("http.throttled")
+            if self.rate_limiter and status is not None:
+                if status in THROTTLE_STATUSES:
+                    self.rate_limiter.on_throttle(url, retry_after)
+                elif status < 400:
+                    self.rate_limiter.on_success(url)
+            if status is not None and status not in RETRY_STATUSES:
+                return resp
+            if self.retry_policy is None or attempt == attempts - 1:
+                break
+            delay = self.retry_policy.delay(attempt, retry_after)
+            METRICS.inc("http.retries")
+            logging.info("Retrying %s in %.1fs (%s, attempt %d/%d)", url, delay, status or "error", attempt + 2, attempts)
+            await asyncio.sleep(delay)
+        return resp
+
+    async def fetch(self, url: str, make_stop: Optional[Callable[[], StopCheck]] = None) -> Optional[str]:
+        """
+        Body of `url`, or None on failure. With `make_stop`, each download gets a fresh
+        StopCheck that may end it early; the text received up to that point is returned.
+        """
+        started = time.perf_counter()
+        try:
+            return await self._fetch(url, make_stop)
+        finally:
+            METRICS.observe("fetch", time.perf_counter() - started)
+
+    async def _fetch(self, url: str, make_stop: Optional[Callable[[], StopCheck]] = None) -> Optional[str]:
+        cache = self.cache
+        loop = asyncio.get_running_loop()
+        # The cache does SQLite and zlib work on multi-MB bodies under its lock; keep it off the event loop
+        lookup = await loop.run_in_executor(None, cache_lookup, cache, url) if cache else cache_lookup(None, url)
+        if lookup.done:
+            return lookup.text
+        resp = await self._send_with_retries(url, lookup.headers, make_stop)
+        if cache:
+            return await loop.run_in_executor(None, response_text, cache, url, lookup, resp)
+        return response_text(None, url, lookup, resp)
+
+    async def aclose(self) -> None:
+        """
+        Close the default client and every per-proxy client; one failing to close does not
+        leave the others open.
+        """
+        clients, self._clients = self._clients, []
+        results = await asyncio.gather(*(c.aclose() for c in clients), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logging.debug("Closing an httpx client failed: %s", result)
+
+    async def __aenter__(self) -> "AsyncFetcher":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.aclose()
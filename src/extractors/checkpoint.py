@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from extractors.record import ReelRecord
+
+class Checkpoint:
+    """
+    Append-only JSONL log of a batch run, used by --resume.
+    Lines are one of:
+      {"input": <path>}                        header, written when a run starts
+      {"reel": <url>, "page": <url>, "record": {...}}
+                                               a reel that was fetched (or restored) and
+                                               emitted for that page
+      {"target": <url>, "reels": [<url>, ...]} a page whose reels are all done
+    Each line is flushed as it is written, so a crash loses at most the line in flight;
+    a torn last line is cut off when the log is resumed.
+    """
+
+    def __init__(self, path: str, input_path: str, resume: bool = False):
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self.path = path
+        self.input_path = input_path
+        self.reels: Dict[str, ReelRecord] = {}
+        self.targets: Dict[str, List[str]] = {}
+        # (page, reel url) pairs already emitted; the page is None in logs from older versions
+        self.emitted: Set[Tuple[Optional[str], str]] = set()
+        self.resumed = 0  # records emitted before the resume
+        self._lock = threading.Lock()
+        if resume:
+            self._load()
+        else:
+            self._reset()
+
+    def _reset(self) -> None:
+        self._f = open(self.path, "w", encoding="utf-8")
+        self._append({"input": self.input_path})
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            logging.info("No checkpoint at %s, starting from scratch", self.path)
+            self._reset()
+            return
+        end = 0  # offset just past the last complete line
+        with open(self.path, "rb") as f:
+            for n, raw in enumerate(f):
+                try:
+                    entry = json.loads(raw) if raw.endswith(b"\n") else None
+                except ValueError:
+                    entry = None
+                if entry is None:
+                    break  # torn last line from a crash
+                end += len(raw)
+                if n == 0 and entry.get("input") != self.input_path:
+                    logging.warning("Checkpoint %s belongs to %s, starting from scratch", self.path, entry.get("input"))
+                    self.reels, self.targets, self.emitted = {}, {}, set()
+                    self._reset()
+                    return
+                if "reel" in entry:
+                    self.reels[entry["reel"]] = ReelRecord.from_dict(entry["record"])
+                    self.emitted.add((entry.get("page"), entry["reel"]))
+                elif "target" in entry:
+                    self.targets[entry["target"]] = entry.get("reels") or []
+        if end < os.path.getsize(self.path):
+            # Appending after a torn line would glue the next entry onto it
+            logging.info("Dropping a torn last line from %s", self.path)
+            with open(self.path, "r+b") as f:
+                f.truncate(end)
+        self.resumed = len(self.emitted)
+        logging.info("Resuming: %d pages and %d reels already done", len(self.targets), len(self.reels))
+        self._f = open(self.path, "a", encoding="utf-8")
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._f.write(line)
+            self._f.flush()
+
+    def record(self, url: str) -> Optional[ReelRecord]:
+        return self.reels.get(url)
+
+    def was_emitted(self, page_url: str, url: str) -> bool:
+        """
+        True if the reel was already emitted for `page_url` before the resume.
+        """
+        return (page_url, url) in self.emitted or (None, url) in self.emitted
+
+    def add_reel(self, url: str, record: ReelRecord, page_url: Optional[str] = None) -> None:
+        self._append({"reel": url, "page": page_url, "record": record.to_dict()})
+        with self._lock:
+            self.reels[url] = record
+            self.emitted.add((page_url, url))
+
+    def is_target_done(self, url: str) -> bool:
+        return url in self.targets
+
+    def target_records(self, url: str) -> List[ReelRecord]:
+        return [self.reels[u] for u in self.targets.get(url, []) if u in self.reels]
+
+    def complete_target(self, url: str, reel_urls: List[str]) -> None:
+        self._append({"target": url, "reels": reel_urls})
+        with self._lock:
+            self.targets[url] = reel_urls
+
+    def close(self, remove: bool = False) -> None:
+        with self._lock:
+            if not self._f.closed:
+                self._f.close()
+        if remove and os.path.exists(self.path):
+            os.remove(self.path)
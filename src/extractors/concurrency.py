@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+from urllib.parse import urlparse
+
+class HostLimiter:
+    """
+    Caps the number of in-flight requests per host and, optionally, in total.
+    A single instance is shared by every worker thread that uses the same session,
+    so page discovery and reel fetches draw from the same request budget.
+    """
+
+    def __init__(self, per_host: int = 4, total: Optional[int] = None):
+        self.per_host = max(1, int(per_host))
+        self.total = max(1, int(total)) if total else None
+        self._lock = threading.Lock()
+        self._sems: Dict[str, threading.BoundedSemaphore] = {}
+        self._budget = threading.BoundedSemaphore(self.total) if self.total else None
+
+    def _sem(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            sem = self._sems.get(host)
+            if sem is None:
+                sem = threading.BoundedSemaphore(self.per_host)
+                self._sems[host] = sem
+            return sem
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        host = (urlparse(url).hostname or "").lower()
+        sem = self._sem(host)
+        # Take the host slot first so callers queued on a busy host don't hold global budget
+        sem.acquire()
+        try:
+            if self._budget:
+                self._budget.acquire()
+            try:
+                yield
+            finally:
+                if self._budget:
+                    self._budget.release()
+        finally:
+            sem.release()
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import json
+import re
+from collections import deque
+from html import unescape
+from typing import Deque, List, Optional, Set, Union
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+
+from extractors.frontier import ReelFrontier, reel_key
+from extractors.metrics import METRICS
+from extractors.work_queue import QueueFrontier
+
+END_CURSOR_RE = re.compile(r'"end_cursor"\s*:\s*"((?:[^"\\]|\\.)+)"')
+HAS_NEXT_RE = re.compile(r'"has_next_page"\s*:\s*(true|false)')
+REL_NEXT_RE = re.compile(r'<(?:a|link)\b[^>]*\brel=["\']next["\'][^>]*>', re.IGNORECASE)
+HREF_RE = re.compile(r'\bhref=["\']([^"\']+)["\']', re.IGNORECASE)
+
+def reels_tab_url(page_url: str) -> str:
+    """
+    URL of the page's Reels tab, e.g. https://www.facebook.com/Formula1/reels/.
+    """
+    parts = urlparse(page_url)
+    path = parts.path.rstrip("/")
+    if path.endswith("/profile.php"):
+        query = dict(parse_qsl(parts.query))
+        query["sk"] = "reels_tab"
+        return urlunparse(parts._replace(query=urlencode(query), fragment=""))
+    if not path.endswith("/reels"):
+        path += "/reels"
+    return urlunparse(parts._replace(path=path + "/", query="", fragment=""))
+
+def _with_cursor(url: str, cursor: str) -> str:
+    parts = urlparse(url)
+    query = dict(parse_qsl(parts.query))
+    query["cursor"] = cursor
+    return urlunparse(parts._replace(query=urlencode(query), fragment=""))
+
+def next_page_urls(url: str, html: str, cursors: bool = False) -> List[str]:
+    """
+    Continuation URLs found in a page response: rel="next" links and, with `cursors`,
+    GraphQL-style `end_cursor` values (unless every `has_next_page` says false) as a
+    ?cursor= query on `url`. Facebook's page HTML ignores that query, so cursor URLs
+    mostly refetch the same page; they are only followed when asked for.
+    """
+    out: List[str] = []
+    flags = HAS_NEXT_RE.findall(html) if cursors else []
+    if cursors and (not flags or "true" in flags):
+        for m in END_CURSOR_RE.finditer(html):
+            try:
+                cursor = json.loads('"' + m.group(1) + '"')
+            except ValueError:
+                continue
+            out.append(_with_cursor(url, cursor))
+    for m in REL_NEXT_RE.finditer(html):
+        href = HREF_RE.search(m.group(0))
+        if href:
+            out.append(urljoin(url, unescape(href.group(1))))
+    return list(dict.fromkeys(out))
+
+class ReelDiscovery:
+    """
+    Crawl state for one page's reel discovery, independent of the HTTP client: hands out
+    the next URL to fetch (the page, its Reels tab, then continuation links) and turns
+    each response into the reel links that are new to this page (and, with a frontier,
+    to the run). Stops once `max_reels` links have been handed out, `max_pages` URLs were
+    fetched, a continuation turns up nothing new, or `stop()` is called.
+    """
+
+    def __init__(
+        self,
+        page_url: str,
+        max_reels: Optional[int] = None,
+        frontier: Optional[Union[ReelFrontier, QueueFrontier]] = None,
+        max_pages: int = 50,
+        follow_reels_tab: bool = True,
+        follow_cursors: bool = False,
+    ):
+        self.page_url = page_url
+        self.follow_cursors = follow_cursors
+        self.max_reels = None if max_reels is None else max(0, int(max_reels))
+        self.frontier = frontier
+        self.max_pages = max(1, int(max_pages))
+        self.found = 0
+        self.fetched = 0
+        self.stopped = False
+        self._keys: Set[str] = set()
+        self._visited: Set[str] = set()
+        self._queue: Deque[str] = deque([page_url])
+        if follow_reels_tab:
+            self._queue.append(reels_tab_url(page_url))
+
+    @property
+    def done(self) -> bool:
+        return self.stopped or (self.max_reels is not None and self.found >= self.max_reels)
+
+    @property
+    def remaining(self) -> Optional[int]:
+        """
+        Reels still to hand out before `max_reels` is reached, or None without a cap.
+        """
+        return None if self.max_reels is None else max(0, self.max_reels - self.found)
+
+    def known(self, key: str) -> bool:
+        """
+        True if the reel with this `reel_key` was already seen on this page or claimed for the run.
+        """
+        return key in self._keys or (self.frontier is not None and key in self.frontier)
+
+    def stop(self) -> None:
+        self.stopped = True
+
+    def next_url(self) -> Optional[str]:
+        while self._queue and not self.done and self.fetched < self.max_pages:
+            url = self._queue.popleft()
+            if url in self._visited:
+                continue
+            self._visited.add(url)
+            self.fetched += 1
+            return url
+        return None
+
+    def feed(self, url: str, html: Optional[str], links: List[str]) -> List[str]:
+        """
+        Record the response for `url` (None if the fetch failed) and the reel links found in it;
+        returns the links to fetch, in page order.
+        """
+        METRICS.inc("discovery.pages")
+        fresh: List[str] = []
+        for link in links:
+            key = reel_key(link)
+            if key not in self._keys:
+                self._keys.add(key)
+                fresh.append(link)
+        remaining = self.remaining
+        if self.frontier is not None:
+            new = self.frontier.claim(self.page_url, fresh, remaining)
+        else:
+            new = fresh if remaining is None else fresh[:remaining]
+        self.found += len(new)
+        METRICS.inc("discovery.reels", len(new))
+        # Only keep paginating while responses still turn up reels we have not seen
+        if html and fresh and not self.done:
+            self._queue.extend(next_page_urls(url, html, self.follow_cursors))
+        return new
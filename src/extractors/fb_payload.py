@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# (key path, converter) candidates per record field, most reliable first.
+# Paths follow the GraphQL payloads Facebook embeds in reel pages, e.g.
+#   "unified_reactors":{"count":4800}  "comment_count":{"total_count":88}
+Path = Tuple[str, ...]
+
+def _count(v: Any) -> Optional[str]:
+    if isinstance(v, bool):
+        return None
+    if isinstance(v, (int, float)):
+        return str(int(v))
+    return None
+
+def _seconds_from_ms(v: Any) -> Optional[str]:
+    if isinstance(v, (int, float)) and not isinstance(v, bool):
+        return f"{v / 1000:.2f}".rstrip("0").rstrip(".")
+    return None
+
+def _seconds(v: Any) -> Optional[str]:
+    if isinstance(v, (int, float)) and not isinstance(v, bool):
+        return f"{v:.2f}".rstrip("0").rstrip(".")
+    return None
+
+def _epoch(v: Any) -> Optional[str]:
+    # Naive UTC, the form normalize_datetime expects
+    if isinstance(v, (int, float)) and not isinstance(v, bool) and v > 0:
+        return datetime.fromtimestamp(v, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    return None
+
+def _text(v: Any) -> Optional[str]:
+    return (v.strip() or None) if isinstance(v, str) else None
+
+FIELD_PATHS: Dict[str, List[Tuple[Path, Callable[[Any], Optional[str]]]]] = {
+    "playCount": [(("play_count",), _count), (("video_view_count",), _count), (("view_count",), _count)],
+    "likesCount": [
+        (("unified_reactors", "count"), _count),
+        (("reaction_count", "count"), _count),
+        (("likers", "count"), _count),
+    ],
+    "commentsCount": [
+        (("comment_count", "total_count"), _count),
+        (("total_comment_count",), _count),
+        (("comments", "total_count"), _count),
+    ],
+    "sharesCount": [(("share_count", "count"), _count), (("share_count",), _count)],
+    "reelDuration": [(("playable_duration_in_ms",), _seconds_from_ms), (("length_in_second",), _seconds)],
+    "reelDateTime": [(("creation_time",), _epoch), (("publish_time",), _epoch)],
+    "music": [(("music_title",), _text), (("track_title",), _text), (("audio_title",), _text)],
+}
+
+_DECODER = json.JSONDecoder()
+
+def _value_after_key(text: str, key: str, start: int = 0) -> Tuple[Any, int]:
+    """
+    Find the next `"key":` at or after `start` and decode only its value.
+    Returns (value, position after the key) or (None, -1) when the key is absent.
+    """
+    needle = f'"{key}"'
+    pos = text.find(needle, start)
+    while pos != -1:
+        i = pos + len(needle)
+        while i < len(text) and text[i] in " \t\r\n":
+            i += 1
+        if i < len(text) and text[i] == ":":
+            i += 1
+            while i < len(text) and text[i] in " \t\r\n":
+                i += 1
+            try:
+                value, _ = _DECODER.raw_decode(text, i)
+                return value, pos + len(needle)
+            except ValueError:
+                pass
+        pos = text.find(needle, pos + len(needle))
+    return None, -1
+
+def _lookup(text: str, path: Sequence[str], convert: Callable[[Any], Optional[str]]) -> Optional[str]:
+    start = 0
+    while True:
+        value, start = _value_after_key(text, path[0], start)
+        if start == -1:
+            return None
+        for key in path[1:]:
+            value = value.get(key) if isinstance(value, dict) else None
+        result = convert(value)
+        if result is not None:
+            return result
+
+def extract_embedded_fields(scripts: Sequence[str], reel_id: Optional[str] = None) -> Dict[str, str]:
+    """
+    Read reel fields from the JSON payloads embedded in <script> bodies.
+    Only scripts that mention `reel_id` are considered when it is known, so
+    numbers from suggested reels on the same page are not picked up. Instead
+    of decoding whole multi-MB blobs, each key is located with str.find and
+    only the value that follows it is decoded.
+    """
+    payloads = [s for s in scripts if reel_id and reel_id in s] if reel_id else list(scripts)
+    found: Dict[str, str] = {}
+    for field, candidates in FIELD_PATHS.items():
+        for text in payloads:
+            for path, convert in candidates:
+                if f'"{path[0]}"' not in text:
+                    continue
+                value = _lookup(text, path, convert)
+                if value is not None:
+                    found[field] = value
+                    break
+            if field in found:
+                break
+    return found
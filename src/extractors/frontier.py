@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import threading
+from typing import Dict, List, Optional
+
+from extractors.reel_parser import REEL_ID_RE
+
+def reel_key(url: str) -> str:
+    """
+    Canonical identity of a reel link: its reelId, or the URL without query/fragment.
+    """
+    m = REEL_ID_RE.search(url)
+    if m:
+        return m.group(1)
+    return url.split("#", 1)[0].split("?", 1)[0].rstrip("/")
+
+class ReelFrontier:
+    """
+    Run-wide set of reels already scheduled for fetching, shared by every page.
+    Each reel is fetched once, by the first page that claims it; every page that
+    links to it is kept as a referrer.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._owner: Dict[str, str] = {}
+        self._referrers: Dict[str, List[str]] = {}
+
+    def claim(self, page_url: str, links: List[str], limit: Optional[int] = None) -> List[str]:
+        """
+        Return the links from `links` that no other page has claimed yet, at most `limit` of them.
+        Reels already claimed elsewhere only record `page_url` as a referrer.
+        """
+        limit = None if limit is None else max(0, int(limit))
+        claimed: List[str] = []
+        with self._lock:
+            for link in links:
+                key = reel_key(link)
+                if key not in self._owner:
+                    if limit is not None and len(claimed) >= limit:
+                        continue
+                    self._owner[key] = page_url
+                    self._referrers[key] = []
+                    claimed.append(link)
+                refs = self._referrers[key]
+                if page_url not in refs:
+                    refs.append(page_url)
+        return claimed
+
+    def referrers(self, url_or_id: str) -> List[str]:
+        with self._lock:
+            return list(self._referrers.get(reel_key(url_or_id), ()))
+
+    def mapping(self) -> Dict[str, List[str]]:
+        with self._lock:
+            return {k: list(v) for k, v in self._referrers.items()}
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._owner
+
+    def __len__(self) -> int:
+        return len(self._owner)
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, NamedTuple, Optional
+
+from extractors.metrics import METRICS
+
+class CachedResponse(NamedTuple):
+    text: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+class ResponseCache:
+    """
+    Persistent HTTP response cache backed by a single SQLite file.
+      - keyed by URL, bodies stored zlib-compressed
+      - entries younger than `ttl_sec` are served without touching the network
+      - stale entries are revalidated with If-None-Match / If-Modified-Since
+      - once the stored bodies exceed `max_bytes`, least recently used entries are evicted
+      - `cache_only` serves whatever is cached (any age) and never goes to the network
+    """
+
+    def __init__(self, path: str, ttl_sec: float = 3600, max_bytes: int = 512 * 1024 * 1024, cache_only: bool = False):
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self.path = path
+        self.ttl_sec = float(ttl_sec)
+        self.max_bytes = int(max_bytes)
+        self.cache_only = cache_only
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+        self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, stored_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+        body, etag, last_modified, stored_at = row
+        return CachedResponse(zlib.decompress(body).decode("utf-8"), etag, last_modified, stored_at)
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return time.time() - entry.stored_at < self.ttl_sec
+
+    @staticmethod
+    def validators(entry: CachedResponse) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def put(self, url: str, text: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        body = zlib.compress(text.encode("utf-8"), 6)
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (url, body, size, etag, last_modified, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, body, len(body), etag, last_modified, now, now),
+            )
+            self._total += len(body) - (old[0] if old else 0)
+            self._evict()
+            self._conn.commit()
+
+    def refresh(self, url: str) -> None:
+        # The origin answered 304: the stored body is valid for another TTL
+        now = time.time()
+        with self._lock:
+            self._conn.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        # Caller holds the lock
+        while self._total > self.max_bytes:
+            rows = self._conn.execute("SELECT url, size FROM responses ORDER BY accessed_at LIMIT 64").fetchall()
+            if not rows:
+                self._total = 0
+                return
+            for url, size in rows:
+                self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+                self._total -= size
+                if self._total <= self.max_bytes:
+                    break
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+class CacheLookup(NamedTuple):
+    done: bool  # no request is needed; `text` is the answer (a hit, or a miss in cache-only mode)
+    text: Optional[str]
+    entry: Optional[CachedResponse]  # stale entry to revalidate
+    headers: Optional[Dict[str, str]]  # its validators, for a conditional request
+
+def cache_lookup(cache: Optional[ResponseCache], url: str) -> CacheLookup:
+    """
+    First half of a cached fetch, shared by both transports: serve `url` from `cache`
+    when it is fresh (or the cache is cache-only), else say how to request it.
+    """
+    if cache is None:
+        return CacheLookup(False, None, None, None)
+    cached = cache.get(url)
+    if cached and (cache.cache_only or cache.is_fresh(cached)):
+        METRICS.inc("cache.hits")
+        return CacheLookup(True, cached.text, cached, None)
+    METRICS.inc("cache.misses")
+    if cache.cache_only:
+        logging.debug("Cache miss (cache-only mode) for %s", url)
+        return CacheLookup(True, None, None, None)
+    return CacheLookup(False, None, cached, cache.validators(cached) if cached else None)
+
+def response_text(cache: Optional[ResponseCache], url: str, lookup: CacheLookup, resp: Any) -> Optional[str]:
+    """
+    Second half: the text to use for `resp` (a requests or httpx response carrying the
+    streamed `body`), or None on failure. A 304 serves and refreshes the stale entry;
+    whole bodies are stored, so later (e.g. cache-only) runs never parse a cut-off page.
+    """
+    if resp is None:
+        return None
+    if resp.status_code == 304 and cache and lookup.entry:
+        METRICS.inc("cache.revalidated")
+        cache.refresh(url)
+        return lookup.entry.text
+    if resp.status_code >= 400:
+        logging.warning("HTTP %s for %s", resp.status_code, url)
+        return None
+    body = resp.body
+    if body.reason == "limit":
+        logging.warning("Body of %s exceeds %d bytes, keeping only the first part", url, body.nbytes)
+    if cache and body.complete:
+        cache.put(url, body.text, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+    return body.text
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Tuple
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS: Tuple[float, ...] = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class Histogram:
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        idx = len(BUCKETS)
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                idx = i
+                break
+        self.counts[idx] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def merge(self, counts: List[int], total: float, maximum: float) -> None:
+        for i, c in enumerate(counts):
+            self.counts[i] += c
+        self.count += sum(counts)
+        self.sum += total
+        self.max = max(self.max, maximum)
+
+    def quantile(self, q: float) -> float:
+        # Upper bound of the bucket holding the q-th observation (capped at the observed max)
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return min(BUCKETS[i], self.max) if i < len(BUCKETS) else self.max
+        return self.max
+
+class Metrics:
+    """
+    Thread-safe counters and per-stage latency histograms for one run.
+    Stages used by the scraper:
+      fetch               whole fetch_url call (cache lookups, retries, pacing included)
+      http.ttfb           request sent -> response headers (DNS, proxy connect, TLS, server time)
+      http.download       response headers -> body read and decoded
+      parse               parse_reel_html
+      normalize_datetime  normalize_datetime
+      export.<format>     writing the output file
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.counters: Dict[str, float] = {}
+        self.stages: Dict[str, Histogram] = {}
+        self.started = time.time()
+
+    def inc(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            hist = self.stages.get(stage)
+            if hist is None:
+                hist = self.stages[stage] = Histogram()
+            hist.observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters, self.stages = {}, {}
+            self.started = time.time()
+
+    def drain(self) -> Dict[str, Any]:
+        """
+        Return and reset the raw data; used to ship metrics out of worker processes.
+        """
+        with self._lock:
+            data = {
+                "counters": self.counters,
+                "stages": {k: (h.counts, h.sum, h.max) for k, h in self.stages.items()},
+            }
+            self.counters, self.stages = {}, {}
+        return data
+
+    def merge(self, data: Dict[str, Any]) -> None:
+        with self._lock:
+            for name, value in data.get("counters", {}).items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            for stage, (counts, total, maximum) in data.get("stages", {}).items():
+                hist = self.stages.get(stage)
+                if hist is None:
+                    hist = self.stages[stage] = Histogram()
+                hist.merge(counts, total, maximum)
+
+    def summary(self, **extra: Any) -> Dict[str, Any]:
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": h.count,
+                    "totalSec": round(h.sum, 4),
+                    "avgSec": round(h.sum / h.count, 4) if h.count else 0.0,
+                    "p50Sec": round(h.quantile(0.5), 4),
+                    "p95Sec": round(h.quantile(0.95), 4),
+                    "maxSec": round(h.max, 4),
+                }
+                for stage, h in sorted(self.stages.items())
+            }
+            counters = dict(sorted(self.counters.items()))
+        out: Dict[str, Any] = {
+            "startedAt": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "durationSec": round(time.time() - self.started, 3),
+            "counters": counters,
+            "stages": stages,
+        }
+        out.update(extra)
+        return out
+
+    def to_prometheus(self, prefix: str = "fb_reel_scraper") -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                metric = f"{prefix}_{_prom_name(name)}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value:g}")
+            metric = f"{prefix}_stage_seconds"
+            if self.stages:
+                lines.append(f"# TYPE {metric} histogram")
+            for stage, h in sorted(self.stages.items()):
+                cumulative = 0
+                for bound, c in zip(list(BUCKETS) + [float("inf")], h.counts):
+                    cumulative += c
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f'{metric}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{stage="{stage}"}} {h.sum:.6f}')
+                lines.append(f'{metric}_count{{stage="{stage}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+    def write_summary(self, path: str, **extra: Any) -> None:
+        _ensure_parent(path)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(**extra), f, ensure_ascii=False, indent=2)
+
+    def write_prometheus(self, path: str) -> None:
+        # Write then rename so a scraper never reads a half-written file
+        _ensure_parent(path)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+
+    def serve_prometheus(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+        Serve the Prometheus text format at /metrics from a daemon thread, on localhost
+        unless another `host` is given.
+        """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = metrics.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+def _prom_name(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+def _ensure_parent(path: str) -> None:
+    d = os.path.dirname(path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+
+# Process-wide registry; worker processes drain theirs back to the parent
+METRICS = Metrics()
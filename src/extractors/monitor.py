@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from extractors.record import INT_FIELDS, ReelRecord
+from extractors.utils_date import local_timestamp
+
+# Counters tracked over time; a delta line carries only those that changed
+COUNTERS = INT_FIELDS
+
+class ReelState(NamedTuple):
+    reel_id: str
+    url: str
+    page: str  # input page the reel was discovered on
+    first_seen: float
+    published_at: Optional[float]  # epoch seconds, None until a poll finds the date
+    polled_at: Optional[float]
+    next_poll: Optional[float]  # None once the reel is retired
+    unchanged: int  # consecutive polls without a counter change
+    counters: Dict[str, Optional[int]]
+
+class PollSchedule:
+    """
+    When to poll a reel next. The interval grows with the reel's age (`age_factor` x age,
+    within [min_sec, max_sec]) and doubles for each poll in a row that found no change
+    (up to 16x, still capped at max_sec). Reels older than `retire_after_sec` are no
+    longer polled.
+    """
+
+    def __init__(
+        self,
+        min_sec: float = 900,
+        max_sec: float = 86400,
+        age_factor: float = 0.1,
+        retire_after_sec: Optional[float] = 30 * 86400,
+    ):
+        self.min_sec = float(min_sec)
+        self.max_sec = max(self.min_sec, float(max_sec))
+        self.age_factor = float(age_factor)
+        self.retire_after_sec = None if retire_after_sec is None else float(retire_after_sec)
+
+    def next_poll(self, state: ReelState, now: float) -> Optional[float]:
+        age = max(0.0, now - (state.published_at if state.published_at is not None else state.first_seen))
+        if self.retire_after_sec is not None and age > self.retire_after_sec:
+            return None
+        interval = min(max(age * self.age_factor, self.min_sec), self.max_sec)
+        return now + min(interval * 2 ** min(state.unchanged, 4), self.max_sec)
+
+def counter_changes(counters: Dict[str, Optional[int]], record: ReelRecord) -> Dict[str, int]:
+    """
+    Counters of `record` that differ from `counters`; counters missing from the record
+    (not found on this poll) are not changes.
+    """
+    out: Dict[str, int] = {}
+    for field in COUNTERS:
+        value = record[field]
+        if value is not None and value != counters.get(field):
+            out[field] = value
+    return out
+
+def published_at(record: ReelRecord) -> Optional[float]:
+    return local_timestamp(record.reelDateTime or record.reelDate)
+
+class MonitorStore:
+    """
+    State of a monitor run: every tracked reel and input page, held in memory and mirrored
+    to one SQLite file so a restarted monitor carries on where it stopped. Due reels come
+    off a heap ordered by `next_poll`; changes are written on `commit`, once per cycle.
+    """
+
+    def __init__(self, path: str):
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self.path = path
+        self.reels: Dict[str, ReelState] = {}
+        self.pages: Dict[str, float] = {}  # page url -> next discovery time
+        self._heap: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS reels (
+                reel_id TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                page TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                published_at REAL,
+                polled_at REAL,
+                next_poll REAL,
+                unchanged INTEGER NOT NULL DEFAULT 0,
+                counters TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, next_poll REAL NOT NULL)")
+        self._conn.commit()
+        for row in self._conn.execute("SELECT * FROM reels"):
+            state = ReelState(*row[:8], json.loads(row[8]))
+            self.reels[state.reel_id] = state
+            if state.next_poll is not None:
+                self._heap.append((state.next_poll, state.reel_id))
+        heapq.heapify(self._heap)
+        self.pages = dict(self._conn.execute("SELECT url, next_poll FROM pages").fetchall())
+
+    def active(self) -> int:
+        """
+        Number of reels still being polled.
+        """
+        with self._lock:
+            return sum(1 for s in self.reels.values() if s.next_poll is not None)
+
+    def add(self, reel_id: str, url: str, page: str, now: float) -> bool:
+        """
+        Start tracking a reel, due right away; False if it is already tracked.
+        """
+        with self._lock:
+            if reel_id in self.reels:
+                return False
+        self.put(ReelState(reel_id, url, page, now, None, None, now, 0, {}))
+        return True
+
+    def put(self, state: ReelState) -> None:
+        with self._lock:
+            self.reels[state.reel_id] = state
+            if state.next_poll is not None:
+                heapq.heappush(self._heap, (state.next_poll, state.reel_id))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO reels VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (*state[:8], json.dumps(state.counters)),
+            )
+
+    def _pop_stale(self) -> None:
+        # Heap entries are left behind when a reel is rescheduled; skip those no longer current
+        while self._heap:
+            when, reel_id = self._heap[0]
+            if self.reels[reel_id].next_poll == when:
+                return
+            heapq.heappop(self._heap)
+
+    def due(self, now: float, limit: Optional[int] = None) -> List[ReelState]:
+        """
+        Reels whose next poll is at or before `now`, earliest first, taken off the schedule
+        until they are `put` back.
+        """
+        out: List[ReelState] = []
+        with self._lock:
+            while limit is None or len(out) < limit:
+                self._pop_stale()
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                _, reel_id = heapq.heappop(self._heap)
+                out.append(self.reels[reel_id])
+        return out
+
+    def next_due(self) -> Optional[float]:
+        """
+        Time of the earliest scheduled reel poll or page discovery, None if nothing is scheduled.
+        """
+        with self._lock:
+            self._pop_stale()
+            times = ([self._heap[0][0]] if self._heap else []) + list(self.pages.values())
+        return min(times) if times else None
+
+    def page_due(self, url: str, now: float) -> bool:
+        with self._lock:
+            return self.pages.get(url, 0.0) <= now
+
+    def set_page(self, url: str, next_poll: float) -> None:
+        with self._lock:
+            self.pages[url] = next_poll
+            self._conn.execute("INSERT OR REPLACE INTO pages (url, next_poll) VALUES (?, ?)", (url, next_poll))
+
+    def commit(self) -> None:
+        with self._lock:
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+class DeltaLog:
+    """
+    Append-only NDJSON time series of counter changes, one line per reel and poll that
+    changed anything: {"reelId": ..., "ts": "<UTC time>", "playCount": 186500, ...}.
+    Values are the new totals, so a line lost in a crash does not skew later ones; a
+    reel's first line holds every counter found.
+    """
+
+    def __init__(self, path: str):
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+        self._f = open(path, "a", encoding="utf-8")
+
+    def write(self, reel_id: str, ts: float, changes: Dict[str, Any]) -> None:
+        stamp = datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        line = json.dumps({"reelId": reel_id, "ts": stamp, **changes}, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._f.write(line)
+            self.count += 1
+
+    def flush(self) -> None:
+        with self._lock:
+            self._f.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._f.closed:
+                self._f.close()
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from extractors.metrics import METRICS
+from extractors.record import ReelRecord
+from extractors.reel_parser import parse_reel_html
+from extractors.utils_date import DateWindow, normalize_datetime
+
+def parse_reel_record(html: str, url: str, window: Optional[DateWindow] = None) -> Optional[ReelRecord]:
+    """
+    Parse a reel page and normalize its dates. Returns None if parsing fails.
+    Top-level so it can run inside a worker process. See `parse_reel_html` for `window`.
+    """
+    try:
+        record = parse_reel_html(html, url, window=window)
+        # Enrich with normalized dates if present
+        if record.get("reelDateTime"):
+            record["reelDateTime"] = normalize_datetime(record["reelDateTime"])
+        elif record.get("reelDate"):
+            record["reelDate"] = normalize_datetime(record["reelDate"], date_only=True)
+        return record
+    except Exception as e:
+        logging.debug("Parse failure for %s: %s", url, e)
+        return None
+
+def _init_worker() -> None:
+    # A forked worker starts with a copy of the parent's metrics; start it from zero
+    METRICS.reset()
+
+def _parse_in_worker(
+    html: str, url: str, window: Optional[DateWindow] = None
+) -> Tuple[Optional[ReelRecord], Dict[str, Any]]:
+    # Ship the worker's timings back with the record; the parent merges them
+    record = parse_reel_record(html, url, window)
+    return record, METRICS.drain()
+
+class ParsePool:
+    """
+    Process pool for CPU-bound reel parsing, fed through a bounded queue.
+    `submit` blocks once `max_pending` pages are waiting to be parsed, which
+    stalls the fetchers and keeps the amount of buffered HTML bounded.
+    Worker processes inherit SCRAPER_TZ / SCRAPER_PARSER, so set those first.
+    """
+
+    def __init__(self, workers: int, max_pending: Optional[int] = None):
+        self.workers = max(1, int(workers))
+        self.max_pending = max(1, int(max_pending or self.workers * 2))
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+
+    def submit(self, html: str, url: str, window: Optional[DateWindow] = None) -> "Future[Optional[ReelRecord]]":
+        self._slots.acquire()
+        try:
+            job = self._executor.submit(_parse_in_worker, html, url, window)
+        except Exception:
+            self._slots.release()
+            raise
+        result: "Future[Optional[ReelRecord]]" = Future()
+
+        def done(job: Future) -> None:
+            self._slots.release()
+            try:
+                record, metrics = job.result()
+            except Exception as e:
+                result.set_exception(e)
+                return
+            METRICS.merge(metrics)
+            result.set_result(record)
+
+        job.add_done_callback(done)
+        return result
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "ParsePool":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.shutdown()
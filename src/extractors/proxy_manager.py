@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import base64
+import itertools
 import os
-from typing import Dict, List, Optional, Union
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Union
 
 class ProxyManager:
     """
@@ -37,17 +40,37 @@ class ProxyManager:
             return f"http://{s}"
         return s
 
-    def get_requests_proxies(self) -> Optional[Dict[str, str]]:
-        if not self.raw:
-            return None
-        # Use the first proxy for simplicity; rotate in a more advanced scenario.
-        first = self.raw[0]
-        url = self._to_url(first)
+    @staticmethod
+    def _mapping(url: str) -> Dict[str, str]:
         return {
             "http": url,
-            "https": url.replace("http://", "http://"),  # keep same proxy for https via CONNECT
+            "https": url,  # keep same proxy for https via CONNECT
         }
 
+    def get_requests_proxies(self) -> Optional[Dict[str, str]]:
+        if not self.raw:
+            return None
+        # Single-proxy mapping (first entry); see `build_pool` for rotation.
+        return self._mapping(self._to_url(self.raw[0]))
+
+    def get_all_requests_proxies(self) -> List[Dict[str, str]]:
+        return [self._mapping(self._to_url(p)) for p in self.raw]
+
+    def build_pool(
+        self,
+        session_factory: Callable[[Dict[str, str]], Any],
+        strategy: str = "least_loaded",
+        quarantine_sec: float = 60.0,
+    ) -> Optional["ProxyPool"]:
+        """
+        Build a rotating pool with one pooled session per configured proxy.
+        `session_factory` receives a `requests` proxies mapping and returns a session.
+        """
+        if not self.raw:
+            return None
+        entries = [ProxyEntry(m["http"], session_factory(m)) for m in self.get_all_requests_proxies()]
+        return ProxyPool(entries, strategy=strategy, quarantine_sec=quarantine_sec)
+
     @staticmethod
     def parse_dataimpulse(proxy: str) -> Dict[str, str]:
         """
@@ -85,4 +108,100 @@ class ProxyManager:
     @staticmethod
     def basic_auth_header(username: str, password: str) -> str:
         token = base64.b64encode(f"{username}:{password}".encode()).decode()
-        return f"Basic {token}"
\ No newline at end of file
+        return f"Basic {token}"
+
+class ProxyEntry:
+    """
+    A single proxy exit with its own session and running health counters.
+    """
+
+    def __init__(self, url: str, session: Any):
+        self.url = url
+        self.session = session
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.total_latency = 0.0
+        self.quarantined_until = 0.0
+
+    @property
+    def avg_latency(self) -> float:
+        return self.total_latency / self.requests if self.requests else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else 0.0
+
+    def label(self) -> str:
+        # Never log credentials
+        return self.url.split("://", 1)[-1].rsplit("@", 1)[-1]
+
+class ProxyPool:
+    """
+    Thread-safe proxy rotation with health scoring.
+      - strategy "round_robin" cycles through healthy proxies in order
+      - strategy "least_loaded" picks the proxy with the fewest in-flight requests,
+        breaking ties by error rate then average latency
+    Proxies that fail (timeouts, 403/407/429, 5xx) are quarantined with an
+    exponential backoff on consecutive failures.
+    """
+
+    # Statuses that say nothing about the proxy's health (the content is just missing)
+    NEUTRAL_STATUSES = {404, 410}
+
+    def __init__(self, entries: List[ProxyEntry], strategy: str = "least_loaded", quarantine_sec: float = 60.0):
+        if not entries:
+            raise ValueError("ProxyPool needs at least one proxy")
+        self.entries = entries
+        self.strategy = strategy
+        self.quarantine_sec = float(quarantine_sec)
+        self._lock = threading.Lock()
+        self._rr = itertools.cycle(range(len(entries)))
+
+    def acquire(self) -> ProxyEntry:
+        now = time.monotonic()
+        with self._lock:
+            healthy = [e for e in self.entries if e.quarantined_until <= now]
+            if not healthy:
+                # Everything is quarantined: use the proxy that recovers first rather than stall
+                chosen = min(self.entries, key=lambda e: e.quarantined_until)
+            elif self.strategy == "round_robin":
+                chosen = healthy[0]
+                for _ in range(len(self.entries)):
+                    candidate = self.entries[next(self._rr)]
+                    if candidate.quarantined_until <= now:
+                        chosen = candidate
+                        break
+            else:
+                chosen = min(healthy, key=lambda e: (e.in_flight, e.error_rate, e.avg_latency))
+            chosen.in_flight += 1
+            return chosen
+
+    def release(self, entry: ProxyEntry, latency: float, status: Optional[int] = None, error: bool = False) -> None:
+        failed = error or (status is not None and status >= 400 and status not in self.NEUTRAL_STATUSES)
+        with self._lock:
+            entry.in_flight = max(0, entry.in_flight - 1)
+            entry.requests += 1
+            entry.total_latency += latency
+            if failed:
+                entry.errors += 1
+                entry.consecutive_errors += 1
+                backoff = self.quarantine_sec * (2 ** min(entry.consecutive_errors - 1, 5))
+                entry.quarantined_until = time.monotonic() + backoff
+            else:
+                entry.consecutive_errors = 0
+
+    def stats(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "proxy": e.label(),
+                    "requests": e.requests,
+                    "errors": e.errors,
+                    "avgLatencySec": round(e.avg_latency, 3),
+                    "quarantined": e.quarantined_until > now,
+                }
+                for e in self.entries
+            ]
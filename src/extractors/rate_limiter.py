@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+# Statuses worth retrying; 429/503 also tell the limiter to slow down
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+THROTTLE_STATUSES = {429, 503}
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header (delta-seconds or HTTP-date) into seconds from now.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+class _Bucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket per host with AIMD pacing:
+      - every success adds `increase` requests/sec, up to `max_rate`
+      - a 429/503 multiplies the rate by `decrease`, down to `min_rate`,
+        and honours Retry-After by blocking the host until then
+    `reserve` books a slot and returns how long the caller must wait, so the
+    same limiter can pace threads (`acquire`) and coroutines (asyncio.sleep).
+    """
+
+    def __init__(
+        self,
+        rate: float = 2.0,
+        burst: float = 4.0,
+        min_rate: float = 0.2,
+        max_rate: float = 8.0,
+        increase: float = 0.1,
+        decrease: float = 0.5,
+    ):
+        self.initial_rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self.min_rate = float(min_rate)
+        self.max_rate = max(float(max_rate), self.initial_rate)
+        self.increase = float(increase)
+        self.decrease = float(decrease)
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, _Bucket] = {}
+
+    def _bucket(self, url: str) -> _Bucket:
+        # Caller holds the lock
+        host = (urlparse(url).hostname or "").lower()
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = _Bucket(self.initial_rate, self.burst)
+            self._buckets[host] = bucket
+        return bucket
+
+    def reserve(self, url: str) -> float:
+        now = time.monotonic()
+        with self._lock:
+            b = self._bucket(url)
+            b.tokens = min(self.burst, b.tokens + (now - b.updated) * b.rate)
+            b.updated = now
+            # Tokens may go negative: later callers queue up behind earlier reservations
+            b.tokens -= 1.0
+            wait = 0.0 if b.tokens >= 0 else -b.tokens / b.rate
+            return max(wait, b.blocked_until - now)
+
+    def acquire(self, url: str) -> None:
+        wait = self.reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+
+    def on_success(self, url: str) -> None:
+        with self._lock:
+            b = self._bucket(url)
+            b.rate = min(self.max_rate, b.rate + self.increase)
+
+    def on_throttle(self, url: str, retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            b = self._bucket(url)
+            b.rate = max(self.min_rate, b.rate * self.decrease)
+            if retry_after:
+                b.blocked_until = max(b.blocked_until, time.monotonic() + retry_after)
+
+    def rates(self) -> Dict[str, float]:
+        with self._lock:
+            return {host: round(b.rate, 2) for host, b in self._buckets.items()}
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter, capped at `backoff_max`, and never shorter than
+    the server's Retry-After (which is not capped: the limiter blocks the host that long anyway).
+    """
+
+    def __init__(self, max_retries: int = 3, backoff_base: float = 1.0, backoff_max: float = 30.0):
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base = float(backoff_base)
+        self.backoff_max = float(backoff_max)
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            return max(backoff, retry_after)
+        return backoff
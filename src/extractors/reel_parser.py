@@ -1,10 +1,19 @@
 from __future__ import annotations
 
 import json
+import logging
+import os
 import re
-from typing import Any, Dict, Optional
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
-from bs4 import BeautifulSoup
+from extractors.fb_payload import extract_embedded_fields
+from extractors.metrics import METRICS
+from extractors.record import ReelRecord
+from extractors.utils_date import DateWindow
+
+# lxml.etree once loaded, False if it is not installed; imported on first parse, not at startup
+_lxml_etree: Any = None
 
 META_KEYS = {
     "og:title": "caption",
@@ -24,6 +33,27 @@ SHARES_RE = re.compile(r'(?i)\b([\d,.]+)\s*(shares?)\b')
 DURATION_RE = re.compile(r'(?i)\b([\d.,]+)\s*(s|sec|seconds)\b')
 DATETIME_RE = re.compile(r'(?i)\b(\d{4}-\d{2}-\d{2})(?:[ T](\d{2}:\d{2}(?::\d{2})?))?')
 
+# Single-pass scanners. Each alternative is one of the patterns above; a match
+# never hides the first match of another field, so one sweep finds the same
+# values as running every pattern separately.
+METRIC_SCAN_RE = re.compile(
+    r'(?i)\b([\d,.]+)\s*(?:'
+    r'(?P<playCount>plays|views)'
+    r'|(?P<likesCount>likes?)'
+    r'|(?P<commentsCount>comments?)'
+    r'|(?P<sharesCount>shares?)'
+    r'|(?P<reelDuration>s|sec|seconds)'
+    r')\b'
+)
+# Dates, "page_name" and "music*" JSON fields; the JSON alternatives consume only
+# the opening quote (the rest is lookahead) so nothing inside them is skipped.
+SCRIPT_SCAN_RE = re.compile(
+    r'(?i:\b(?P<day>\d{4}-\d{2}-\d{2})(?:[ T](?P<time>\d{2}:\d{2}(?::\d{2})?))?)'
+    r'|"(?=(?:(?P<page_name>page_name)|music[^"]*)"\s*:\s*"(?P<value>[^"]+)")'
+)
+METRIC_FIELDS = ("playCount", "likesCount", "commentsCount", "sharesCount", "reelDuration")
+SCRIPT_FIELDS = METRIC_FIELDS + ("reelDate", "reelDateTime", "ownerUsername", "music")
+
 def _num(s: str) -> str:
     s = s.replace(",", "").strip()
     # Handle compact forms like 1.2K or 3M
@@ -35,21 +65,120 @@ def _num(s: str) -> str:
     mult = {"k": 1_000, "m": 1_000_000, "b": 1_000_000_000}.get(suf, 1)
     return str(int(n * mult))
 
-def _extract_meta(soup: BeautifulSoup, out: Dict[str, Any]) -> None:
+class _PageParts(NamedTuple):
+    metas: List[Tuple[str, str]]  # (property or name, content)
+    ld_json: List[str]  # bodies of <script type="application/ld+json">
+    body_text: str  # visible text, as BeautifulSoup.get_text(" ", strip=True)
+    scripts: List[str]  # non-empty bodies of every <script>, in document order
+
+# Elements whose text BeautifulSoup.get_text() leaves out
+_NON_TEXT_TAGS = {"script", "style", "template"}
+
+def _lxml() -> Any:
+    global _lxml_etree
+    if _lxml_etree is None:
+        try:
+            from lxml import etree
+        except ImportError:  # optional dependency; the BeautifulSoup path is always available
+            etree = False
+        _lxml_etree = etree
+    return _lxml_etree or None
+
+def _collect_bs4(html: str) -> _PageParts:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    metas: List[Tuple[str, str]] = []
     for tag in soup.find_all("meta"):
         prop = tag.get("property") or tag.get("name")
-        if not prop:
-            continue
+        if prop and tag.get("content"):
+            metas.append((prop, tag["content"]))
+    ld_json = [script.string or "{}" for script in soup.find_all("script", type="application/ld+json")]
+    body_text = soup.get_text(separator=" ", strip=True)
+    scripts = [script.string for script in soup.find_all("script") if script.string]
+    return _PageParts(metas, ld_json, body_text, scripts)
+
+class _LxmlCollector:
+    """
+    lxml parser target: receives SAX-style events from libxml2 and keeps only
+    what the extractors need, so no element tree is ever built.
+    """
+
+    def __init__(self) -> None:
+        self.metas: List[Tuple[str, str]] = []
+        self.ld_json: List[str] = []
+        self.scripts: List[str] = []
+        self.texts: List[str] = []
+        self._skip_depth = 0
+        self._script_type: Optional[str] = None
+        self._buf: List[str] = []
+
+    def _flush(self) -> None:
+        if not self._buf:
+            return
+        chunk = "".join(self._buf)
+        self._buf = []
+        if self._script_type is not None:
+            return  # script bodies are flushed on </script>
+        if self._skip_depth == 0:
+            chunk = chunk.strip()
+            if chunk:
+                self.texts.append(chunk)
+
+    def start(self, tag: str, attrib: Dict[str, str]) -> None:
+        if self._script_type is None:
+            self._flush()
+        if tag == "meta":
+            prop = attrib.get("property") or attrib.get("name")
+            if prop and attrib.get("content"):
+                self.metas.append((prop, attrib["content"]))
+        elif tag == "script":
+            self._script_type = attrib.get("type", "")
+        if tag in _NON_TEXT_TAGS:
+            self._skip_depth += 1
+
+    def end(self, tag: str) -> None:
+        if tag == "script" and self._script_type is not None:
+            body = "".join(self._buf)
+            self._buf = []
+            if self._script_type == "application/ld+json":
+                self.ld_json.append(body or "{}")
+            if body:
+                self.scripts.append(body)
+            self._script_type = None
+        else:
+            self._flush()
+        if tag in _NON_TEXT_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+
+    def data(self, data: str) -> None:
+        self._buf.append(data)
+
+    def comment(self, text: str) -> None:
+        if self._script_type is None:
+            self._flush()
+
+    def close(self) -> _PageParts:
+        self._flush()
+        return _PageParts(self.metas, self.ld_json, " ".join(self.texts), self.scripts)
+
+def _collect_lxml(html: str) -> _PageParts:
+    parser = _lxml().HTMLParser(target=_LxmlCollector(), huge_tree=True)
+    parser.feed(html)
+    return parser.close()
+
+def _extract_meta(metas: List[Tuple[str, str]], out: Dict[str, Any]) -> None:
+    for prop, content in metas:
         prop = prop.strip()
-        if prop in META_KEYS and tag.get("content"):
+        if prop in META_KEYS:
             key = META_KEYS[prop]
-            out.setdefault(key, tag["content"].strip())
+            out.setdefault(key, content.strip())
 
-def _extract_structured_data(soup: BeautifulSoup, out: Dict[str, Any]) -> None:
+def _extract_structured_data(ld_json: List[str], out: Dict[str, Any]) -> None:
     # Parse JSON-LD if present
-    for script in soup.find_all("script", type="application/ld+json"):
+    for body in ld_json:
         try:
-            data = json.loads(script.string or "{}")
+            data = json.loads(body)
         except json.JSONDecodeError:
             continue
         if isinstance(data, dict):
@@ -78,26 +207,42 @@ def _json_to_out(data: Dict[str, Any], out: Dict[str, Any]) -> None:
         out.setdefault("ownerUsername", data["author"].get("name"))
 
 def _scan_text_for_metrics(text: str, out: Dict[str, Any]) -> None:
-    if "playCount" not in out:
-        m = PLAY_COUNT_RE.search(text)
-        if m:
-            out["playCount"] = _num(m.group(1))
-    if "likesCount" not in out:
-        m = LIKES_RE.search(text)
-        if m:
-            out["likesCount"] = _num(m.group(1))
-    if "commentsCount" not in out:
-        m = COMMENTS_RE.search(text)
-        if m:
-            out["commentsCount"] = _num(m.group(1))
-    if "sharesCount" not in out:
-        m = SHARES_RE.search(text)
-        if m:
-            out["sharesCount"] = _num(m.group(1))
-    if "reelDuration" not in out:
-        m = DURATION_RE.search(text)
-        if m:
-            out["reelDuration"] = m.group(1)
+    missing = [k for k in METRIC_FIELDS if k not in out]
+    if not missing:
+        return
+    for m in METRIC_SCAN_RE.finditer(text):
+        key = m.lastgroup
+        if key in out:
+            continue
+        out[key] = m.group(1) if key == "reelDuration" else _num(m.group(1))
+        missing.remove(key)
+        if not missing:
+            return
+
+def _scan_script(text: str, out: Dict[str, Any]) -> None:
+    # Only the first date in a script counts (as reelDateTime when it has a time)
+    date_pending = "reelDateTime" not in out or "reelDate" not in out
+    owner_pending = "ownerUsername" not in out
+    music_pending = "music" not in out
+    if not (date_pending or owner_pending or music_pending):
+        return
+    for m in SCRIPT_SCAN_RE.finditer(text):
+        if m.group("day") is not None:
+            if date_pending:
+                if m.group("time"):
+                    out.setdefault("reelDateTime", f"{m.group('day')} {m.group('time')}")
+                else:
+                    out.setdefault("reelDate", m.group("day"))
+                date_pending = False
+        elif m.group("page_name") is not None:
+            if owner_pending:
+                out["ownerUsername"] = m.group("value")
+                owner_pending = False
+        elif music_pending:
+            out["music"] = m.group("value")
+            music_pending = False
+        if not (date_pending or owner_pending or music_pending):
+            return
 
 def _extract_owner_from_path(url: str) -> Optional[str]:
     # Try to infer owner/page name from path segments
@@ -117,11 +262,31 @@ def _extract_owner_from_path(url: str) -> Optional[str]:
         return None
     return None
 
-def parse_reel_html(html: str, url: str) -> Dict[str, Any]:
+def _collect(html: str, engine: str) -> _PageParts:
+    if engine in ("auto", "lxml") and _lxml() is not None:
+        try:
+            return _collect_lxml(html)
+        except Exception as e:
+            logging.debug("lxml parse failed, falling back to BeautifulSoup: %s", e)
+    elif engine == "lxml":
+        logging.debug("lxml is not installed, falling back to BeautifulSoup")
+    return _collect_bs4(html)
+
+def parse_reel_html(
+    html: str, url: str, engine: Optional[str] = None, window: Optional[DateWindow] = None, metric: str = "parse"
+) -> ReelRecord:
     """
     Best-effort parser that extracts reel metrics and metadata from a single reel HTML page.
+    `engine` is "auto" (lxml when installed), "lxml" or "bs4"; it defaults to the
+    SCRAPER_PARSER environment variable.
+    With a `window`, a reel whose publication time is already known to fall outside it
+    is returned without scanning for metrics (only the fields found so far are set).
+    Fields are collected in a scratch dict and returned as a compact ReelRecord.
+    The parse time is recorded under `metric`.
     """
-    soup = BeautifulSoup(html, "html.parser")
+    started = time.perf_counter()
+    engine = (engine or os.environ.get("SCRAPER_PARSER") or "auto").lower()
+    parts = _collect(html, engine)
     out: Dict[str, Any] = {
         "url": url,
     }
@@ -136,50 +301,32 @@ def parse_reel_html(html: str, url: str) -> Dict[str, Any]:
     if owner:
         out["ownerUsername"] = owner
 
-    _extract_meta(soup, out)
-    _extract_structured_data(soup, out)
+    _extract_meta(parts.metas, out)
+    _extract_structured_data(parts.ld_json, out)
+
+    # Counters, duration, creation time and audio from Facebook's embedded JSON;
+    # more reliable than the text patterns below, which only fill what is left
+    for key, value in extract_embedded_fields(parts.scripts, out.get("reelId")).items():
+        out.setdefault(key, value)
+
+    # Bare dates are left to the record-level check, which compares them by whole day
+    if window is not None and window.position(out.get("reelDateTime")):
+        METRICS.inc("parse.out_of_window")
+        METRICS.observe(metric, time.perf_counter() - started)
+        return ReelRecord.from_dict(out)
 
     # Scan raw text for metrics
-    body_text = soup.get_text(separator=" ", strip=True)
-    _scan_text_for_metrics(body_text, out)
+    _scan_text_for_metrics(parts.body_text, out)
 
-    # Attempt to read publication datetime from data-ft or similar attributes
-    # (Facebook often embeds timestamps in JSON in script tags)
-    for script in soup.find_all("script"):
-        if not script.string:
-            continue
-        text = script.string
-        # search for ISO date
-        m = DATETIME_RE.search(text)
-        if m:
-            if m.group(2):
-                out.setdefault("reelDateTime", f"{m.group(1)} {m.group(2)}")
-            else:
-                out.setdefault("reelDate", m.group(1))
-        # opportunistic counters
+    # Attempt to read publication datetime, owner, music and counters from script bodies
+    # (Facebook often embeds them in JSON in script tags); stop once every field is known
+    for text in parts.scripts:
+        if all(k in out for k in SCRIPT_FIELDS):
+            break
+        _scan_script(text, out)
         _scan_text_for_metrics(text, out)
 
-        # Attempt owner from JSON blobs
-        if "page_name" in text and "ownerUsername" not in out:
-            m2 = re.search(r'"page_name"\s*:\s*"([^"]+)"', text)
-            if m2:
-                out["ownerUsername"] = m2.group(1)
-
-        if "music" not in out:
-            m3 = re.search(r'"music[^"]*"\s*:\s*"([^"]+)"', text)
-            if m3:
-                out["music"] = m3.group(1)
-
-    # Ensure keys exist for downstream schema
-    out.setdefault("caption", None)
-    out.setdefault("playCount", None)
-    out.setdefault("likesCount", None)
-    out.setdefault("commentsCount", None)
-    out.setdefault("sharesCount", None)
-    out.setdefault("reelDuration", None)
-    out.setdefault("music", None)
-    out.setdefault("reelDate", None)
-    out.setdefault("reelDateTime", None)
-    out.setdefault("img", None)
-
-    return out
\ No newline at end of file
+    # Fields that were not found stay None
+    record = ReelRecord.from_dict(out)
+    METRICS.observe(metric, time.perf_counter() - started)
+    return record
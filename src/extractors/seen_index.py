@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+from extractors.record import ReelRecord
+
+class SeenIndex:
+    """
+    Persistent index of reels collected in previous runs, keyed by reelId.
+    Keeps the last-fetched timestamp and the last record so unchanged reels
+    can be skipped and their prior data merged into the new output.
+    Reels that fell outside a run's date window are kept as incomplete entries (their
+    metrics may not have been parsed): enough to skip them while they stay outside the
+    window, never merged into an output.
+    """
+
+    def __init__(self, path: str, refresh_after_sec: float = 24 * 3600):
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self.path = path
+        self.refresh_after_sec = float(refresh_after_sec)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS reels (
+                reel_id TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                record TEXT NOT NULL,
+                complete INTEGER NOT NULL DEFAULT 1
+            )
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(reels)")}
+        if "complete" not in columns:
+            # Index files from before incomplete entries were kept
+            self._conn.execute("ALTER TABLE reels ADD COLUMN complete INTEGER NOT NULL DEFAULT 1")
+        self._conn.commit()
+
+    def fresh_entry(self, reel_id: str) -> Optional[Tuple[ReelRecord, bool]]:
+        """
+        The stored record and whether it is complete, if it was fetched within the
+        refresh window, else None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fetched_at, record, complete FROM reels WHERE reel_id = ?", (reel_id,)
+            ).fetchone()
+        if row is None or time.time() - row[0] >= self.refresh_after_sec:
+            return None
+        return ReelRecord.from_dict(json.loads(row[1])), bool(row[2])
+
+    def put(self, record: ReelRecord, complete: bool = True) -> None:
+        reel_id = record.get("reelId")
+        if not reel_id:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO reels (reel_id, url, fetched_at, record, complete) VALUES (?, ?, ?, ?, ?)",
+                (
+                    reel_id,
+                    record.get("url") or "",
+                    time.time(),
+                    json.dumps(record.to_dict(), ensure_ascii=False),
+                    int(complete),
+                ),
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM reels").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import codecs
+import re
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from extractors.fb_payload import FIELD_PATHS, extract_embedded_fields
+from extractors.frontier import reel_key
+from extractors.metrics import METRICS
+from extractors.record import FIELDS
+from extractors.reel_parser import REEL_ID_RE, _extract_owner_from_path, parse_reel_html
+from extractors.utils_date import DateWindow
+
+CHUNK_BYTES = 64 * 1024
+
+CHARSET_RE = re.compile(r"""charset\s*=\s*["']?([\w.:-]+)""", re.IGNORECASE)
+REEL_LINK_RE = re.compile(r"/reel/(\d+)", re.IGNORECASE)
+SCRIPT_END = "</script>"
+# Reel pages whose fields are not all in their first few MB are read in full without further probes
+PROBE_MAX_CHARS = 2 * 1024 * 1024
+SCRIPT_BODY_RE = re.compile(r"<script\b[^>]*>(.*?)</script>", re.IGNORECASE | re.DOTALL)
+
+class Body(NamedTuple):
+    text: str
+    nbytes: int  # decoded (decompressed) bytes read
+    reason: Optional[str]  # None (read in full), "limit", or the StopCheck's reason
+
+    @property
+    def complete(self) -> bool:
+        return self.reason is None
+
+class StopCheck(ABC):
+    """
+    Decides, chunk by chunk, whether the rest of a response body is needed.
+    `feed` gets each newly decoded piece and a callable returning everything decoded
+    so far; it returns the length of the prefix to keep once the transfer can stop.
+    """
+
+    reason = "stopped"
+
+    @abstractmethod
+    def feed(self, chunk: str, text: Callable[[], str]) -> Optional[int]:
+        ...
+
+def charset_of(content_type: Optional[str], head: bytes = b"") -> str:
+    """
+    Encoding declared in the Content-Type header, else in a <meta> tag near the top of
+    the document, else UTF-8.
+    """
+    for source in (content_type or "", head[:2048].decode("ascii", "ignore")):
+        m = CHARSET_RE.search(source)
+        if m:
+            try:
+                return codecs.lookup(m.group(1)).name
+            except LookupError:
+                continue
+    return "utf-8"
+
+class BodyReader:
+    """
+    Decodes a response body incrementally, keeping at most `max_bytes` of it and
+    handing each decoded piece to `stop`, which may end the transfer early.
+    """
+
+    def __init__(self, content_type: Optional[str], max_bytes: Optional[int] = None, stop: Optional[StopCheck] = None):
+        self.content_type = content_type
+        self.max_bytes = max_bytes
+        self.stop = stop
+        self.nbytes = 0
+        self.reason: Optional[str] = None
+        self._decoder: Optional[codecs.IncrementalDecoder] = None
+        self._parts: List[str] = []
+
+    def text(self) -> str:
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        Add a chunk; True once nothing more should be read.
+        """
+        if self._decoder is None:
+            encoding = charset_of(self.content_type, chunk)
+            self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        if self.max_bytes is not None and self.nbytes + len(chunk) > self.max_bytes:
+            chunk = chunk[: max(0, self.max_bytes - self.nbytes)]
+            self.reason = "limit"
+        self.nbytes += len(chunk)
+        piece = self._decoder.decode(chunk)
+        if piece:
+            self._parts.append(piece)
+        if self.reason:
+            return True
+        if self.stop is not None and piece:
+            keep = self.stop.feed(piece, self.text)
+            if keep is not None:
+                self._parts = [self.text()[:keep]]
+                self._decoder = None
+                self.reason = self.stop.reason
+                return True
+        return False
+
+    def finish(self) -> Body:
+        if self._decoder is not None:
+            tail = self._decoder.decode(b"", final=True)
+            if tail:
+                self._parts.append(tail)
+        if self.reason:
+            METRICS.inc(f"http.body_cut.{self.reason}")
+        return Body(self.text(), self.nbytes, self.reason)
+
+def read_body(
+    chunks: Iterable[bytes], content_type: Optional[str], max_bytes: Optional[int] = None, stop: Optional[StopCheck] = None
+) -> Body:
+    reader = BodyReader(content_type, max_bytes, stop)
+    for chunk in chunks:
+        if chunk and reader.feed(chunk):
+            break
+    return reader.finish()
+
+# Fields a reel page must yield before the rest of it is skipped; a bare reelDate is
+# not waited for (reelDateTime supersedes it)
+REQUIRED_FIELDS = tuple(f for f in FIELDS if f != "reelDate")
+
+def _markers() -> Dict[str, Tuple[str, ...]]:
+    # Substrings that must all have been seen before a prefix is worth parsing
+    out = {field: tuple(f'"{path[0]}"' for path, _ in candidates) for field, candidates in FIELD_PATHS.items()}
+    out["reelDateTime"] += ('"uploadDate"',)
+    out["caption"] = ("og:title", "og:description", "twitter:title", "twitter:description", '"headline"')
+    out["img"] = ("og:image", '"thumbnailUrl"')
+    out["ownerUsername"] = ('"page_name"', '"author"')
+    return out
+
+MARKERS = _markers()
+_OVERLAP = max(len(m) for ms in MARKERS.values() for m in ms)
+
+class ReelFieldsStop(StopCheck):
+    """
+    Stops a reel page download once the part received so far (cut after its last
+    complete </script>) parses into a record with every required field, all the
+    embedded-JSON ones coming from the reel's own payload (so they equal what the full
+    page gives), or, with a `window`, into one dated outside the window.
+    Parsing is only attempted once every field's marker has been seen, and then again
+    only after the text has doubled, so pages that never qualify (e.g. metrics only in
+    visible text) cost at most a few extra partial parses; no probe is made past
+    PROBE_MAX_CHARS.
+    """
+
+    def __init__(self, url: str, window: Optional[DateWindow] = None):
+        self.url = url
+        self.window = window
+        self.reason = "complete"
+        self._pending = {f: ms for f, ms in MARKERS.items() if f in REQUIRED_FIELDS}
+        if _extract_owner_from_path(url):
+            self._pending.pop("ownerUsername", None)
+        m = REEL_ID_RE.search(url)
+        self.reel_id = m.group(1) if m else None
+        if m:
+            # Embedded fields are only read from scripts that mention the reel
+            self._pending["reelId"] = (m.group(1),)
+        self._tail = ""
+        self._received = 0  # characters fed so far, so the text is only joined for a probe
+        self._next_probe = 0
+
+    def _ready(self) -> bool:
+        if not self._pending:
+            return True
+        return self.window is not None and "reelDateTime" not in self._pending and "reelId" not in self._pending
+
+    def feed(self, chunk: str, text: Callable[[], str]) -> Optional[int]:
+        buf = self._tail + chunk
+        self._tail = buf[-_OVERLAP:]
+        self._received += len(chunk)
+        for field in [f for f, ms in self._pending.items() if any(m in buf for m in ms)]:
+            del self._pending[field]
+        if (
+            not self._ready()
+            or SCRIPT_END not in buf
+            or self._received < self._next_probe
+            or self._next_probe > PROBE_MAX_CHARS
+        ):
+            return None
+        prefix = text()
+        self._next_probe = 2 * len(prefix)
+        cut = prefix.rfind(SCRIPT_END) + len(SCRIPT_END)
+        head = prefix[:cut]
+        record = parse_reel_html(head, self.url, metric="http.body_probe")
+        if self.window is not None and record.reelDateTime and self.window.position(record.reelDateTime):
+            self.reason = "window"
+            return cut
+        if any(record[f] is None for f in REQUIRED_FIELDS):
+            return None
+        embedded = extract_embedded_fields(SCRIPT_BODY_RE.findall(head), self.reel_id)
+        if len(embedded) == len(FIELD_PATHS):
+            return cut
+        return None
+
+class ReelLinksStop(StopCheck):
+    """
+    Stops a page download once `limit` reels not yet `known` to the run are linked from
+    it, at the end of the tag holding the last one. Continuation cursors further down
+    are not needed then, since discovery is done with the page.
+    """
+
+    reason = "links"
+
+    def __init__(self, limit: int, known: Callable[[str], bool]):
+        self.limit = max(0, int(limit))
+        self.known = known
+        self._keys: Dict[str, None] = {}
+        self._tail = ""
+        self._offset = 0  # characters fed before the current chunk
+        self._cut_after: Optional[int] = None
+
+    def feed(self, chunk: str, text: Callable[[], str]) -> Optional[int]:
+        buf = self._tail + chunk
+        start = self._offset - len(self._tail)
+        self._offset += len(chunk)
+        if self._cut_after is None:
+            for m in REEL_LINK_RE.finditer(buf):
+                if m.end() == len(buf):
+                    break  # the id may continue in the next chunk
+                key = reel_key(m.group(0))
+                if key in self._keys or self.known(key):
+                    continue
+                self._keys[key] = None
+                if len(self._keys) >= self.limit:
+                    self._cut_after = start + m.end()
+                    break
+        self._tail = buf[-32:]
+        if self._cut_after is None:
+            return None
+        end = buf.find(">", max(0, self._cut_after - start))
+        if end == -1:
+            return None
+        return start + end + 1
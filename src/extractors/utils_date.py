@@ -1,56 +1,211 @@
 from __future__ import annotations
 
 import os
-from datetime import datetime
-from typing import Optional
+import re
+from datetime import datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional
 
-from dateutil import tz
+from extractors.metrics import METRICS
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+_DEFAULT_TZ = "Asia/Karachi"
+
+# Tried in order; a value can only match one of them, so the order does not change results
+_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%dT%H:%M:%S%z",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d",
+    "%d %b %Y %H:%M",
+    "%d %b %Y",
+)
+_last_format = 0  # index into _FORMATS of the last format that matched
+
+# Zero-padded ISO values without an offset; the batch API parses these with pandas
+_ISO_NAIVE_RE = r"^\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}(?::\d{2})?)?$"
+
+@lru_cache(maxsize=64)
+def _tz_by_name(name: str) -> tzinfo:
+    from dateutil import tz
 
-def _get_tz() -> tz.tzfile:
-    name = os.environ.get("SCRAPER_TZ", "Asia/Karachi")
     return tz.gettz(name) or tz.UTC
 
+def _tz_name() -> str:
+    return os.environ.get("SCRAPER_TZ", _DEFAULT_TZ)
+
+def _get_tz() -> tzinfo:
+    return _tz_by_name(_tz_name())
+
 def normalize_datetime(value: str, date_only: bool = False) -> str:
     """
     Normalize incoming date/time string to ISO formats in local timezone.
     - If `date_only` is True, returns YYYY-MM-DD.
     - Otherwise returns 'YYYY-MM-DD HH:MM'.
     """
-    value = (value or "").strip()
+    with METRICS.timer("normalize_datetime"):
+        return _normalize_cached((value or "").strip(), date_only, _tz_name())
+
+@lru_cache(maxsize=65536)
+def _normalize_cached(value: str, date_only: bool, tz_name: str) -> str:
     if not value:
         return value
 
-    # Try a few formats quickly
-    formats = [
-        "%Y-%m-%d %H:%M:%S",
-        "%Y-%m-%d %H:%M",
-        "%Y-%m-%dT%H:%M:%S%z",
-        "%Y-%m-%dT%H:%M:%S",
-        "%Y-%m-%d",
-        "%d %b %Y %H:%M",
-        "%d %b %Y",
-    ]
+    dt = parse_datetime(value)
+    if dt is None:
+        return value  # return as-is if unknown
+
+    local_dt = dt.astimezone(_tz_by_name(tz_name))
+    if date_only:
+        return local_dt.strftime("%Y-%m-%d")
+    return local_dt.strftime("%Y-%m-%d %H:%M")
+
+def normalize_datetime_series(values: Iterable[Any], date_only: bool = False) -> "pd.Series":
+    """
+    Batch form of `normalize_datetime` for a whole column (list, array or Series);
+    returns a Series of the same strings the single-value function gives.
+    Zero-padded ISO values are converted in one vectorized pass, the rest (and
+    missing values, which become "") go through the cached single-value path once
+    per distinct value.
+    """
+    import numpy as np
+    import pandas as pd
+
+    with METRICS.timer("normalize_datetime_series"):
+        series = values if isinstance(values, pd.Series) else pd.Series(list(values), dtype=object)
+        text = series.astype(object).where(series.notna(), "").astype(str).str.strip()
+        codes, uniques = pd.factorize(text, sort=False)
+        uniques = pd.Series(uniques, dtype=object)
+        out = pd.Series([None] * len(uniques), dtype=object)
+
+        iso = uniques.str.match(_ISO_NAIVE_RE)
+        if iso.any():
+            parsed = pd.to_datetime(uniques[iso].str.replace("T", " ", regex=False), format="ISO8601", errors="coerce")
+            ok = parsed.notna()
+            if ok.any():
+                # Wall-clock time in the local zone, formatted by NumPy ("YYYY-MM-DDTHH:MM")
+                local = parsed[ok].dt.tz_localize("UTC").dt.tz_convert(_get_tz()).dt.tz_localize(None)
+                stamps = np.datetime_as_string(local.to_numpy(), unit="D" if date_only else "m")
+                out[ok[ok].index] = np.char.replace(stamps, "T", " ")
+
+        tz_name = _tz_name()
+        rest = out.isna()
+        out[rest] = [_normalize_cached(v, date_only, tz_name) for v in uniques[rest]]
+        result = pd.Series(out.to_numpy()[codes], index=series.index, dtype=object)
+    METRICS.inc("normalize_datetime_series.values", len(result))
+    return result
+
+def parse_datetime(value: str, default_tz: Optional[tzinfo] = None) -> Optional[datetime]:
+    """
+    Parse a date/time string into an aware datetime, or None if the format is unknown.
+    Naive values are taken to be in `default_tz` (UTC when not given).
+    """
+    global _last_format
+    value = (value or "").strip()
+    if not value:
+        return None
+    default_tz = default_tz or timezone.utc
+
+    # Start with the format that matched last time; inputs tend to repeat one format
     dt: Optional[datetime] = None
-    for fmt in formats:
+    start = _last_format
+    for n in range(len(_FORMATS)):
+        idx = (start + n) % len(_FORMATS)
         try:
-            dt = datetime.strptime(value, fmt)
-            # naive datetimes are assumed UTC, convert to local
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=tz.UTC)
-            break
-        except Exception:
+            dt = datetime.strptime(value, _FORMATS[idx])
+        except ValueError:
             continue
+        _last_format = idx
+        # naive datetimes are taken to be in default_tz (UTC unless given)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=default_tz)
+        break
 
     if dt is None:
         # last-ditch: try fromisoformat
         try:
             dt = datetime.fromisoformat(value)
             if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=tz.UTC)
+                dt = dt.replace(tzinfo=default_tz)
         except Exception:
-            return value  # return as-is if unknown
+            return None
+    return dt
 
-    local_dt = dt.astimezone(_get_tz())
-    if date_only:
-        return local_dt.strftime("%Y-%m-%d")
-    return local_dt.strftime("%Y-%m-%d %H:%M")
\ No newline at end of file
+def local_timestamp(value: Optional[str]) -> Optional[float]:
+    """
+    Epoch seconds of a normalized record date ('YYYY-MM-DD HH:MM' or 'YYYY-MM-DD', local
+    time in SCRAPER_TZ), or None if it is missing or cannot be parsed.
+    """
+    dt = parse_datetime(value or "", default_tz=_get_tz())
+    return dt.timestamp() if dt else None
+
+RELATIVE_BOUND_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([hdw])\s*$", re.IGNORECASE)
+DATE_ONLY_RE = re.compile(r"^\s*\d{4}-\d{2}-\d{2}\s*$")
+
+class DateWindow:
+    """
+    Inclusive [since, until] window on reel publication time.
+    Bounds are absolute dates/times (naive ones in the SCRAPER_TZ timezone) or ages
+    relative to now such as "7d", "12h" or "2w". A date-only `until` covers that whole day.
+    """
+
+    def __init__(self, since: Optional[datetime] = None, until: Optional[datetime] = None):
+        self.since = since
+        self.until = until
+
+    @classmethod
+    def from_settings(cls, since: Any = None, until: Any = None) -> Optional["DateWindow"]:
+        if not since and not until:
+            return None
+        return cls(cls._bound(since), cls._bound(until, end_of_day=True))
+
+    @staticmethod
+    def _bound(value: Any, end_of_day: bool = False) -> Optional[datetime]:
+        if not value:
+            return None
+        text = str(value)
+        m = RELATIVE_BOUND_RE.match(text)
+        if m:
+            unit = {"h": "hours", "d": "days", "w": "weeks"}[m.group(2).lower()]
+            return datetime.now(timezone.utc) - timedelta(**{unit: float(m.group(1))})
+        dt = parse_datetime(text, default_tz=_get_tz())
+        if dt is None:
+            raise ValueError(f"Unrecognized date bound: {value!r}")
+        if end_of_day and DATE_ONLY_RE.match(text):
+            dt += timedelta(days=1, microseconds=-1)
+        return dt
+
+    def position(self, value: Optional[str], default_tz: Optional[tzinfo] = None) -> int:
+        """
+        -1 if `value` is older than `since`, 1 if newer than `until`, else 0
+        (also when `value` is missing or cannot be parsed).
+        """
+        dt = parse_datetime(value or "", default_tz=default_tz)
+        if dt is None:
+            return 0
+        if self.since and dt < self.since:
+            return -1
+        if self.until and dt > self.until:
+            return 1
+        return 0
+
+    def record_position(self, record: Dict[str, Any]) -> int:
+        """
+        `position` of a parsed record, whose normalized dates are in local time.
+        """
+        local = _get_tz()
+        if record.get("reelDateTime"):
+            return self.position(record["reelDateTime"], default_tz=local)
+        if record.get("reelDate"):
+            # Compare a bare date by its whole day
+            day = parse_datetime(record["reelDate"], default_tz=local)
+            if day is None:
+                return 0
+            if self.since and day + timedelta(days=1) <= self.since:
+                return -1
+            if self.until and day > self.until:
+                return 1
+        return 0
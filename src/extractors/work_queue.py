@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+from extractors.frontier import reel_key
+from extractors.record import ReelRecord
+
+class Task(NamedTuple):
+    id: int
+    kind: str  # "page" | "reel"
+    key: str
+    payload: Dict[str, Any]
+    attempts: int
+
+class WorkQueue:
+    """
+    Task queue shared by a coordinator and any number of worker processes, backed by one
+    SQLite file (on a shared disk, or one node serving several local workers).
+      - tasks are keyed by (kind, key); enqueueing an existing key is a no-op, so the
+        queue doubles as the run-wide reel frontier
+      - `lease` hands a task to one worker for `lease_sec`; tasks whose lease runs out
+        (crashed or stalled worker) become visible again, up to `max_attempts` leases
+      - parsed records are stored in the queue and merged by the coordinator
+      - `reset` starts a new run (a fresh run id) and drops everything from the last one
+    Every state change is a short IMMEDIATE transaction, so processes never lease the same task.
+    """
+
+    def __init__(self, path: str, lease_sec: float = 300, max_attempts: int = 3):
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self.path = path
+        self.lease_sec = float(lease_sec)
+        self.max_attempts = max(1, int(max_attempts))
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._tx() as c:
+            c.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    state TEXT NOT NULL DEFAULT 'queued',
+                    owner TEXT,
+                    lease_until REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    UNIQUE (kind, key)
+                )
+                """
+            )
+            c.execute("CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, lease_until)")
+            c.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, record TEXT NOT NULL)")
+            c.execute("CREATE TABLE IF NOT EXISTS refs (key TEXT NOT NULL, page TEXT NOT NULL, PRIMARY KEY (key, page))")
+            c.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+
+    @contextmanager
+    def _tx(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def reset(self) -> str:
+        """
+        Drop every task, result and referrer of earlier runs and start a new, unsealed run;
+        returns its run id.
+        """
+        run_id = uuid.uuid4().hex
+        with self._tx() as c:
+            for table in ("tasks", "results", "refs", "meta"):
+                c.execute(f"DELETE FROM {table}")
+            c.execute("INSERT INTO meta (name, value) VALUES ('run', ?)", (run_id,))
+        return run_id
+
+    def run_id(self) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE name = 'run'").fetchone()
+        return row[0] if row else None
+
+    def enqueue(self, kind: str, key: str, payload: Dict[str, Any]) -> bool:
+        """
+        Add a task unless one with the same kind and key exists; True if it was added.
+        """
+        with self._tx() as c:
+            cur = c.execute(
+                "INSERT OR IGNORE INTO tasks (kind, key, payload) VALUES (?, ?, ?)",
+                (kind, key, json.dumps(payload, ensure_ascii=False)),
+            )
+            return cur.rowcount > 0
+
+    def claim_reels(
+        self, page_url: str, links: List[str], limit: Optional[int] = None, extra: Optional[Dict[str, Any]] = None
+    ) -> List[str]:
+        """
+        Enqueue a reel task for each link no node has queued yet (at most `limit`) and record
+        `page_url` as a referrer of every reel already queued; returns the links enqueued.
+        """
+        claimed: List[str] = []
+        with self._tx() as c:
+            for link in links:
+                key = reel_key(link)
+                exists = c.execute("SELECT 1 FROM tasks WHERE kind = 'reel' AND key = ?", (key,)).fetchone()
+                if not exists:
+                    if limit is not None and len(claimed) >= limit:
+                        continue
+                    payload = dict(extra or {}, url=link, page=page_url)
+                    c.execute(
+                        "INSERT INTO tasks (kind, key, payload) VALUES ('reel', ?, ?)",
+                        (key, json.dumps(payload, ensure_ascii=False)),
+                    )
+                    claimed.append(link)
+                c.execute("INSERT OR IGNORE INTO refs (key, page) VALUES (?, ?)", (key, page_url))
+        return claimed
+
+    def has_reel(self, key: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM tasks WHERE kind = 'reel' AND key = ?", (key,)).fetchone() is not None
+
+    def lease(self, owner: str) -> Optional[Task]:
+        """
+        Lease the oldest visible task to `owner`, or return None if there is none right now.
+        """
+        now = time.time()
+        with self._tx() as c:
+            while True:
+                row = c.execute(
+                    """
+                    SELECT id, kind, key, payload, attempts FROM tasks
+                    WHERE state = 'queued' OR (state = 'leased' AND lease_until < ?)
+                    ORDER BY id LIMIT 1
+                    """,
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    return None
+                if row[4] >= self.max_attempts:
+                    c.execute("UPDATE tasks SET state = 'failed', owner = NULL WHERE id = ?", (row[0],))
+                    continue
+                c.execute(
+                    "UPDATE tasks SET state = 'leased', owner = ?, lease_until = ?, attempts = attempts + 1 WHERE id = ?",
+                    (owner, now + self.lease_sec, row[0]),
+                )
+                return Task(row[0], row[1], row[2], json.loads(row[3]), row[4] + 1)
+
+    def extend(self, task: Task, owner: str) -> bool:
+        """
+        Push the lease deadline out again; False if the task is no longer leased to `owner`.
+        """
+        with self._tx() as c:
+            cur = c.execute(
+                "UPDATE tasks SET lease_until = ? WHERE id = ? AND state = 'leased' AND owner = ?",
+                (time.time() + self.lease_sec, task.id, owner),
+            )
+            return cur.rowcount > 0
+
+    def complete(self, task: Task, owner: str, record: Optional[ReelRecord] = None) -> None:
+        """
+        Mark the task done, storing `record` as its result (reel tasks).
+        """
+        with self._tx() as c:
+            if record is not None:
+                c.execute(
+                    "INSERT OR REPLACE INTO results (key, record) VALUES (?, ?)",
+                    (task.key, json.dumps(record.to_dict(), ensure_ascii=False)),
+                )
+            c.execute(
+                "UPDATE tasks SET state = 'done', owner = NULL, lease_until = NULL WHERE id = ? AND owner = ?",
+                (task.id, owner),
+            )
+
+    def fail(self, task: Task, owner: str, error: str) -> None:
+        """
+        Return the task to the queue, or mark it failed once it has used all its attempts.
+        """
+        state = "failed" if task.attempts >= self.max_attempts else "queued"
+        with self._tx() as c:
+            c.execute(
+                "UPDATE tasks SET state = ?, owner = NULL, lease_until = NULL, error = ? WHERE id = ? AND owner = ?",
+                (state, error[:500], task.id, owner),
+            )
+
+    def seal(self) -> None:
+        """
+        Mark that every target has been enqueued; idle workers exit once a sealed queue is drained.
+        """
+        with self._tx() as c:
+            c.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('sealed', '1')")
+
+    def sealed(self) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM meta WHERE name = 'sealed'").fetchone() is not None
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Number of tasks per state ("queued", "leased", "done", "failed").
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state").fetchall()
+        out = {"queued": 0, "leased": 0, "done": 0, "failed": 0}
+        out.update(dict(rows))
+        return out
+
+    def drained(self) -> bool:
+        counts = self.counts()
+        return counts["queued"] == 0 and counts["leased"] == 0
+
+    def records(self) -> Iterator[ReelRecord]:
+        """
+        Stored records of the current run, in the order their reels were queued.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT r.record FROM results r JOIN tasks t ON t.kind = 'reel' AND t.key = r.key
+                ORDER BY t.id
+                """
+            ).fetchall()
+        for (record,) in rows:
+            yield ReelRecord.from_dict(json.loads(record))
+
+    def referrers(self) -> Dict[str, List[str]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT key, page FROM refs ORDER BY rowid").fetchall()
+        out: Dict[str, List[str]] = {}
+        for key, page in rows:
+            out.setdefault(key, []).append(page)
+        return out
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+class QueueFrontier:
+    """
+    Stand-in for ReelFrontier used by workers: claiming a reel enqueues it, so
+    deduplication spans every node. `extra` is merged into each reel task's payload.
+    """
+
+    def __init__(self, queue: WorkQueue, extra: Optional[Dict[str, Any]] = None):
+        self.queue = queue
+        self.extra = extra or {}
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.queue.has_reel(key)
+
+    def claim(self, page_url: str, links: List[str], limit: Optional[int] = None) -> List[str]:
+        return self.queue.claim_reels(page_url, links, None if limit is None else max(0, int(limit)), self.extra)
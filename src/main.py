@@ -3,19 +3,45 @@ import json
 import logging
 import os
 import re
+import signal
+import socket
 import sys
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from functools import partial
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Set, Union
 from urllib.parse import urljoin, urlparse
 
 import requests
-from bs4 import BeautifulSoup
-from dateutil import tz
-from tqdm import tqdm
+from requests.adapters import HTTPAdapter
 
-from extractors.reel_parser import parse_reel_html
-from extractors.proxy_manager import ProxyManager
-from extractors.utils_date import normalize_datetime
-from outputs.exporter import Exporter
+from extractors.checkpoint import Checkpoint
+from extractors.concurrency import HostLimiter
+from extractors.discovery import ReelDiscovery
+from extractors.frontier import ReelFrontier, reel_key
+from extractors.http_cache import ResponseCache, cache_lookup, response_text
+from extractors.metrics import METRICS
+from extractors.monitor import DeltaLog, MonitorStore, PollSchedule, ReelState, counter_changes, published_at
+from extractors.parse_pool import ParsePool, parse_reel_record
+from extractors.rate_limiter import (
+    RETRY_STATUSES,
+    THROTTLE_STATUSES,
+    AdaptiveRateLimiter,
+    RetryPolicy,
+    parse_retry_after,
+)
+from extractors.proxy_manager import ProxyManager, ProxyPool
+from extractors.record import ReelRecord
+from extractors.reel_parser import REEL_ID_RE
+from extractors.seen_index import SeenIndex
+from extractors.streaming import CHUNK_BYTES, ReelFieldsStop, ReelLinksStop, StopCheck, read_body
+from extractors.utils_date import DateWindow
+from extractors.work_queue import QueueFrontier, Task, WorkQueue
+from outputs.exporter import STREAM_FORMATS, Exporter
+
+if TYPE_CHECKING:
+    from extractors.async_transport import AsyncFetcher
 
 FB_REEL_PATH_RE = re.compile(r"/reel/\d+/?", re.IGNORECASE)
 
@@ -40,8 +66,19 @@ def save_json(path: str, data: Any) -> None:
     with open(path, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
-def build_session(user_agent: Optional[str] = None, timeout: int = 20, proxies: Optional[Dict[str, str]] = None) -> requests.Session:
+def build_session(
+    user_agent: Optional[str] = None,
+    timeout: int = 20,
+    proxies: Optional[Dict[str, str]] = None,
+    pool_size: int = 10,
+    max_per_host: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+) -> requests.Session:
     sess = requests.Session()
+    # Size the connection pool so concurrent workers don't discard connections
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    sess.mount("http://", adapter)
+    sess.mount("https://", adapter)
     sess.headers.update({
         "User-Agent": user_agent or "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36",
         "Accept-Language": "en-US,en;q=0.9",
@@ -52,12 +89,25 @@ def build_session(user_agent: Optional[str] = None, timeout: int = 20, proxies:
     sess.timeout = timeout  # type: ignore[attr-defined]
     if proxies:
         sess.proxies.update(proxies)
+    if max_per_host or max_in_flight:
+        sess.host_limiter = HostLimiter(max_per_host or pool_size, max_in_flight)  # type: ignore[attr-defined]
     return sess
 
+def progress_bar(**kwargs: Any) -> Any:
+    """
+    tqdm progress bar; tqdm is imported on first use so it stays off the startup path.
+    """
+    from tqdm import tqdm
+
+    return tqdm(**kwargs)
+
 def find_reel_links_from_page_html(base_url: str, html: str, limit: Optional[int]) -> List[str]:
     """
     Extract reel links from a Facebook page HTML by scanning for '/reel/<id>' paths.
+    Links to the same reel (e.g. differing only in query string) are kept once.
     """
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(html, "html.parser")
     links: List[str] = []
 
@@ -73,58 +123,735 @@ def find_reel_links_from_page_html(base_url: str, html: str, limit: Optional[int
         full = urljoin(base_url, m.group(0))
         links.append(full)
 
-    # Deduplicate preserving order
+    # Deduplicate by reelId preserving order
     seen = set()
     uniq = []
     for u in links:
-        if u not in seen:
-            seen.add(u)
+        key = reel_key(u)
+        if key not in seen:
+            seen.add(key)
             uniq.append(u)
 
     if limit is not None:
         uniq = uniq[:max(0, int(limit))]
     return uniq
 
-def fetch_url(session: requests.Session, url: str, timeout: int) -> Optional[str]:
+def _get(
+    http: requests.Session,
+    url: str,
+    timeout: int,
+    headers: Optional[Dict[str, str]],
+    max_bytes: Optional[int],
+    make_stop: Optional[Callable[[], StopCheck]],
+) -> requests.Response:
+    # Stream the body so it is decoded as it arrives, capped, and cut short once `make_stop`'s check says so
+    resp = http.get(url, timeout=timeout, headers=headers, stream=True)
+    try:
+        stop = make_stop() if make_stop and resp.status_code < 300 else None
+        resp.body = read_body(  # type: ignore[attr-defined]
+            resp.iter_content(CHUNK_BYTES), resp.headers.get("Content-Type"), max_bytes, stop
+        )
+        # Bytes pulled off the connection (still compressed), as opposed to the decoded body.nbytes
+        resp.wire_bytes = resp.raw.tell() if hasattr(resp.raw, "tell") else resp.body.nbytes  # type: ignore[attr-defined]
+    finally:
+        resp.close()
+    return resp
+
+def _send(
+    session: requests.Session,
+    url: str,
+    timeout: int,
+    headers: Optional[Dict[str, str]] = None,
+    make_stop: Optional[Callable[[], StopCheck]] = None,
+) -> Optional[requests.Response]:
+    limiter: Optional[HostLimiter] = getattr(session, "host_limiter", None)
+    pool: Optional[ProxyPool] = getattr(session, "proxy_pool", None)
+    max_bytes: Optional[int] = getattr(session, "max_body_bytes", None)
+    proxy = pool.acquire() if pool else None
+    http = proxy.session if proxy else session
+    METRICS.inc("http.requests")
+    started = time.monotonic()
+    status: Optional[int] = None
+    error = False
     try:
-        resp = session.get(url, timeout=timeout)
-        if resp.status_code >= 400:
-            logging.warning("HTTP %s for %s", resp.status_code, url)
+        try:
+            if limiter:
+                with limiter.slot(url):
+                    started = time.monotonic()
+                    resp = _get(http, url, timeout, headers, max_bytes, make_stop)
+            else:
+                resp = _get(http, url, timeout, headers, max_bytes, make_stop)
+        except requests.RequestException as e:
+            METRICS.inc("http.request_errors")
+            logging.warning("Request error for %s: %s", url, e)
+            error = True
             return None
-        return resp.text
-    except requests.RequestException as e:
-        logging.warning("Request error for %s: %s", url, e)
+        status = resp.status_code
+        total = time.monotonic() - started
+        # requests measures up to the parsed headers; the rest is reading the body
+        ttfb = min(resp.elapsed.total_seconds(), total)
+        METRICS.observe("http.ttfb", ttfb)
+        METRICS.observe("http.download", total - ttfb)
+        METRICS.inc("http.bytes_downloaded", resp.wire_bytes)  # type: ignore[attr-defined]
+        if status >= 400:
+            METRICS.inc("http.errors")
+        return resp
+    finally:
+        # Whatever ends the request (including errors raised while reading the body), free the proxy
+        if pool and proxy:
+            if error or (status is not None and status >= 400 and status not in pool.NEUTRAL_STATUSES):
+                METRICS.inc("proxy.errors")
+            pool.release(proxy, time.monotonic() - started, status=status, error=error)
+
+def _send_with_retries(
+    session: requests.Session,
+    url: str,
+    timeout: int,
+    headers: Optional[Dict[str, str]] = None,
+    make_stop: Optional[Callable[[], StopCheck]] = None,
+) -> Optional[requests.Response]:
+    limiter: Optional[AdaptiveRateLimiter] = getattr(session, "rate_limiter", None)
+    policy: Optional[RetryPolicy] = getattr(session, "retry_policy", None)
+    attempts = 1 + (policy.max_retries if policy else 0)
+    resp: Optional[requests.Response] = None
+    for attempt in range(attempts):
+        # Pace before taking a concurrency slot so waiting callers don't hold one
+        if limiter:
+            limiter.acquire(url)
+        resp = _send(session, url, timeout, headers=headers, make_stop=make_stop)
+        status = resp.status_code if resp is not None else None
+        retry_after = parse_retry_after(resp.headers.get("Retry-After")) if resp is not None else None
+        if status in THROTTLE_STATUSES:
+            METRICS.inc("http.throttled")
+        if limiter and status is not None:
+            if status in THROTTLE_STATUSES:
+                limiter.on_throttle(url, retry_after)
+            elif status < 400:
+                limiter.on_success(url)
+        if status is not None and status not in RETRY_STATUSES:
+            return resp
+        if policy is None or attempt == attempts - 1:
+            break
+        delay = policy.delay(attempt, retry_after)
+        METRICS.inc("http.retries")
+        logging.info("Retrying %s in %.1fs (%s, attempt %d/%d)", url, delay, status or "error", attempt + 2, attempts)
+        time.sleep(delay)
+    return resp
+
+def fetch_url(
+    session: requests.Session, url: str, timeout: int, make_stop: Optional[Callable[[], StopCheck]] = None
+) -> Optional[str]:
+    """
+    GET `url` and return its body, at most `session.max_body_bytes` of it. With `make_stop`,
+    each download gets a fresh StopCheck that may end it early; the text received up to
+    that point is returned.
+    """
+    with METRICS.timer("fetch"):
+        return _fetch_url(session, url, timeout, make_stop)
+
+def _fetch_url(
+    session: requests.Session, url: str, timeout: int, make_stop: Optional[Callable[[], StopCheck]] = None
+) -> Optional[str]:
+    cache: Optional[ResponseCache] = getattr(session, "cache", None)
+    lookup = cache_lookup(cache, url)
+    if lookup.done:
+        return lookup.text
+    resp = _send_with_retries(session, url, timeout, headers=lookup.headers, make_stop=make_stop)
+    return response_text(cache, url, lookup, resp)
+
+def _reel_stop(client: Any, link: str, window: Optional[DateWindow]) -> Optional[Callable[[], StopCheck]]:
+    # `client` is the requests session or the AsyncFetcher; both carry the early_stop setting
+    if not getattr(client, "early_stop", False):
+        return None
+    return partial(ReelFieldsStop, link, window)
+
+def _links_stop(client: Any, discovery: ReelDiscovery) -> Optional[Callable[[], StopCheck]]:
+    remaining = discovery.remaining
+    if not getattr(client, "early_stop", False) or not remaining:
         return None
+    return partial(ReelLinksStop, remaining, discovery.known)
 
-def scrape_page(session: requests.Session, page_url: str, max_reels: Optional[int]) -> List[Dict[str, Any]]:
+def fetch_and_parse_reel(
+    session: requests.Session, link: str, window: Optional[DateWindow] = None
+) -> Optional[ReelRecord]:
     """
-    Given a public page URL, fetch its HTML, discover reel links, then fetch and parse each reel.
+    Fetch a single reel URL and parse it into a record. Returns None on any failure.
     """
-    logging.info("Fetching page: %s", page_url)
-    page_html = fetch_url(session, page_url, getattr(session, "timeout", 20))
-    if not page_html:
-        return []
+    html = fetch_url(session, link, getattr(session, "timeout", 20), _reel_stop(session, link, window))
+    if not html:
+        return None
+    return parse_reel_record(html, link, window)
 
-    reel_links = find_reel_links_from_page_html(page_url, page_html, max_reels)
-    logging.info("Found %d candidate reels on %s", len(reel_links), page_url)
+def _fetch_for_parse_pool(
+    session: requests.Session, link: str, parse_pool: ParsePool, window: Optional[DateWindow] = None
+) -> Optional["Future[Optional[ReelRecord]]"]:
+    # Runs on a fetch thread; blocks here when the parse queue is full (backpressure)
+    html = fetch_url(session, link, getattr(session, "timeout", 20), _reel_stop(session, link, window))
+    if not html:
+        return None
+    return parse_pool.submit(html, link, window)
 
-    results: List[Dict[str, Any]] = []
-    for link in tqdm(reel_links, desc="Reels", leave=False):
-        html = fetch_url(session, link, getattr(session, "timeout", 20))
-        if not html:
-            continue
+def _discover(session: requests.Session, discovery: ReelDiscovery) -> Iterator[List[str]]:
+    """
+    Drive `discovery` with the requests transport, yielding each batch of new reel links.
+    """
+    while True:
+        url = discovery.next_url()
+        if url is None:
+            break
+        logging.info("Fetching page: %s", url)
+        html = fetch_url(session, url, getattr(session, "timeout", 20), _links_stop(session, discovery))
+        links = discovery.feed(url, html, find_reel_links_from_page_html(url, html, None) if html else [])
+        if links:
+            yield links
+
+async def _discover_async(fetcher: "AsyncFetcher", discovery: ReelDiscovery) -> AsyncIterator[List[str]]:
+    while True:
+        url = discovery.next_url()
+        if url is None:
+            break
+        logging.info("Fetching page: %s", url)
+        html = await fetcher.fetch(url, _links_stop(fetcher, discovery))
+        links = discovery.feed(url, html, find_reel_links_from_page_html(url, html, None) if html else [])
+        if links:
+            yield links
+
+class _PageReels:
+    """
+    Per-page bookkeeping shared by the threaded and asyncio scrapers: restores reels
+    from the checkpoint or the seen index, then records, indexes and emits each
+    finished reel while keeping records in discovery order.
+    Reels outside `window` are dropped (and kept in the seen index as incomplete entries,
+    so later runs skip them without a fetch); once `stop_after` of them turn out older
+    than its start, `discovery` is stopped and the page's links listed after the last of
+    them that are not fetched yet are skipped (pages list reels newest first).
+    """
+
+    def __init__(
+        self,
+        page_url: str,
+        seen: Optional[SeenIndex] = None,
+        checkpoint: Optional[Checkpoint] = None,
+        on_record: Optional[Callable[[ReelRecord], None]] = None,
+        window: Optional[DateWindow] = None,
+        discovery: Optional[ReelDiscovery] = None,
+        stop_after: int = 3,
+    ):
+        self.page_url = page_url
+        self.seen = seen
+        self.checkpoint = checkpoint
+        self.on_record = on_record
+        self.window = window
+        self.discovery = discovery
+        self.stop_after = max(1, int(stop_after))
+        self.reel_links: List[str] = []
+        self.slots: List[Optional[ReelRecord]] = []
+        self.restored = 0
+        self.older = 0
+        self.older_max = -1  # highest index among the older reels counted so far
+        self.stop_idx: Optional[int] = None  # links after this one are older than the window
+
+    def wanted(self, idx: int) -> bool:
+        """
+        False for a link listed after the reel that ended the page's window; checked just
+        before it is fetched.
+        """
+        if self.stop_idx is not None and idx > self.stop_idx:
+            METRICS.inc("window.not_fetched")
+            return False
+        return True
+
+    def _in_window(self, record: ReelRecord, idx: int) -> bool:
+        position = self.window.record_position(record) if self.window else 0
+        if position == 0:
+            return True
+        METRICS.inc("window.skipped")
+        if position < 0 and self.stop_idx is None:
+            self.older += 1
+            self.older_max = max(self.older_max, idx)
+            if self.older == self.stop_after:
+                # Reels finish out of order under concurrency; cut after the last of them
+                # in listing order so no earlier link is skipped
+                logging.info("Reached reels older than the date window on %s, stopping discovery", self.page_url)
+                self.stop_idx = self.older_max
+                if self.discovery:
+                    self.discovery.stop()
+        return False
+
+    def add(self, links: List[str]) -> List[int]:
+        """
+        Append newly discovered links; returns the indexes of those that still need fetching.
+        """
+        todo: List[int] = []
+        for link in links:
+            idx = len(self.reel_links)
+            self.reel_links.append(link)
+            prior = self.checkpoint.record(link) if self.checkpoint else None
+            complete = True
+            if prior is None and self.seen is not None:
+                m = REEL_ID_RE.search(link)
+                entry = self.seen.fresh_entry(m.group(1)) if m else None
+                if entry is not None:
+                    prior, complete = entry
+            if prior is not None and not self._in_window(prior, idx):
+                # Known from an earlier fetch to fall outside the window
+                self.slots.append(None)
+                continue
+            if not complete:
+                # Only its date was kept (it was outside an earlier run's window)
+                prior = None
+            self.slots.append(prior)
+            if prior is None:
+                todo.append(idx)
+                continue
+            self.restored += 1
+            if self.checkpoint and self.checkpoint.was_emitted(self.page_url, link):
+                continue  # already in the output a resumed run appends to
+            if self.on_record:
+                self.on_record(prior)
+            if self.checkpoint:
+                self.checkpoint.add_reel(link, prior, self.page_url)
+        return todo
+
+    def finish(self, idx: int, record: Optional[ReelRecord]) -> None:
+        if record is not None and not self._in_window(record, idx):
+            if self.seen is not None:
+                self.seen.put(record, complete=False)
+            record = None
+        self.slots[idx] = record
+        if record is None:
+            return
+        if self.seen is not None:
+            self.seen.put(record)
+        # Emitted before it is checkpointed: a crash in between repeats the record rather than losing it
+        if self.on_record:
+            self.on_record(record)
+        if self.checkpoint:
+            self.checkpoint.add_reel(self.reel_links[idx], record, self.page_url)
+
+    def records(self) -> List[ReelRecord]:
+        return [r for r in self.slots if r is not None]
+
+    def finished(self) -> List[ReelRecord]:
+        """
+        Log what discovery turned up for the page and return its records.
+        """
+        logging.info("Found %d candidate reels on %s", len(self.reel_links), self.page_url)
+        if self.seen is not None:
+            logging.info("%d of %d reels on %s are fresh in the index", self.restored, len(self.reel_links), self.page_url)
+        return self.records()
+
+def _if_wanted(page: _PageReels, idx: int, fn: Callable[..., Any], *args: Any) -> Any:
+    # Runs on a fetch thread: skip links the page's window cutoff made unnecessary while queued
+    return fn(*args) if page.wanted(idx) else None
+
+def scrape_page(
+    session: requests.Session,
+    page_url: str,
+    max_reels: Optional[int],
+    concurrency: int = 1,
+    progress: bool = True,
+    parse_pool: Optional[ParsePool] = None,
+    seen: Optional[SeenIndex] = None,
+    on_record: Optional[Callable[[ReelRecord], None]] = None,
+    checkpoint: Optional[Checkpoint] = None,
+    frontier: Optional[ReelFrontier] = None,
+    max_discovery_pages: int = 50,
+    follow_reels_tab: bool = True,
+    follow_cursors: bool = False,
+    window: Optional[DateWindow] = None,
+    window_stop_after: int = 3,
+) -> List[ReelRecord]:
+    """
+    Given a public page URL, discover reel links on the page, its Reels tab and their
+    continuation links, then fetch and parse each reel. Links are fetched as soon as
+    they are discovered; discovery stops once `max_reels` reels were found.
+    With `concurrency` > 1 reels are fetched by a thread pool; with a `parse_pool` the fetched
+    HTML is parsed in worker processes. Records keep the discovery order either way.
+    With a `seen` index, reels fetched within its refresh window are not fetched again;
+    their stored records are returned in place.
+    `on_record` is called with each record as soon as it is ready (completion order).
+    Reels already recorded in `checkpoint` are restored from it instead of fetched.
+    With a shared `frontier`, reels claimed by another page are skipped here.
+    Only reels published within `window` are kept; discovery stops after `window_stop_after`
+    reels older than it.
+    """
+    discovery = ReelDiscovery(page_url, max_reels, frontier, max_discovery_pages, follow_reels_tab, follow_cursors)
+    page = _PageReels(page_url, seen, checkpoint, on_record, window, discovery, window_stop_after)
+    finish = page.finish
+
+    with progress_bar(total=0, desc="Reels", leave=False, disable=not progress) as bar:
+        if parse_pool is None and concurrency <= 1:
+            for links in _discover(session, discovery):
+                todo = page.add(links)
+                bar.total += len(todo)
+                for idx in todo:
+                    finish(idx, fetch_and_parse_reel(session, page.reel_links[idx], window) if page.wanted(idx) else None)
+                    bar.update(1)
+            return page.finished()
+
+        index: Dict[Future, int] = {}
+        pending: Set[Future] = set()
+
+        def harvest(timeout: Optional[float]) -> None:
+            nonlocal pending
+            # Fetch futures may resolve to parse futures; keep waiting on both kinds
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for fut in done:
+                idx = index.pop(fut)
+                try:
+                    result: Union[None, ReelRecord, Future] = fut.result()
+                except Exception as e:
+                    logging.warning("Reel failed %s: %s", page.reel_links[idx], e)
+                    result = None
+                if isinstance(result, Future):
+                    index[result] = idx
+                    pending.add(result)
+                    continue
+                finish(idx, result)
+                bar.update(1)
+
+        backlog = 2 * max(1, concurrency)
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            for links in _discover(session, discovery):
+                todo = page.add(links)
+                bar.total += len(todo)
+                for idx in todo:
+                    link = page.reel_links[idx]
+                    if parse_pool is not None:
+                        fut = pool.submit(_if_wanted, page, idx, _fetch_for_parse_pool, session, link, parse_pool, window)
+                    else:
+                        fut = pool.submit(_if_wanted, page, idx, fetch_and_parse_reel, session, link, window)
+                    index[fut] = idx
+                    pending.add(fut)
+                # Let fetches catch up before discovering more, so a date cutoff can stop discovery
+                while len(pending) > backlog:
+                    harvest(None)
+            while pending:
+                harvest(None)
+    return page.finished()
+
+async def _parse_async(
+    html: str, link: str, parse_pool: Optional[ParsePool], window: Optional[DateWindow] = None
+) -> Optional[ReelRecord]:
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    if parse_pool is None:
+        return await loop.run_in_executor(None, parse_reel_record, html, link, window)
+    # submit() blocks while the parse queue is full, so keep it off the event loop
+    fut = await loop.run_in_executor(None, parse_pool.submit, html, link, window)
+    return await asyncio.wrap_future(fut)
+
+async def scrape_page_async(
+    fetcher: "AsyncFetcher",
+    page_url: str,
+    max_reels: Optional[int],
+    concurrency: int = 1,
+    parse_pool: Optional[ParsePool] = None,
+    seen: Optional[SeenIndex] = None,
+    on_record: Optional[Callable[[ReelRecord], None]] = None,
+    checkpoint: Optional[Checkpoint] = None,
+    frontier: Optional[ReelFrontier] = None,
+    max_discovery_pages: int = 50,
+    follow_reels_tab: bool = True,
+    follow_cursors: bool = False,
+    window: Optional[DateWindow] = None,
+    window_stop_after: int = 3,
+) -> List[ReelRecord]:
+    """
+    asyncio version of `scrape_page`: up to `concurrency` reels of the page are in flight
+    at once on the fetcher's pooled connections. Parsing runs in the default thread pool,
+    or in `parse_pool` when given.
+    """
+    # asyncio is only imported with the httpx transport, keeping it off the startup path
+    import asyncio
+
+    discovery = ReelDiscovery(page_url, max_reels, frontier, max_discovery_pages, follow_reels_tab, follow_cursors)
+    page = _PageReels(page_url, seen, checkpoint, on_record, window, discovery, window_stop_after)
+    sem = asyncio.Semaphore(max(1, concurrency))
+    loop = asyncio.get_running_loop()
+    # add/finish write the seen index, checkpoint and output; run them in the default thread
+    # pool, one at a time per page as on the threaded path, so the event loop never waits on disk
+    page_lock = asyncio.Lock()
+
+    async def bookkeeping(fn: Callable[..., Any], *args: Any) -> Any:
+        async with page_lock:
+            return await loop.run_in_executor(None, fn, *args)
+
+    async def one(idx: int) -> None:
+        link = page.reel_links[idx]
+        record = None
         try:
-            record = parse_reel_html(html, link)
-            # Enrich with normalized dates if present
-            if record.get("reelDateTime"):
-                record["reelDateTime"] = normalize_datetime(record["reelDateTime"])
-            elif record.get("reelDate"):
-                record["reelDate"] = normalize_datetime(record["reelDate"], date_only=True)
-            results.append(record)
+            async with sem:
+                html = await fetcher.fetch(link, _reel_stop(fetcher, link, window)) if page.wanted(idx) else None
+            if html:
+                record = await _parse_async(html, link, parse_pool, window)
         except Exception as e:
-            logging.debug("Parse failure for %s: %s", link, e)
-            continue
-    return results
+            logging.warning("Reel failed %s: %s", link, e)
+        await bookkeeping(page.finish, idx, record)
+
+    pending: Set["asyncio.Task[None]"] = set()
+    async for links in _discover_async(fetcher, discovery):
+        todo = await bookkeeping(page.add, links)
+        pending.update(asyncio.ensure_future(one(idx)) for idx in todo)
+        # Let fetches catch up before discovering more, so a date cutoff can stop discovery
+        while len(pending) > 2 * max(1, concurrency):
+            _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    if pending:
+        await asyncio.wait(pending)
+    return page.finished()
+
+async def _scrape_targets_async(
+    fetcher: "AsyncFetcher",
+    targets: List[Dict[str, Any]],
+    page_workers: int,
+    page_done: Callable[[str, List[ReelRecord]], None],
+    **page_kwargs: Any,
+) -> None:
+    import asyncio
+
+    sem = asyncio.Semaphore(page_workers)
+
+    async def one(target: Dict[str, Any]) -> None:
+        async with sem:
+            try:
+                page_records = await scrape_page_async(
+                    fetcher, target["url"], target.get("maxReels"), window=target.get("window"), **page_kwargs
+                )
+                page_done(target["url"], page_records)
+            except Exception as e:
+                logging.error("Page failed %s: %s", target["url"], e)
+        bar.update(1)
+
+    try:
+        with progress_bar(total=len(targets), desc="Pages") as bar:
+            await asyncio.gather(*(one(t) for t in targets))
+    finally:
+        await fetcher.aclose()
+
+def _window_payload(window: Optional[DateWindow]) -> Dict[str, Optional[str]]:
+    # Absolute bounds, so every worker applies the same window whatever "7d" means on its clock
+    return {
+        "since": window.since.isoformat() if window and window.since else None,
+        "until": window.until.isoformat() if window and window.until else None,
+    }
+
+def enqueue_targets(queue: WorkQueue, targets: List[Dict[str, Any]]) -> int:
+    """
+    Queue a page task per target and seal the queue; returns how many were new.
+    """
+    added = 0
+    for target in targets:
+        payload = {"url": target["url"], "maxReels": target.get("maxReels"), **_window_payload(target.get("window"))}
+        added += queue.enqueue("page", target["url"], payload)
+    queue.seal()
+    return added
+
+def wait_for_queue(queue: WorkQueue, poll_sec: float = 2.0) -> Dict[str, int]:
+    """
+    Block until every queued task is done or failed; returns the final task counts.
+    """
+    with progress_bar(total=0, desc="Tasks") as bar:
+        while True:
+            counts = queue.counts()
+            bar.total = sum(counts.values())
+            bar.n = counts["done"] + counts["failed"]
+            bar.refresh()
+            if counts["queued"] == 0 and counts["leased"] == 0:
+                return counts
+            time.sleep(poll_sec)
+
+def _work_page(
+    session: requests.Session,
+    queue: WorkQueue,
+    task: Task,
+    owner: str,
+    max_discovery_pages: int,
+    follow_reels_tab: bool,
+    follow_cursors: bool = False,
+) -> None:
+    payload = task.payload
+    frontier = QueueFrontier(queue, {"since": payload.get("since"), "until": payload.get("until")})
+    discovery = ReelDiscovery(
+        payload["url"], payload.get("maxReels"), frontier, max_discovery_pages, follow_reels_tab, follow_cursors
+    )
+    for links in _discover(session, discovery):
+        # The links are already queued for any worker; just keep this lease alive
+        logging.info("Queued %d reels from %s", len(links), payload["url"])
+        queue.extend(task, owner)
+
+def _work_reel(session: requests.Session, task: Task, seen: Optional[SeenIndex]) -> Optional[ReelRecord]:
+    payload = task.payload
+    window = DateWindow.from_settings(payload.get("since"), payload.get("until"))
+    entry = seen.fresh_entry(task.key) if seen is not None else None
+    # An incomplete entry only tells that the reel was outside an earlier window
+    if entry is not None and (entry[1] or (window is not None and window.record_position(entry[0]) != 0)):
+        record = entry[0]
+    else:
+        record = fetch_and_parse_reel(session, payload["url"], window)
+        if record is None:
+            raise RuntimeError("fetch or parse failed")
+        if seen is not None:
+            seen.put(record, complete=window is None or window.record_position(record) == 0)
+    if window is not None and window.record_position(record) != 0:
+        METRICS.inc("window.skipped")
+        return None
+    return record
+
+def work_queue_tasks(
+    session: requests.Session,
+    queue: WorkQueue,
+    worker_id: str,
+    threads: int = 1,
+    seen: Optional[SeenIndex] = None,
+    poll_sec: float = 2.0,
+    max_discovery_pages: int = 50,
+    follow_reels_tab: bool = True,
+    follow_cursors: bool = False,
+) -> int:
+    """
+    Worker mode: lease page and reel tasks from `queue` on `threads` threads until the
+    coordinator has sealed the queue and nothing is left queued or leased. Page tasks run
+    discovery and queue their reels; reel tasks store their record in the queue.
+    A task that raises is returned to the queue for another attempt. A worker started on
+    a queue whose run is already finished waits for a coordinator to start the next one.
+    Returns the number of tasks this worker completed.
+    """
+    finished = queue.sealed() and queue.drained()
+    finished_run = queue.run_id()
+    if finished:
+        logging.info("Queue %s holds a finished run; waiting for a coordinator to start a new one", queue.path)
+
+    def loop(n: int) -> int:
+        owner = f"{worker_id}/{n}"
+        completed = 0
+        while True:
+            task = queue.lease(owner)
+            if task is None:
+                if queue.sealed() and queue.drained() and not (finished and queue.run_id() == finished_run):
+                    return completed
+                time.sleep(poll_sec)
+                continue
+            try:
+                if task.kind == "page":
+                    _work_page(session, queue, task, owner, max_discovery_pages, follow_reels_tab, follow_cursors)
+                    record = None
+                else:
+                    record = _work_reel(session, task, seen)
+            except Exception as e:
+                logging.warning("Task %s %s failed (attempt %d): %s", task.kind, task.key, task.attempts, e)
+                METRICS.inc("queue.tasks_failed")
+                queue.fail(task, owner, str(e))
+                continue
+            queue.complete(task, owner, record)
+            METRICS.inc(f"queue.{task.kind}_tasks")
+            completed += 1
+
+    with ThreadPoolExecutor(max_workers=max(1, threads)) as pool:
+        return sum(pool.map(loop, range(max(1, threads))))
+
+def _after_poll(
+    state: ReelState,
+    record: Optional[ReelRecord],
+    schedule: PollSchedule,
+    window: Optional[DateWindow],
+    deltas: DeltaLog,
+    now: float,
+) -> ReelState:
+    # New state of a polled reel; appends its counter changes to `deltas`
+    if record is None:
+        METRICS.inc("monitor.poll_errors")
+        return state._replace(next_poll=schedule.next_poll(state, now))
+    published = published_at(record) or state.published_at
+    if window is not None and window.record_position(record) != 0:
+        METRICS.inc("window.skipped")
+        return state._replace(published_at=published, polled_at=now, next_poll=None)
+    changes = counter_changes(state.counters, record)
+    if changes:
+        deltas.write(state.reel_id, now, changes)
+        METRICS.inc("monitor.deltas")
+    state = state._replace(
+        published_at=published,
+        polled_at=now,
+        unchanged=0 if changes else state.unchanged + 1,
+        counters={**state.counters, **changes},
+    )
+    return state._replace(next_poll=schedule.next_poll(state, now))
+
+def monitor_targets(
+    session: requests.Session,
+    targets: List[Dict[str, Any]],
+    store: MonitorStore,
+    deltas: DeltaLog,
+    schedule: PollSchedule,
+    threads: int = 1,
+    page_interval: float = 3600,
+    discovery_pages: int = 2,
+    follow_reels_tab: bool = True,
+    follow_cursors: bool = False,
+    max_cycles: Optional[int] = None,
+    stop: Optional[threading.Event] = None,
+    on_cycle: Optional[Callable[[], None]] = None,
+) -> int:
+    """
+    Monitor mode: every `page_interval` seconds, look for new reels in the first
+    `discovery_pages` responses of each target page (where new reels show up), and poll
+    every tracked reel when `schedule` says it is due, on `threads` threads, appending
+    its counter changes to `deltas`. Reels outside a target's since/until window are
+    dropped after their first poll. Runs until `stop` is set or `max_cycles` cycles are
+    done; returns the number of reel polls.
+    """
+    stop = stop or threading.Event()
+    windows = {t["url"]: t.get("window") for t in targets}
+    # Reels tracked before a restart are not new to any page
+    frontier = ReelFrontier()
+    for state in store.reels.values():
+        frontier.claim(state.page, [state.url])
+    polls = cycles = 0
+    with ThreadPoolExecutor(max_workers=max(1, threads)) as pool:
+        while not stop.is_set():
+            now = time.time()
+            for target in targets:
+                if stop.is_set() or not store.page_due(target["url"], now):
+                    continue
+                discovery = ReelDiscovery(
+                    target["url"], target.get("maxReels"), frontier, discovery_pages, follow_reels_tab, follow_cursors
+                )
+                for links in _discover(session, discovery):
+                    added = sum(store.add(reel_key(link), link, target["url"], now) for link in links)
+                    logging.info("Tracking %d new reels from %s", added, target["url"])
+                    METRICS.inc("monitor.reels_added", added)
+                store.set_page(target["url"], now + page_interval)
+
+            futures = {pool.submit(fetch_and_parse_reel, session, state.url): state for state in store.due(now)}
+            for fut in as_completed(futures):
+                state = futures[fut]
+                if stop.is_set():
+                    # Shutting down: polls not started yet keep their schedule
+                    for pending in futures:
+                        pending.cancel()
+                if fut.cancelled():
+                    store.put(state)
+                    continue
+                try:
+                    record = fut.result()
+                except Exception as e:
+                    logging.warning("Poll failed %s: %s", state.url, e)
+                    record = None
+                store.put(_after_poll(state, record, schedule, windows.get(state.page), deltas, time.time()))
+                METRICS.inc("monitor.polls")
+                polls += 1
+            store.commit()
+            deltas.flush()
+            cycles += 1
+            if on_cycle:
+                on_cycle()
+            if max_cycles and cycles >= max_cycles:
+                break
+            wake = store.next_due()
+            stop.wait(page_interval if wake is None else min(page_interval, max(1.0, wake - time.time())))
+    return polls
 
 def validate_page_url(url: str) -> bool:
     parsed = urlparse(url)
@@ -135,6 +862,15 @@ def run(
     settings_path: Optional[str],
     output_path: Optional[str],
     verbosity: int,
+    concurrency: Optional[int] = None,
+    page_concurrency: Optional[int] = None,
+    parse_workers: Optional[int] = None,
+    cache_only: bool = False,
+    incremental: bool = False,
+    resume: bool = False,
+    role: str = "standalone",
+    queue_path: Optional[str] = None,
+    worker_id: Optional[str] = None,
 ) -> int:
     setup_logging(verbosity)
 
@@ -142,14 +878,101 @@ def run(
     settings = {
         "userAgent": None,
         "timeoutSec": 25,
+        "download": {
+            "maxBytes": 16 * 1024 * 1024,  # per response body; longer bodies are cut off here
+            "earlyStop": True,  # stop downloading a page once its fields / needed links are in
+        },
         "useProxies": False,
         "proxies": [],  # list of strings or dicts
+        "proxyRotation": "least_loaded",  # least_loaded|round_robin|off
+        "proxyQuarantineSec": 60,
         "output": {
-            "format": "json",  # json|csv|excel|html
+            "format": "json",  # json|ndjson|csv|excel|html|parquet|feather
             "path": "data/output.json",
+            "stream": False,  # write ndjson/csv rows as each reel is parsed
+            "append": False,  # append to an existing streamed file instead of truncating
+            "rowGroupSize": 50_000,  # rows per Parquet row group / Feather batch
+        },
+        "checkpoint": {
+            "enabled": True,  # needed for --resume; removed after a successful run
+            "path": "data/.state/checkpoint.jsonl",
         },
         "maxReelsPerPage": None,
+        "since": None,  # only keep reels published at/after this (date, datetime or age like "7d")
+        "until": None,  # only keep reels published at/before this
+        "windowStopAfter": 3,  # reels older than `since` seen before a page's discovery stops
+        "discovery": {
+            "followReelsTab": True,  # also crawl the page's /reels/ tab
+            # Follow end_cursor values as ?cursor= URLs; page HTML ignores the query, so this
+            # mostly refetches pages already seen
+            "followCursors": False,
+            "maxPages": 50,  # page, tab and continuation responses fetched per target
+        },
+        "frontier": {
+            "enabled": True,  # fetch each reel once across all pages (keyed by reelId)
+            "referrersPath": "data/reel_pages.json",  # reelId -> pages linking to it (None to skip)
+        },
+        "cache": {
+            "enabled": False,
+            "path": "data/.cache/http.sqlite",
+            "ttlSec": 3600,
+            "maxBytes": 512 * 1024 * 1024,
+            "cacheOnly": False,  # serve only from cache, never touch the network
+        },
+        "incremental": {
+            "enabled": False,
+            "path": "data/.state/seen.sqlite",
+            "refreshAfterHours": 24,  # re-fetch reels whose metrics are older than this
+        },
         "timezone": "Asia/Karachi",
+        "parserEngine": "auto",  # auto|lxml|bs4
+        "concurrency": 1,  # parallel reel fetches per page (1 = sequential)
+        "maxPerHost": 4,  # cap on in-flight requests to a single host
+        "pageConcurrency": 1,  # pages scraped at the same time (1 = sequential)
+        "maxInFlight": None,  # global request budget shared by all pages (None = no cap)
+        "transport": "requests",  # requests (thread pool) | httpx (asyncio, HTTP/2)
+        "httpx": {
+            "http2": True,
+            "maxConnections": 100,  # per client; each proxy gets its own client
+            "maxKeepalive": 20,
+        },
+        "rateLimit": {
+            "enabled": True,
+            "requestsPerSec": 2.0,  # starting rate per host, adapted as responses come in
+            "burst": 4,
+            "minPerSec": 0.2,
+            "maxPerSec": 8.0,
+        },
+        "retries": {
+            "max": 3,
+            "backoffBaseSec": 1.0,
+            "backoffMaxSec": 30.0,
+        },
+        "metrics": {
+            "summaryPath": "data/run_summary.json",  # JSON run summary (None to skip)
+            "prometheusPath": None,  # Prometheus text file, rewritten at the end of the run
+            "prometheusPort": None,  # serve /metrics over HTTP while the run is going
+            "prometheusHost": "127.0.0.1",  # address /metrics is served on ("0.0.0.0" for every interface)
+        },
+        "parseWorkers": 0,  # parser processes (0 = parse on the fetch threads)
+        "parseQueueSize": None,  # fetched pages waiting for a parser (None = 2 x parseWorkers)
+        "monitor": {
+            "statePath": "data/.state/monitor.sqlite",  # tracked reels and their last counters
+            "deltasPath": "data/deltas.ndjson",  # appended counter changes (-o overrides)
+            "pageIntervalSec": 3600,  # how often each input page is checked for new reels
+            "discoveryPages": 2,  # page / tab / continuation responses read per check
+            "minIntervalSec": 900,  # reel poll interval bounds; it grows with reel age ...
+            "maxIntervalSec": 86400,
+            "ageFactor": 0.1,  # ... as ageFactor x age, doubled per poll without a change
+            "retireAfterDays": 30,  # stop polling reels older than this (None = never)
+            "maxCycles": None,  # stop after this many poll cycles (None = run until stopped)
+        },
+        "queue": {
+            "path": "data/.state/queue.sqlite",  # shared by the coordinator and every worker
+            "leaseSec": 300,  # a leased task not finished within this goes back to the queue
+            "maxAttempts": 3,
+            "pollSec": 2.0,
+        },
     }
     if settings_path and os.path.exists(settings_path):
         user_settings = load_json(settings_path)
@@ -160,18 +983,122 @@ def run(
     # Output configuration
     if output_path:
         settings["output"]["path"] = output_path  # type: ignore[index]
+    if concurrency is not None:
+        settings["concurrency"] = concurrency
+    if page_concurrency is not None:
+        settings["pageConcurrency"] = page_concurrency
+    if parse_workers is not None:
+        settings["parseWorkers"] = parse_workers
+    workers = max(1, int(settings.get("concurrency") or 1))
+    page_workers = max(1, int(settings.get("pageConcurrency") or 1))
 
     # Prepare session + proxies
     pm = ProxyManager(settings.get("proxies", [])) if settings.get("useProxies") else None
-    proxies = pm.get_requests_proxies() if pm else None
+    rotation = (settings.get("proxyRotation") or "off").lower()
+    rotate = bool(pm and pm.raw and rotation != "off")
+    proxies = pm.get_requests_proxies() if pm and not rotate else None
+    pool_size = max(10, workers * page_workers)
     session = build_session(
         user_agent=settings.get("userAgent"),
         timeout=settings.get("timeoutSec", 25),
         proxies=proxies,
+        pool_size=pool_size,
+        max_per_host=settings.get("maxPerHost") if workers * page_workers > 1 else None,
+        max_in_flight=settings.get("maxInFlight"),
+    )
+    download_cfg = settings.get("download") or {}
+    max_body_bytes = int(download_cfg["maxBytes"]) if download_cfg.get("maxBytes") else None
+    early_stop = bool(download_cfg.get("earlyStop", True))
+    session.max_body_bytes = max_body_bytes  # type: ignore[attr-defined]
+    session.early_stop = early_stop  # type: ignore[attr-defined]
+    transport = (settings.get("transport") or "requests").lower()
+    if role != "standalone" and transport != "requests":
+        # Workers, coordinators and the monitor fetch with the requests session
+        logging.info("%s mode fetches with the requests transport", role.capitalize())
+        transport = "requests"
+    if rotate and transport != "httpx":
+        # One pooled session per proxy; fetch_url picks an exit for every request
+        session.proxy_pool = pm.build_pool(  # type: ignore[attr-defined, union-attr]
+            lambda p: build_session(
+                user_agent=settings.get("userAgent"),
+                timeout=settings.get("timeoutSec", 25),
+                proxies=p,
+                pool_size=pool_size,
+            ),
+            strategy=rotation,
+            quarantine_sec=float(settings.get("proxyQuarantineSec") or 60),
+        )
+
+    rate_cfg = settings.get("rateLimit") or {}
+    if rate_cfg.get("enabled", True):
+        session.rate_limiter = AdaptiveRateLimiter(  # type: ignore[attr-defined]
+            rate=rate_cfg.get("requestsPerSec", 2.0),
+            burst=rate_cfg.get("burst", 4),
+            min_rate=rate_cfg.get("minPerSec", 0.2),
+            max_rate=rate_cfg.get("maxPerSec", 8.0),
+        )
+    retry_cfg = settings.get("retries") or {}
+    session.retry_policy = RetryPolicy(  # type: ignore[attr-defined]
+        max_retries=retry_cfg.get("max", 3),
+        backoff_base=retry_cfg.get("backoffBaseSec", 1.0),
+        backoff_max=retry_cfg.get("backoffMaxSec", 30.0),
     )
 
+    cache_cfg = settings.get("cache") or {}
+    # A monitor needs current counters, so it never answers from the cache
+    if role != "monitor" and (cache_only or cache_cfg.get("enabled") or cache_cfg.get("cacheOnly")):
+        session.cache = ResponseCache(  # type: ignore[attr-defined]
+            cache_cfg.get("path", "data/.cache/http.sqlite"),
+            ttl_sec=cache_cfg.get("ttlSec", 3600),
+            max_bytes=cache_cfg.get("maxBytes", 512 * 1024 * 1024),
+            cache_only=cache_only or bool(cache_cfg.get("cacheOnly")),
+        )
+
+    if early_stop and getattr(session, "cache", None) is not None:
+        # Cut-off pages are not cached; with a cache, download whole pages so they can be
+        logging.info("Early download stop is off while the response cache is enabled")
+        early_stop = False
+        session.early_stop = False  # type: ignore[attr-defined]
+
+    fetcher: Optional[AsyncFetcher] = None
+    if transport == "httpx":
+        from extractors.async_transport import AsyncFetcher
+
+        httpx_cfg = settings.get("httpx") or {}
+        fetcher = AsyncFetcher(
+            session.headers["User-Agent"],
+            timeout=settings.get("timeoutSec", 25),
+            http2=bool(httpx_cfg.get("http2", True)),
+            max_connections=int(httpx_cfg.get("maxConnections") or 100),
+            max_keepalive=int(httpx_cfg.get("maxKeepalive") or 20),
+            max_per_host=settings.get("maxPerHost") or 4,
+            max_in_flight=settings.get("maxInFlight"),
+            cache=getattr(session, "cache", None),
+            rate_limiter=getattr(session, "rate_limiter", None),
+            retry_policy=getattr(session, "retry_policy", None),
+            proxy=proxies["http"] if proxies else None,
+            max_body_bytes=max_body_bytes,
+            early_stop=early_stop,
+        )
+        if rotate:
+            fetcher.proxy_pool = pm.build_pool(  # type: ignore[union-attr]
+                lambda p: fetcher.client(p["http"]),  # type: ignore[union-attr]
+                strategy=rotation,
+                quarantine_sec=float(settings.get("proxyQuarantineSec") or 60),
+            )
+    elif transport != "requests":
+        logging.warning("Unknown transport '%s', using requests", transport)
+    proxy_pool: Optional[ProxyPool] = fetcher.proxy_pool if fetcher else getattr(session, "proxy_pool", None)
+
+    metrics_cfg = settings.get("metrics") or {}
+    METRICS.reset()
+    if metrics_cfg.get("prometheusPort"):
+        METRICS.serve_prometheus(int(metrics_cfg["prometheusPort"]), metrics_cfg.get("prometheusHost") or "127.0.0.1")
+
     # Timezone for normalization
     os.environ["SCRAPER_TZ"] = settings.get("timezone") or "Asia/Karachi"
+    # Parser engine for reel pages (read by parse_reel_html)
+    os.environ["SCRAPER_PARSER"] = settings.get("parserEngine") or "auto"
 
     # Read input
     if not os.path.exists(input_path):
@@ -179,59 +1106,331 @@ def run(
         return 1
     inputs = load_json(input_path)
 
-    # Inputs may be list of page URLs or objects with {url, maxReels}
+    # Inputs may be list of page URLs or objects with {url, maxReels, since, until}
+    def target_of(item: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "url": item["url"],
+            "maxReels": item.get("maxReels", settings.get("maxReelsPerPage")),
+            "since": item.get("since", settings.get("since")),
+            "until": item.get("until", settings.get("until")),
+        }
+
     targets: List[Dict[str, Any]] = []
     if isinstance(inputs, list):
         for item in inputs:
             if isinstance(item, str):
-                targets.append({"url": item, "maxReels": settings.get("maxReelsPerPage")})
+                targets.append(target_of({"url": item}))
             elif isinstance(item, dict) and item.get("url"):
-                targets.append({"url": item["url"], "maxReels": item.get("maxReels", settings.get("maxReelsPerPage"))})
+                targets.append(target_of(item))
     elif isinstance(inputs, dict) and "pages" in inputs:
         for p in inputs["pages"]:
             if isinstance(p, str):
-                targets.append({"url": p, "maxReels": settings.get("maxReelsPerPage")})
+                targets.append(target_of({"url": p}))
             elif isinstance(p, dict) and p.get("url"):
-                targets.append({"url": p["url"], "maxReels": p.get("maxReels", settings.get("maxReelsPerPage"))})
+                targets.append(target_of(p))
 
     # Validate and scrape
-    all_records: List[Dict[str, Any]] = []
+    valid_targets: List[Dict[str, Any]] = []
     for target in targets:
-        url = target["url"]
-        if not validate_page_url(url):
-            logging.warning("Skipping invalid URL: %s", url)
+        if not validate_page_url(target["url"]):
+            logging.warning("Skipping invalid URL: %s", target["url"])
+            continue
+        try:
+            target["window"] = DateWindow.from_settings(target["since"], target["until"])
+        except ValueError as e:
+            logging.warning("Skipping %s: %s", target["url"], e)
             continue
-        page_records = scrape_page(session, url, target.get("maxReels"))
-        all_records.extend(page_records)
+        valid_targets.append(target)
 
-    # Export
+    inc_cfg = settings.get("incremental") or {}
+    seen: Optional[SeenIndex] = None
+    # Only roles that fetch reels consult the index; a coordinator's workers open their own
+    if role in ("standalone", "worker") and (incremental or inc_cfg.get("enabled")):
+        seen = SeenIndex(
+            inc_cfg.get("path", "data/.state/seen.sqlite"),
+            refresh_after_sec=float(inc_cfg.get("refreshAfterHours", 24)) * 3600,
+        )
+
+    discovery_cfg = settings.get("discovery") or {}
+    queue: Optional[WorkQueue] = None
+    if role in ("coordinator", "worker"):
+        queue_cfg = settings.get("queue") or {}
+        queue = WorkQueue(
+            queue_path or queue_cfg.get("path", "data/.state/queue.sqlite"),
+            lease_sec=float(queue_cfg.get("leaseSec") or 300),
+            max_attempts=int(queue_cfg.get("maxAttempts") or 3),
+        )
+        poll_sec = float(queue_cfg.get("pollSec") or 2.0)
+
+    if role == "worker":
+        worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        try:
+            completed = work_queue_tasks(
+                session,
+                queue,  # type: ignore[arg-type]
+                worker_id,
+                threads=workers,
+                seen=seen,
+                poll_sec=poll_sec,
+                max_discovery_pages=int(discovery_cfg.get("maxPages") or 50),
+                follow_reels_tab=bool(discovery_cfg.get("followReelsTab", True)),
+                follow_cursors=bool(discovery_cfg.get("followCursors")),
+            )
+        finally:
+            queue.close()  # type: ignore[union-attr]
+            if seen is not None:
+                seen.close()
+        if metrics_cfg.get("summaryPath"):
+            # One summary per worker next to the coordinator's, e.g. run_summary.host-123.json
+            root, ext = os.path.splitext(metrics_cfg["summaryPath"])
+            METRICS.write_summary(f"{root}.{worker_id}{ext}", queue=queue.path, worker=worker_id)  # type: ignore[union-attr]
+        print(f"✅ Done. Worker {worker_id} completed {completed} tasks")
+        return 0
+
+    if role == "monitor":
+        mon_cfg = settings.get("monitor") or {}
+        store = MonitorStore(mon_cfg.get("statePath", "data/.state/monitor.sqlite"))
+        deltas = DeltaLog(output_path or mon_cfg.get("deltasPath", "data/deltas.ndjson"))
+        retire_days = mon_cfg.get("retireAfterDays", 30)
+        schedule = PollSchedule(
+            min_sec=float(mon_cfg.get("minIntervalSec") or 900),
+            max_sec=float(mon_cfg.get("maxIntervalSec") or 86400),
+            age_factor=float(mon_cfg.get("ageFactor", 0.1)),
+            retire_after_sec=float(retire_days) * 86400 if retire_days else None,
+        )
+        stop = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stop.set())
+
+        def on_cycle() -> None:
+            logging.info("Tracking %d reels (%d active), %d delta lines written", len(store.reels), store.active(), deltas.count)
+            if metrics_cfg.get("prometheusPath"):
+                METRICS.write_prometheus(metrics_cfg["prometheusPath"])
+
+        logging.info("Monitoring %d pages, %d reels already tracked in %s", len(valid_targets), len(store.reels), store.path)
+        try:
+            polls = monitor_targets(
+                session,
+                valid_targets,
+                store,
+                deltas,
+                schedule,
+                threads=workers,
+                page_interval=float(mon_cfg.get("pageIntervalSec") or 3600),
+                discovery_pages=int(mon_cfg.get("discoveryPages") or 2),
+                follow_reels_tab=bool(discovery_cfg.get("followReelsTab", True)),
+                follow_cursors=bool(discovery_cfg.get("followCursors")),
+                max_cycles=mon_cfg.get("maxCycles"),
+                stop=stop,
+                on_cycle=on_cycle,
+            )
+        finally:
+            store.close()
+            deltas.close()
+        if metrics_cfg.get("summaryPath"):
+            METRICS.write_summary(
+                metrics_cfg["summaryPath"], input=input_path, state=store.path, deltas=deltas.path, trackedReels=len(store.reels)
+            )
+        print(f"✅ Done. {polls} polls, {deltas.count} delta lines appended to: {deltas.path}")
+        return 0
+
+    # Parser processes are forked after the environment above is set
+    parse_pool: Optional[ParsePool] = None
+    if role == "standalone" and settings.get("parseWorkers"):
+        parse_pool = ParsePool(settings["parseWorkers"], settings.get("parseQueueSize"))
+
+    ckpt_cfg = settings.get("checkpoint") or {}
+    checkpoint: Optional[Checkpoint] = None
+    # The queue keeps a coordinator's progress, so it needs no checkpoint
+    if role == "standalone" and (resume or ckpt_cfg.get("enabled", True)):
+        checkpoint = Checkpoint(
+            ckpt_cfg.get("path", "data/.state/checkpoint.jsonl"),
+            os.path.abspath(input_path),
+            resume=resume,
+        )
+
+    # Output configuration; streaming formats write each record as it is parsed
     out_cfg = settings["output"]  # type: ignore[assignment]
     exporter = Exporter()
     out_path = out_cfg.get("path", "data/output.json")
     fmt = out_cfg.get("format", "json").lower()
-    logging.info("Exporting %d records to %s (%s)", len(all_records), out_path, fmt)
-
-    if fmt == "json":
-        exporter.to_json(all_records, out_path)
-    elif fmt == "csv":
-        exporter.to_csv(all_records, out_path)
-    elif fmt == "excel":
-        exporter.to_excel(all_records, out_path)
-    elif fmt == "html":
-        exporter.to_html(all_records, out_path, title="Facebook Reel Scraper Results")
+    streaming = fmt == "ndjson" or (bool(out_cfg.get("stream")) and fmt in STREAM_FORMATS)
+    if out_cfg.get("stream") and fmt not in STREAM_FORMATS:
+        logging.warning("Streaming is only supported for %s; buffering '%s' output", "/".join(STREAM_FORMATS), fmt)
+    # A resumed stream continues the file it was writing; what was emitted before is already in it
+    resumed = checkpoint.resumed if checkpoint and streaming else 0
+    append = bool(out_cfg.get("append")) or bool(resumed)
+    stream = exporter.open_stream(out_path, fmt, append=append) if streaming else None
+    sample: List[ReelRecord] = []
+
+    def on_record(record: ReelRecord) -> None:
+        stream.write(record)  # type: ignore[union-attr]
+        if len(sample) < 2:
+            sample.append(record)
+
+    frontier_cfg = settings.get("frontier") or {}
+    frontier = ReelFrontier() if frontier_cfg.get("enabled", True) else None
+
+    page_kwargs: Dict[str, Any] = {
+        "frontier": frontier,
+        "max_discovery_pages": int(discovery_cfg.get("maxPages") or 50),
+        "follow_reels_tab": bool(discovery_cfg.get("followReelsTab", True)),
+        "follow_cursors": bool(discovery_cfg.get("followCursors")),
+        "window_stop_after": int(settings.get("windowStopAfter") or 3),
+        "concurrency": workers,
+        "parse_pool": parse_pool,
+        "seen": seen,
+        "on_record": on_record if stream else None,
+        "checkpoint": checkpoint,
+    }
+
+    all_records: List[ReelRecord] = []
+
+    def page_done(url: str, page_records: List[ReelRecord]) -> None:
+        if checkpoint and page_records:
+            for record in page_records:
+                if not checkpoint.was_emitted(url, record["url"]):
+                    checkpoint.add_reel(record["url"], record, url)
+            checkpoint.complete_target(url, [r["url"] for r in page_records])
+        if not stream:
+            all_records.extend(page_records)
+
+    pending_targets: List[Dict[str, Any]] = []
+    for target in valid_targets:
+        if checkpoint and checkpoint.is_target_done(target["url"]):
+            logging.info("Skipping completed page: %s", target["url"])
+            done_records = checkpoint.target_records(target["url"])
+            if frontier is not None:
+                frontier.claim(target["url"], [r["url"] for r in done_records])
+            if not stream:
+                all_records.extend(done_records)
+        else:
+            pending_targets.append(target)
+
+    try:
+        if queue is not None:
+            # Coordinator: workers (on this or other nodes) do the scraping; merge what they stored.
+            # Each run starts from an empty queue unless it resumes the run already in it
+            if resume and queue.run_id():
+                logging.info("Resuming queue run %s in %s", queue.run_id(), queue.path)
+            else:
+                logging.info("Starting queue run %s in %s", queue.reset(), queue.path)
+            logging.info("Queued %d new page tasks in %s", enqueue_targets(queue, valid_targets), queue.path)
+            counts = wait_for_queue(queue, poll_sec)
+            if counts["failed"]:
+                logging.warning("%d tasks failed after %d attempts", counts["failed"], queue.max_attempts)
+            for record in queue.records():
+                if stream:
+                    on_record(record)
+                else:
+                    all_records.append(record)
+            queue_referrers = queue.referrers()
+        elif fetcher is not None:
+            import asyncio
+
+            asyncio.run(_scrape_targets_async(fetcher, pending_targets, page_workers, page_done, **page_kwargs))
+        elif page_workers <= 1 or len(pending_targets) <= 1:
+            for target in pending_targets:
+                try:
+                    page_records = scrape_page(
+                        session, target["url"], target.get("maxReels"), window=target.get("window"), **page_kwargs
+                    )
+                except Exception as e:
+                    logging.error("Page failed %s: %s", target["url"], e)
+                    continue
+                page_done(target["url"], page_records)
+        else:
+            # Pages run side by side; records are appended as each page finishes
+            with ThreadPoolExecutor(max_workers=min(page_workers, len(pending_targets))) as pool, \
+                    progress_bar(total=len(pending_targets), desc="Pages") as bar:
+                futures = {
+                    pool.submit(
+                        scrape_page, session, t["url"], t.get("maxReels"), progress=False, window=t.get("window"), **page_kwargs
+                    ): t["url"]
+                    for t in pending_targets
+                }
+                for fut in as_completed(futures):
+                    try:
+                        page_done(futures[fut], fut.result())
+                    except Exception as e:
+                        logging.error("Page failed %s: %s", futures[fut], e)
+                    bar.update(1)
+    finally:
+        if parse_pool:
+            parse_pool.shutdown()
+        if seen is not None:
+            seen.close()
+        if stream:
+            stream.close()
+        if checkpoint:
+            checkpoint.close()
+        if queue is not None:
+            queue.close()
+
+    if proxy_pool:
+        for row in proxy_pool.stats():
+            logging.info("Proxy %(proxy)s: %(requests)d requests, %(errors)d errors, %(avgLatencySec)ss avg", row)
+    if getattr(session, "rate_limiter", None):
+        logging.info("Final request rates per host: %s", session.rate_limiter.rates())  # type: ignore[attr-defined]
+
+    # Export
+    if stream:
+        exported = resumed + stream.count
+        logging.info("Streamed %d records to %s (%s), %d of them before the resume", exported, out_path, fmt, resumed)
     else:
-        logging.warning("Unknown format '%s', defaulting to JSON", fmt)
-        exporter.to_json(all_records, out_path)
+        exported = len(all_records)
+        sample = all_records[:2]
+        logging.info("Exporting %d records to %s (%s)", exported, out_path, fmt)
+        export_started = time.perf_counter()
+        if fmt == "json":
+            exporter.to_json(all_records, out_path)
+        elif fmt == "csv":
+            exporter.to_csv(all_records, out_path)
+        elif fmt == "excel":
+            exporter.to_excel(all_records, out_path)
+        elif fmt == "html":
+            exporter.to_html(all_records, out_path, title="Facebook Reel Scraper Results")
+        elif fmt == "parquet":
+            exporter.to_parquet(all_records, out_path, row_group_size=int(out_cfg.get("rowGroupSize") or 50_000))
+        elif fmt == "feather":
+            exporter.to_feather(all_records, out_path, batch_size=int(out_cfg.get("rowGroupSize") or 50_000))
+        else:
+            logging.warning("Unknown format '%s', defaulting to JSON", fmt)
+            exporter.to_json(all_records, out_path)
+        METRICS.observe(f"export.{fmt}", time.perf_counter() - export_started)
+
+    METRICS.inc("records.exported", exported)
+    if frontier is not None and frontier_cfg.get("referrersPath", "data/reel_pages.json"):
+        referrers = queue_referrers if queue is not None else frontier.mapping()
+        save_json(frontier_cfg.get("referrersPath", "data/reel_pages.json"), referrers)
+    if metrics_cfg.get("summaryPath"):
+        extra: Dict[str, Any] = {"input": input_path, "output": out_path, "format": fmt}
+        if queue is not None:
+            extra["queue"] = queue.path
+            extra["tasks"] = counts
+        elif frontier is not None:
+            extra["uniqueReels"] = len(frontier)
+        if proxy_pool:
+            extra["proxies"] = proxy_pool.stats()
+        if getattr(session, "rate_limiter", None):
+            extra["ratesPerHost"] = session.rate_limiter.rates()  # type: ignore[attr-defined]
+        METRICS.write_summary(metrics_cfg["summaryPath"], **extra)
+    if metrics_cfg.get("prometheusPath"):
+        METRICS.write_prometheus(metrics_cfg["prometheusPath"])
+
+    # The run is complete, nothing left to resume
+    if checkpoint:
+        checkpoint.close(remove=True)
 
     # Also persist a sample to data/output_sample.json for convenience when running without network
     sample_path = os.path.join("data", "output_sample.json")
     try:
         if not os.path.exists(sample_path):
-            save_json(sample_path, all_records[:2] if all_records else [])
+            save_json(sample_path, [r.to_dict() for r in sample])
     except Exception:
         pass
 
-    print(f"✅ Done. Exported {len(all_records)} records to: {out_path}")
+    print(f"✅ Done. Exported {exported} records to: {out_path}")
     return 0
 
 def main() -> None:
@@ -239,10 +1438,39 @@ def main() -> None:
     parser.add_argument("--input", "-i", default="data/sample_input.json", help="Path to input JSON file")
     parser.add_argument("--settings", "-s", default=None, help="Path to settings JSON file (optional)")
     parser.add_argument("--output", "-o", default=None, help="Override output file path (optional)")
+    parser.add_argument("-c", "--concurrency", type=int, default=None, help="Parallel reel fetches per page (overrides settings)")
+    parser.add_argument("-p", "--page-concurrency", type=int, default=None, help="Pages scraped in parallel (overrides settings)")
+    parser.add_argument("--parse-workers", type=int, default=None, help="Parser processes, 0 to parse in-thread (overrides settings)")
+    parser.add_argument("--cache-only", action="store_true", help="Serve pages from the response cache only (no network)")
+    parser.add_argument("--incremental", action="store_true", help="Skip reels fetched within the refresh window of earlier runs")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted run from its checkpoint (a coordinator: from its queue)")
+    parser.add_argument(
+        "--role",
+        choices=["standalone", "coordinator", "worker", "monitor"],
+        default="standalone",
+        help="coordinator: queue the input and merge results; worker: process queued tasks; "
+        "monitor: keep polling the input's reels and append counter changes",
+    )
+    parser.add_argument("--queue", default=None, help="Work queue file shared by coordinator and workers (overrides settings)")
+    parser.add_argument("--worker-id", default=None, help="Name of this worker in the queue (default: host-pid)")
     parser.add_argument("-v", "--verbose", action="count", default=0, help="Increase verbosity (-v, -vv)")
     args = parser.parse_args()
 
-    code = run(args.input, args.settings, args.output, args.verbose)
+    code = run(
+        args.input,
+        args.settings,
+        args.output,
+        args.verbose,
+        concurrency=args.concurrency,
+        page_concurrency=args.page_concurrency,
+        parse_workers=args.parse_workers,
+        cache_only=args.cache_only,
+        incremental=args.incremental,
+        resume=args.resume,
+        role=args.role,
+        queue_path=args.queue,
+        worker_id=args.worker_id,
+    )
     sys.exit(code)
 
 if __name__ == "__main__":
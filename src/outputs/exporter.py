@@ -1,10 +1,106 @@
 from __future__ import annotations
 
+import csv
 import json
 import os
-from typing import Any, Dict, List
+import threading
+import time
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, Union
 
-import pandas as pd
+from extractors.metrics import METRICS
+from extractors.record import FIELDS, INT_FIELDS, ReelRecord, to_arrow_batch, to_records
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+STREAM_FORMATS = ("ndjson", "csv")
+
+Records = Iterable[Union[ReelRecord, Dict[str, Any]]]
+
+def _arrow_schema() -> Any:
+    import pyarrow as pa
+
+    types = {
+        "ownerUsername": pa.string(),
+        "reelId": pa.string(),
+        "url": pa.string(),
+        "playCount": pa.int64(),
+        "img": pa.string(),
+        "likesCount": pa.int64(),
+        "commentsCount": pa.int64(),
+        "sharesCount": pa.int64(),
+        "reelDuration": pa.float64(),
+        "music": pa.string(),
+        "caption": pa.string(),
+        "reelDate": pa.date32(),
+        "reelDateTime": pa.timestamp("s"),
+    }
+    # Timestamps are local wall-clock time in the scraper's configured timezone
+    tz_name = os.environ.get("SCRAPER_TZ", "Asia/Karachi")
+    return pa.schema([pa.field(f, types[f]) for f in FIELDS], metadata={"timezone": tz_name})
+
+def _arrow_batches(records: Records, schema: Any, batch_size: int) -> Iterator[Any]:
+    it = iter(records)
+    while True:
+        chunk = list(islice(it, batch_size))
+        if not chunk:
+            return
+        yield to_arrow_batch(chunk, schema)
+
+def _frame(records: Records) -> "pd.DataFrame":
+    # pandas is only imported for the formats that need it (Excel, HTML)
+    import pandas as pd
+
+    # Nullable integer columns, so counts are not written as floats ("1200.0") when some are missing
+    df = pd.DataFrame.from_records([r.to_row() for r in to_records(records)], columns=list(FIELDS))
+    return df.astype({f: "Int64" for f in INT_FIELDS})
+
+class RecordStream:
+    """
+    Writes records one at a time and flushes after each, so a crashed run
+    still leaves every record written so far. Safe to share between threads.
+    """
+
+    def __init__(self, path: str, fmt: str, append: bool = False):
+        if fmt not in STREAM_FORMATS:
+            raise ValueError(f"Streaming is not supported for format '{fmt}'")
+        self.path = path
+        self.fmt = fmt
+        self.count = 0
+        self._lock = threading.Lock()
+        existing = append and os.path.exists(path) and os.path.getsize(path) > 0
+        self._f = open(path, "a" if append else "w", encoding="utf-8", newline="")
+        self._csv = None
+        if fmt == "csv":
+            self._csv = csv.writer(self._f)
+            if not existing:
+                self._csv.writerow(FIELDS)
+                self._f.flush()
+
+    def write(self, record: Union[ReelRecord, Dict[str, Any]]) -> None:
+        started = time.perf_counter()
+        record = ReelRecord.from_dict(record)
+        line = None if self._csv else json.dumps(record.to_dict(), ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._csv:
+                self._csv.writerow(record.to_row())
+            else:
+                self._f.write(line)
+            self._f.flush()
+            self.count += 1
+        METRICS.observe(f"export.{self.fmt}.stream", time.perf_counter() - started)
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._f.closed:
+                self._f.close()
+
+    def __enter__(self) -> "RecordStream":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
 
 class Exporter:
     def __init__(self) -> None:
@@ -16,24 +112,63 @@ class Exporter:
         if d and not os.path.exists(d):
             os.makedirs(d, exist_ok=True)
 
-    def to_json(self, records: List[Dict[str, Any]], path: str) -> None:
+    def open_stream(self, path: str, fmt: str = "ndjson", append: bool = False) -> RecordStream:
+        self._ensure_dir(path)
+        return RecordStream(path, fmt, append=append)
+
+    def to_ndjson(self, records: Records, path: str) -> None:
+        with self.open_stream(path, "ndjson") as stream:
+            for record in records:
+                stream.write(record)
+
+    def to_parquet(self, records: Records, path: str, row_group_size: int = 50_000) -> None:
+        """
+        Write records with a fixed typed schema (int64 counts, float duration,
+        date/timestamp columns), one row group per `row_group_size` records.
+        `records` may be any iterable, so large inputs are never held in full.
+        """
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)") from e
+        self._ensure_dir(path)
+        schema = _arrow_schema()
+        with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+            for batch in _arrow_batches(records, schema, row_group_size):
+                writer.write_batch(batch, row_group_size=row_group_size)
+
+    def to_feather(self, records: Records, path: str, batch_size: int = 50_000) -> None:
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise RuntimeError("Feather export requires pyarrow (pip install pyarrow)") from e
+        self._ensure_dir(path)
+        schema = _arrow_schema()
+        options = pa.ipc.IpcWriteOptions(compression="lz4")
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, schema, options=options) as writer:
+            for batch in _arrow_batches(records, schema, batch_size):
+                writer.write_batch(batch)
+
+    def to_json(self, records: Records, path: str) -> None:
         self._ensure_dir(path)
         with open(path, "w", encoding="utf-8") as f:
-            json.dump(records, f, ensure_ascii=False, indent=2)
+            json.dump([r.to_dict() for r in to_records(records)], f, ensure_ascii=False, indent=2)
 
-    def to_csv(self, records: List[Dict[str, Any]], path: str) -> None:
+    def to_csv(self, records: Records, path: str) -> None:
         self._ensure_dir(path)
-        df = pd.DataFrame(records)
-        df.to_csv(path, index=False)
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(FIELDS)
+            writer.writerows(ReelRecord.from_dict(r).to_row() for r in records)
 
-    def to_excel(self, records: List[Dict[str, Any]], path: str) -> None:
+    def to_excel(self, records: Records, path: str) -> None:
         self._ensure_dir(path)
-        df = pd.DataFrame(records)
+        df = _frame(records)
         df.to_excel(path, index=False, engine="openpyxl")
 
-    def to_html(self, records: List[Dict[str, Any]], path: str, title: str = "Results") -> None:
+    def to_html(self, records: Records, path: str, title: str = "Results") -> None:
         self._ensure_dir(path)
-        df = pd.DataFrame(records)
+        df = _frame(records)
         html = f"""<!DOCTYPE html>
 <html lang="en">
 <head>
@@ -0,0 +1,100 @@
+"""
+Checkpoint round trips through --resume, including a log whose last line was cut short.
+"""
+import json
+
+import pytest
+
+from extractors.checkpoint import Checkpoint
+from extractors.record import ReelRecord
+
+INPUT = "data/input.json"
+PAGE_A = "https://www.facebook.com/PageA"
+PAGE_B = "https://www.facebook.com/PageB"
+
+def _reel(n):
+    return f"https://www.facebook.com/reel/{n}/"
+
+def _record(n):
+    return ReelRecord(reelId=str(n), url=_reel(n), playCount=100 * n, caption=f"café #{n}")
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "state" / "checkpoint.jsonl")
+
+def _write_run(path):
+    ckpt = Checkpoint(path, INPUT)
+    ckpt.add_reel(_reel(1), _record(1), PAGE_A)
+    ckpt.add_reel(_reel(2), _record(2), PAGE_A)
+    ckpt.complete_target(PAGE_A, [_reel(1), _reel(2)])
+    ckpt.add_reel(_reel(3), _record(3), PAGE_B)
+    ckpt.close()
+
+def _lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def test_resume_round_trip(path):
+    _write_run(path)
+    ckpt = Checkpoint(path, INPUT, resume=True)
+    assert ckpt.resumed == 3
+    assert ckpt.record(_reel(2)) == _record(2)
+    assert ckpt.is_target_done(PAGE_A) and not ckpt.is_target_done(PAGE_B)
+    assert ckpt.target_records(PAGE_A) == [_record(1), _record(2)]
+    assert ckpt.was_emitted(PAGE_B, _reel(3))
+    # Emitted per page: the same reel on another page is still due
+    assert not ckpt.was_emitted(PAGE_A, _reel(3))
+
+    # Entries appended after the resume are read back by the next one
+    ckpt.add_reel(_reel(3), _record(3), PAGE_A)
+    ckpt.complete_target(PAGE_B, [_reel(3)])
+    ckpt.close()
+    again = Checkpoint(path, INPUT, resume=True)
+    assert again.resumed == 4
+    assert again.was_emitted(PAGE_A, _reel(3))
+    assert again.target_records(PAGE_B) == [_record(3)]
+    again.close(remove=True)
+
+def test_legacy_entries_without_page(path):
+    Checkpoint(path, INPUT).close()
+    with open(path, "a", encoding="utf-8") as f:
+        # Written by versions that did not record the page
+        f.write(json.dumps({"reel": _reel(1), "record": _record(1).to_dict()}) + "\n")
+    ckpt = Checkpoint(path, INPUT, resume=True)
+    assert ckpt.was_emitted(PAGE_A, _reel(1)) and ckpt.was_emitted(PAGE_B, _reel(1))
+    assert ckpt.resumed == 1
+    ckpt.close()
+
+@pytest.mark.parametrize("torn", ['{"reel": "https://www.facebook.com/reel/9/", "page"', '{"target": "x"}'])
+def test_torn_last_line_is_truncated(path, torn):
+    _write_run(path)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(torn)  # cut short before its newline
+    ckpt = Checkpoint(path, INPUT, resume=True)
+    assert ckpt.resumed == 3 and ckpt.record(_reel(9)) is None and not ckpt.is_target_done("x")
+    ckpt.complete_target(PAGE_B, [_reel(3)])
+    ckpt.close()
+
+    lines = _lines(path)
+    assert len(lines) == 6 and lines[-1] == {"target": PAGE_B, "reels": [_reel(3)]}
+    again = Checkpoint(path, INPUT, resume=True)
+    assert again.is_target_done(PAGE_B) and again.resumed == 3
+    again.close()
+
+def test_other_input_starts_from_scratch(path):
+    _write_run(path)
+    ckpt = Checkpoint(path, "data/other.json", resume=True)
+    assert ckpt.resumed == 0 and ckpt.reels == {} and ckpt.targets == {}
+    assert not ckpt.was_emitted(PAGE_A, _reel(1))
+    ckpt.close()
+    assert _lines(path) == [{"input": "data/other.json"}]
+
+def test_missing_file_and_no_resume(path):
+    ckpt = Checkpoint(path, INPUT, resume=True)
+    assert ckpt.resumed == 0
+    ckpt.close()
+    _write_run(path)
+    fresh = Checkpoint(path, INPUT)
+    assert fresh.resumed == 0 and fresh.reels == {}
+    fresh.close()
+    assert _lines(path) == [{"input": INPUT}]
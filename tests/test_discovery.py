@@ -0,0 +1,46 @@
+"""
+ReelDiscovery's crawl order and which continuation URLs it follows.
+"""
+from extractors.discovery import ReelDiscovery, next_page_urls, reels_tab_url
+
+PAGE = "https://www.facebook.com/Formula1"
+HTML = (
+    '<link rel="next" href="/Formula1/reels/?page=2&amp;x=1" />'
+    '<script>{"page_info":{"has_next_page":true,"end_cursor":"AQHR\\u00253D"}}</script>'
+)
+
+def _reel(n):
+    return f"https://www.facebook.com/reel/{n}/"
+
+def test_reels_tab_url():
+    assert reels_tab_url(PAGE) == "https://www.facebook.com/Formula1/reels/"
+    assert reels_tab_url("https://www.facebook.com/Formula1/reels/") == "https://www.facebook.com/Formula1/reels/"
+    assert reels_tab_url("https://www.facebook.com/profile.php?id=5") == "https://www.facebook.com/profile.php?id=5&sk=reels_tab"
+
+def test_cursors_only_when_asked():
+    assert next_page_urls(PAGE, HTML) == ["https://www.facebook.com/Formula1/reels/?page=2&x=1"]
+    assert next_page_urls(PAGE, HTML, cursors=True) == [
+        "https://www.facebook.com/Formula1?cursor=AQHR%253D",
+        "https://www.facebook.com/Formula1/reels/?page=2&x=1",
+    ]
+    done = HTML.replace("true", "false")
+    assert next_page_urls(PAGE, done, cursors=True) == ["https://www.facebook.com/Formula1/reels/?page=2&x=1"]
+
+def test_crawl_order_and_stop():
+    discovery = ReelDiscovery(PAGE, max_reels=3)
+    assert discovery.next_url() == PAGE
+    assert discovery.feed(PAGE, HTML, [_reel(1), _reel(2)]) == [_reel(1), _reel(2)]
+    assert discovery.next_url() == reels_tab_url(PAGE)
+    # Repeats are dropped and the cap applies to new links only
+    assert discovery.feed(reels_tab_url(PAGE), HTML, [_reel(2), _reel(3), _reel(4)]) == [_reel(3)]
+    assert discovery.done and discovery.next_url() is None
+
+def test_continuation_without_new_reels_ends_the_crawl():
+    discovery = ReelDiscovery(PAGE, follow_reels_tab=False, follow_cursors=True)
+    discovery.next_url()
+    discovery.feed(PAGE, HTML, [_reel(1)])
+    assert discovery.next_url() == "https://www.facebook.com/Formula1?cursor=AQHR%253D"
+    discovery.feed("https://www.facebook.com/Formula1?cursor=AQHR%253D", HTML, [_reel(1)])
+    assert discovery.next_url() == "https://www.facebook.com/Formula1/reels/?page=2&x=1"
+    discovery.feed("https://www.facebook.com/Formula1/reels/?page=2&x=1", HTML, [])
+    assert discovery.next_url() is None
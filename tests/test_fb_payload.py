@@ -0,0 +1,121 @@
+"""
+extract_embedded_fields, which decodes only the value after each key, against a full
+json.loads of every payload; and parse_reel_html on a fixture with an embedded payload.
+"""
+import json
+import random
+
+from conftest import load_data
+from extractors.fb_payload import FIELD_PATHS, extract_embedded_fields
+from extractors.reel_parser import parse_reel_html
+from extractors.record import ReelRecord
+from fixtures import reel_html
+
+REEL_ID = "7086752381438446"
+REEL_URL = f"https://www.facebook.com/Formula1/reel/{REEL_ID}/"
+
+def _walk(value, key):
+    # Every value stored under `key`, in document order
+    if isinstance(value, dict):
+        for k, v in value.items():
+            if k == key:
+                yield v
+            yield from _walk(v, key)
+    elif isinstance(value, list):
+        for v in value:
+            yield from _walk(v, key)
+
+def _reference(scripts, reel_id):
+    payloads = [s for s in scripts if reel_id in s]
+    found = {}
+    for field, candidates in FIELD_PATHS.items():
+        for text in payloads:
+            data = json.loads(text)
+            for path, convert in candidates:
+                for value in _walk(data, path[0]):
+                    for key in path[1:]:
+                        value = value.get(key) if isinstance(value, dict) else None
+                    result = convert(value)
+                    if result is not None:
+                        found[field] = result
+                        break
+                if field in found:
+                    break
+            if field in found:
+                break
+    return found
+
+KEYS = sorted({path[0] for candidates in FIELD_PATHS.values() for path, _ in candidates})
+SUBKEYS = sorted({key for candidates in FIELD_PATHS.values() for path, _ in candidates for key in path[1:]})
+
+def _leaf(rng):
+    return rng.choice([
+        rng.randrange(10**7), rng.random() * 1e5, 0, -5, True, False, None, "", "  ", "F1 · Original audio",
+        "1200", 1701320340, 17740,
+    ])
+
+def _node(rng, depth):
+    r = rng.random()
+    if depth > 3 or r < 0.3:
+        return _leaf(rng)
+    if r < 0.45:
+        return [_node(rng, depth + 1) for _ in range(rng.randrange(0, 4))]
+    keys = rng.sample(KEYS + SUBKEYS + ["id", "x", "node", "video"], rng.randrange(1, 6))
+    return {k: _node(rng, depth + 1) for k in keys}
+
+def _script(rng, reel_id):
+    data = {"id": reel_id if rng.random() < 0.7 else "1234567890", "data": _node(rng, 0)}
+    return json.dumps(data, indent=rng.choice([None, 1]), separators=rng.choice([None, (",", ":"), (" , ", " : ")]))
+
+def test_matches_full_decode():
+    rng = random.Random(15)
+    for _ in range(2000):
+        scripts = [_script(rng, REEL_ID) for _ in range(rng.randrange(1, 4))]
+        assert extract_embedded_fields(scripts, REEL_ID) == _reference(scripts, REEL_ID), scripts
+
+def test_ignores_payloads_of_other_reels():
+    other = json.dumps({"id": "999", "play_count": 5, "unified_reactors": {"count": 6}})
+    own = json.dumps({"id": REEL_ID, "play_count": 186500})
+    assert extract_embedded_fields([other, own], REEL_ID) == {"playCount": "186500"}
+    assert extract_embedded_fields([other, own]) == {"playCount": "5", "likesCount": "6"}
+
+def test_conversions():
+    script = json.dumps({
+        "id": REEL_ID,
+        "video_view_count": True,  # booleans are not counts
+        "view_count": 12.0,
+        "reaction_count": {"count": "4800"},  # strings are not counts
+        "likers": {"count": 4800},
+        "playable_duration_in_ms": 17740,
+        "creation_time": 1701320340,
+        "track_title": "  ",
+        "audio_title": " F1 · Original audio ",
+    })
+    assert extract_embedded_fields([script], REEL_ID) == {
+        "playCount": "12",
+        "likesCount": "4800",
+        "reelDuration": "17.74",
+        "reelDateTime": "2023-11-30 04:59:00",
+        "music": "F1 · Original audio",
+    }
+
+def test_skips_values_that_do_not_decode():
+    script = '{"id":"%s","play_count":undefined,"x":{"play_count": 42}}' % REEL_ID
+    assert extract_embedded_fields([script], REEL_ID) == {"playCount": "42"}
+
+def test_parse_prefers_embedded_payload():
+    payload = json.dumps({
+        "video": {
+            "id": REEL_ID,
+            "play_count": 186500,
+            "unified_reactors": {"count": 4812},
+            "comment_count": {"total_count": 91},
+            "playable_duration_in_ms": 17740,
+        }
+    })
+    html = reel_html("small").replace("</body>", f'<script type="application/json">{payload}</script></body>', 1)
+    expected = dict(load_data("parse_baseline.json")["reel_small"])
+    # Counters from the payload win over text matches; the rest is what the baseline parser found
+    expected.update(playCount="186500", likesCount="4812", commentsCount="91", reelDuration="17.74")
+    for engine in ("bs4", "lxml"):
+        assert parse_reel_html(html, REEL_URL, engine=engine) == ReelRecord.from_dict(expected)
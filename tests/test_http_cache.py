@@ -0,0 +1,135 @@
+"""
+ResponseCache and the cache steps shared by both transports (cache_lookup / response_text).
+"""
+import random
+import zlib
+
+import pytest
+
+from extractors import http_cache
+from extractors.http_cache import ResponseCache, cache_lookup, response_text
+from extractors.streaming import Body
+
+URL = "https://www.facebook.com/reel/1/"
+
+class _Response:
+    def __init__(self, status_code, text="", reason=None, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.body = Body(text, len(text.encode("utf-8")), reason)
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(http_cache, "time", clock)
+    return clock
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), ttl_sec=60)
+    yield cache
+    cache.close()
+
+def test_lookup_without_cache():
+    lookup = cache_lookup(None, URL)
+    assert not lookup.done and lookup.headers is None
+    assert response_text(None, URL, lookup, _Response(200, "<html>")) == "<html>"
+    assert response_text(None, URL, lookup, _Response(404, "missing")) is None
+    assert response_text(None, URL, lookup, None) is None
+
+def test_miss_then_hit(cache):
+    lookup = cache_lookup(cache, URL)
+    assert not lookup.done and lookup.entry is None and lookup.headers is None
+    assert response_text(cache, URL, lookup, _Response(200, "<html>", headers={"ETag": '"v1"'})) == "<html>"
+    hit = cache_lookup(cache, URL)
+    assert hit.done and hit.text == "<html>"
+
+def test_cut_bodies_are_not_stored(cache):
+    for reason in ("limit", "stop"):
+        assert response_text(cache, URL, cache_lookup(cache, URL), _Response(200, "<html", reason)) == "<html"
+        assert cache.get(URL) is None
+
+def test_stale_entry_is_revalidated(cache, monkeypatch):
+    cache.put(URL, "<old>", etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+    cache.ttl_sec = 0
+    lookup = cache_lookup(cache, URL)
+    assert not lookup.done
+    assert lookup.headers == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    assert response_text(cache, URL, lookup, _Response(304)) == "<old>"
+    # A changed page replaces the entry
+    assert response_text(cache, URL, cache_lookup(cache, URL), _Response(200, "<new>")) == "<new>"
+    assert cache.get(URL).text == "<new>"
+
+def test_cache_only_never_requests(cache):
+    cache.cache_only = True
+    miss = cache_lookup(cache, URL)
+    assert miss.done and miss.text is None
+    cache.put(URL, "<html>")
+    cache.ttl_sec = 0
+    hit = cache_lookup(cache, URL)
+    assert hit.done and hit.text == "<html>"
+
+def test_ttl_freshness(cache, clock):
+    cache.put(URL, "<html>")
+    clock.now += 59
+    assert cache.is_fresh(cache.get(URL)) and cache_lookup(cache, URL).done
+    clock.now += 1
+    assert not cache.is_fresh(cache.get(URL))
+    lookup = cache_lookup(cache, URL)
+    assert not lookup.done and lookup.entry.text == "<html>"
+
+def test_validator_headers(cache):
+    cache.put(URL, "<html>")
+    assert ResponseCache.validators(cache.get(URL)) == {}
+    cache.put(URL, "<html>", etag='W/"abc"')
+    assert ResponseCache.validators(cache.get(URL)) == {"If-None-Match": 'W/"abc"'}
+    cache.put(URL, "<html>", last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+    assert ResponseCache.validators(cache.get(URL)) == {"If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+
+def test_refresh_after_304(cache, clock):
+    cache.put(URL, "<html>", etag='"v1"')
+    clock.now += 120
+    lookup = cache_lookup(cache, URL)
+    assert not lookup.done
+    assert response_text(cache, URL, lookup, _Response(304)) == "<html>"
+    entry = cache.get(URL)
+    assert entry.stored_at == clock.now and entry.etag == '"v1"'
+    assert cache_lookup(cache, URL).done
+
+def _page(seed, n=4000):
+    # Random text, so compressed sizes are predictable enough to size the cache
+    rng = random.Random(seed)
+    return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz0123456789") for _ in range(n))
+
+def test_lru_eviction_by_max_bytes(tmp_path, clock):
+    size = len(zlib.compress(_page(0).encode("utf-8"), 6))
+    cache = ResponseCache(str(tmp_path / "lru.sqlite"), max_bytes=int(size * 2.5))
+    for n in range(2):
+        cache.put(f"{URL}{n}", _page(n))
+        clock.now += 1
+    cache.get(f"{URL}0")  # 1 becomes the least recently used
+    clock.now += 1
+    cache.put(f"{URL}2", _page(2))
+    assert cache.get(f"{URL}1") is None
+    assert cache.get(f"{URL}0").text == _page(0) and cache.get(f"{URL}2").text == _page(2)
+    # Replacing an entry counts only its new size
+    cache.put(f"{URL}2", _page(2))
+    assert cache.get(f"{URL}0") is not None
+    cache.close()
+
+def test_persists_across_reopen(cache, tmp_path):
+    cache.put(URL, "<html>", etag='"v1"')
+    cache.close()
+    reopened = ResponseCache(cache.path, ttl_sec=60, max_bytes=1)
+    assert reopened.get(URL).text == "<html>"
+    # The stored size is known after a reopen, so the next put evicts down to max_bytes
+    reopened.put(URL + "2", "<other>")
+    assert reopened.get(URL) is None
+    reopened.close()
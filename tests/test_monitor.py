@@ -0,0 +1,106 @@
+"""
+Monitor polling schedule, the persisted MonitorStore and the counter deltas written per poll.
+"""
+import json
+
+import pytest
+
+from extractors.monitor import DeltaLog, MonitorStore, PollSchedule, ReelState, counter_changes
+from extractors.record import ReelRecord
+from main import _after_poll
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+NOW = 1_700_000_000.0
+
+def _state(reel_id="1", published=None, unchanged=0, next_poll=NOW, counters=None):
+    return ReelState(reel_id, f"https://www.facebook.com/reel/{reel_id}/", "page", NOW - DAY, published, None,
+                     next_poll, unchanged, counters or {})
+
+@pytest.fixture
+def store(tmp_path):
+    store = MonitorStore(str(tmp_path / "monitor.sqlite"))
+    yield store
+    store.close()
+
+def test_interval_grows_with_age():
+    schedule = PollSchedule(min_sec=900, max_sec=DAY, age_factor=0.1, retire_after_sec=30 * DAY)
+    # Young reels are polled at min_sec, older ones at a tenth of their age, up to max_sec
+    assert schedule.next_poll(_state(published=NOW - 60), NOW) == NOW + 900
+    assert schedule.next_poll(_state(published=NOW - 10 * HOUR), NOW) == NOW + HOUR
+    assert schedule.next_poll(_state(published=NOW - 20 * DAY), NOW) == NOW + DAY
+    # Without a publication date the age counts from first_seen
+    assert schedule.next_poll(_state(), NOW) == NOW + 0.1 * DAY
+
+def test_interval_doubles_per_unchanged_poll():
+    schedule = PollSchedule(min_sec=900, max_sec=DAY, age_factor=0.1)
+    young = [schedule.next_poll(_state(published=NOW - 60, unchanged=n), NOW) - NOW for n in range(7)]
+    assert young == [900, 1800, 3600, 7200, 14400, 14400, 14400]
+    older = _state(published=NOW - 10 * DAY, unchanged=3)
+    assert schedule.next_poll(older, NOW) == NOW + DAY
+
+def test_retirement():
+    schedule = PollSchedule(retire_after_sec=30 * DAY)
+    assert schedule.next_poll(_state(published=NOW - 30 * DAY), NOW) is not None
+    assert schedule.next_poll(_state(published=NOW - 30 * DAY - 1), NOW) is None
+    assert PollSchedule(retire_after_sec=None).next_poll(_state(published=NOW - 365 * DAY), NOW) is not None
+
+def test_counter_changes():
+    record = ReelRecord(reelId="1", playCount=200, likesCount=10, commentsCount=None)
+    assert counter_changes({}, record) == {"playCount": 200, "likesCount": 10}
+    # A counter the poll did not find is not a change
+    assert counter_changes({"playCount": 100, "likesCount": 10, "commentsCount": 5}, record) == {"playCount": 200}
+
+def test_stale_heap_entries_are_skipped(store):
+    store.add("1", "u1", "page", NOW)
+    store.add("2", "u2", "page", NOW + 10)
+    # Rescheduled before it came due: the old heap entry stays behind
+    store.put(store.reels["1"]._replace(next_poll=NOW + 100))
+    assert store.next_due() == NOW + 10
+    assert [s.reel_id for s in store.due(NOW + 50)] == ["2"]
+    assert [s.reel_id for s in store.due(NOW + 100)] == ["1"]
+    assert store.due(NOW + 1000) == []
+
+    # A retired reel is never due again
+    store.put(store.reels["2"]._replace(next_poll=None))
+    store.put(store.reels["1"]._replace(next_poll=NOW + 200))
+    assert store.active() == 1
+    assert [s.reel_id for s in store.due(NOW + 1000)] == ["1"]
+    assert store.next_due() is None
+
+def test_state_survives_reopen(tmp_path):
+    path = str(tmp_path / "monitor.sqlite")
+    store = MonitorStore(path)
+    store.add("1", "u1", "page", NOW)
+    assert not store.add("1", "u1", "page", NOW)
+    store.put(store.reels["1"]._replace(next_poll=NOW + 60, unchanged=2, counters={"playCount": 5}))
+    store.add("2", "u2", "page", NOW)
+    store.put(store.reels["2"]._replace(next_poll=None))
+    store.set_page("page", NOW + 30)
+    store.close()
+
+    reopened = MonitorStore(path)
+    assert reopened.reels["1"] == _state("1", next_poll=NOW + 60, unchanged=2, counters={"playCount": 5})._replace(
+        url="u1", first_seen=NOW)
+    assert reopened.reels["2"].next_poll is None
+    assert reopened.pages == {"page": NOW + 30}
+    assert not reopened.page_due("page", NOW) and reopened.page_due("page", NOW + 30)
+    assert reopened.next_due() == NOW + 30
+    assert [s.reel_id for s in reopened.due(NOW + 60)] == ["1"]
+    reopened.close()
+
+def test_delta_lines_hold_only_changed_counters(tmp_path):
+    deltas = DeltaLog(str(tmp_path / "deltas.ndjson"))
+    schedule = PollSchedule()
+    state = _state(counters={"playCount": 100, "likesCount": 10, "commentsCount": 1})
+    state = _after_poll(state, ReelRecord(reelId="1", playCount=150, likesCount=10, commentsCount=1), schedule, None,
+                        deltas, NOW)
+    assert state.unchanged == 0 and state.counters["playCount"] == 150
+    state = _after_poll(state, ReelRecord(reelId="1", playCount=150, likesCount=10), schedule, None, deltas, NOW + 60)
+    assert state.unchanged == 1
+    deltas.close()
+
+    with open(deltas.path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert lines == [{"reelId": "1", "ts": "2023-11-14T22:13:20Z", "playCount": 150}]
+    assert deltas.count == 1
@@ -0,0 +1,71 @@
+"""
+_PageReels' date-window cutoff when reels finish out of listing order.
+"""
+import pytest
+
+from extractors.record import ReelRecord
+from extractors.utils_date import DateWindow
+from main import _PageReels
+
+PAGE = "https://www.facebook.com/Formula1"
+
+class _Discovery:
+    def __init__(self):
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+def _link(i):
+    return f"https://www.facebook.com/reel/{1000 + i}/"
+
+def _record(i, when):
+    return ReelRecord(reelId=str(1000 + i), url=_link(i), reelDateTime=when)
+
+NEW = "2024-06-01 10:00"
+OLD = "2023-06-01 10:00"
+
+@pytest.fixture
+def page(monkeypatch):
+    monkeypatch.setenv("SCRAPER_TZ", "UTC")
+    discovery = _Discovery()
+    page = _PageReels(PAGE, window=DateWindow.from_settings("2024-01-01"), discovery=discovery, stop_after=3)
+    assert page.add([_link(i) for i in range(12)]) == list(range(12))
+    return page
+
+def test_cutoff_after_last_older_reel_in_listing_order(page):
+    # Older reels at 0 (e.g. pinned), 10 and 11 finish first, in the order 10, 11, 0
+    for i in (10, 11, 0):
+        page.finish(i, _record(i, OLD))
+    assert page.stop_idx == 11
+    assert page.discovery.stopped
+    assert all(page.wanted(i) for i in range(1, 12))
+    page.add([_link(12)])
+    assert not page.wanted(12)
+
+    for i in range(1, 10):
+        page.finish(i, _record(i, NEW))
+    assert [r.reelId for r in page.records()] == [str(1000 + i) for i in range(1, 10)]
+
+def test_cutoff_in_order(page):
+    for i in range(3):
+        page.finish(i, _record(i, NEW))
+    for i in (3, 4, 5):
+        page.finish(i, _record(i, OLD))
+    assert page.stop_idx == 5
+    assert page.wanted(5) and not page.wanted(6)
+
+def test_later_older_reels_do_not_move_cutoff(page):
+    for i in (4, 5, 6):
+        page.finish(i, _record(i, OLD))
+    page.finish(2, _record(2, OLD))
+    assert page.stop_idx == 6
+
+def test_newer_than_window_does_not_count(monkeypatch):
+    monkeypatch.setenv("SCRAPER_TZ", "UTC")
+    page = _PageReels(PAGE, window=DateWindow.from_settings(None, "2024-01-01"), stop_after=1)
+    page.add([_link(0), _link(1)])
+    page.finish(0, _record(0, NEW))
+    assert page.stop_idx is None and page.records() == []
+    page.finish(1, _record(1, "2023-12-31 23:59"))
+    assert [r.reelId for r in page.records()] == ["1001"]
@@ -0,0 +1,92 @@
+"""
+RetryPolicy delays and AdaptiveRateLimiter pacing, against a fake clock.
+"""
+import random
+
+import pytest
+
+from extractors import rate_limiter
+from extractors.rate_limiter import AdaptiveRateLimiter, RetryPolicy, parse_retry_after
+
+URL = "https://www.facebook.com/reel/1/"
+OTHER = "https://example.com/"
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    return clock
+
+def test_delay_bounds():
+    random.seed(1)
+    policy = RetryPolicy(backoff_base=1.0, backoff_max=5.0)
+    for attempt in range(6):
+        delays = [policy.delay(attempt) for _ in range(200)]
+        assert all(0 <= d <= min(5.0, 2 ** attempt) for d in delays)
+        # Full jitter: spread over the whole range
+        assert max(delays) > 0.8 * min(5.0, 2 ** attempt) and min(delays) < 0.2 * min(5.0, 2 ** attempt)
+
+def test_delay_honours_retry_after():
+    policy = RetryPolicy(backoff_base=1.0, backoff_max=5.0)
+    assert all(policy.delay(0, 3.0) >= 3.0 for _ in range(50))
+    # Longer than backoff_max: the server's value still wins
+    assert policy.delay(0, 120.0) == 120.0
+    assert all(policy.delay(attempt, 0.0) <= 5.0 for attempt in range(6))
+
+def test_parse_retry_after(clock):
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after(None) is None and parse_retry_after("soon") is None
+    clock.now = 1_704_067_200.0  # 2024-01-01 00:00:00 UTC
+    assert parse_retry_after("Mon, 01 Jan 2024 00:00:30 GMT") == 30.0
+    assert parse_retry_after("Sun, 31 Dec 2023 23:00:00 GMT") == 0.0
+
+def test_increase_and_decrease_steps(clock):
+    limiter = AdaptiveRateLimiter(rate=2.0, min_rate=0.5, max_rate=2.3, increase=0.1, decrease=0.5)
+    for _ in range(2):
+        limiter.on_success(URL)
+    assert limiter.rates() == {"www.facebook.com": 2.2}
+    for _ in range(3):
+        limiter.on_success(URL)
+    assert limiter.rates()["www.facebook.com"] == 2.3
+    limiter.on_throttle(URL)
+    assert limiter.rates()["www.facebook.com"] == 1.15
+    for _ in range(3):
+        limiter.on_throttle(URL)
+    assert limiter.rates()["www.facebook.com"] == 0.5
+    # Hosts are paced separately
+    limiter.on_throttle(OTHER)
+    assert limiter.rates()["example.com"] == 1.0
+
+def test_reserve_paces_after_the_burst(clock):
+    limiter = AdaptiveRateLimiter(rate=2.0, burst=2.0)
+    assert [limiter.reserve(URL) for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+    assert limiter.reserve(OTHER) == 0.0
+    clock.now += 1.0
+    # The two tokens refilled went to the queued reservations; the next one waits its turn
+    assert limiter.reserve(URL) == 0.5
+
+def test_blocked_until_retry_after(clock):
+    limiter = AdaptiveRateLimiter(rate=2.0, burst=4.0)
+    limiter.on_throttle(URL, 30.0)
+    assert limiter.reserve(URL) == 30.0
+    assert limiter.reserve(OTHER) == 0.0
+    # A shorter Retry-After does not shorten the block
+    limiter.on_throttle(URL, 5.0)
+    clock.now += 10
+    assert limiter.reserve(URL) == 20.0
+    limiter.acquire(URL)
+    assert clock.now == 1_000_030.0
+    assert limiter.reserve(URL) == 0.0
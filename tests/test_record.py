@@ -0,0 +1,104 @@
+"""
+ReelRecord conversions, and the outputs written from records built from the baseline
+parser's dicts (tests/data/parse_baseline.json).
+"""
+import csv
+import json
+import pickle
+from datetime import date, datetime
+
+import pytest
+
+from conftest import load_data
+from extractors.record import FIELDS, INT_FIELDS, ReelRecord, to_columns, to_records
+from outputs.exporter import Exporter
+
+BASELINE = load_data("parse_baseline.json")
+
+def _typed(d):
+    # The baseline dict with counts as ints and the duration as a float, as records hold them
+    out = {k: d.get(k) for k in FIELDS}
+    for k in INT_FIELDS:
+        out[k] = None if out[k] is None else int(out[k])
+    out["reelDuration"] = None if out["reelDuration"] is None else float(out["reelDuration"])
+    return out
+
+@pytest.mark.parametrize("name", sorted(BASELINE))
+def test_from_baseline_dict(name):
+    record = ReelRecord.from_dict(BASELINE[name])
+    assert record.to_dict() == _typed(BASELINE[name])
+    assert list(record.to_dict()) == list(FIELDS)
+    assert ReelRecord.from_dict(record.to_dict()) == record
+    assert ReelRecord.from_dict(json.loads(json.dumps(record.to_dict()))) == record
+
+def test_coercion():
+    record = ReelRecord(playCount="1,200", likesCount="4.8", commentsCount="", sharesCount="n/a", reelDuration="17.74")
+    assert (record.playCount, record.likesCount, record.commentsCount, record.sharesCount) == (1200, 4, None, None)
+    assert record.reelDuration == 17.74
+    record["sharesCount"] = "365"
+    assert record["sharesCount"] == 365
+    assert ReelRecord(reelDuration=12).reelDuration == 12.0
+
+def test_dict_access():
+    record = ReelRecord.from_dict({"url": "u", "reelId": "1", "extra": "ignored"})
+    assert record["url"] == "u" and record.get("reelId") == "1"
+    assert record.get("extra", "default") == "default"
+    with pytest.raises(KeyError):
+        record["extra"]
+    with pytest.raises(KeyError):
+        record["extra"] = 1
+    with pytest.raises(TypeError):
+        ReelRecord(extra=1)
+    assert ReelRecord("owner", "1").to_row()[:3] == ("owner", "1", None)
+    assert not hasattr(record, "__dict__")
+    with pytest.raises(TypeError):
+        hash(record)
+
+def test_shared_strings_are_interned():
+    a = ReelRecord(ownerUsername="".join(["Formula", "1"]), music="".join(["F1 · ", "Original audio"]))
+    b = ReelRecord(ownerUsername="".join(["Formula", "1"]), music="".join(["F1 · ", "Original audio"]))
+    assert a.ownerUsername is b.ownerUsername and a.music is b.music
+
+def test_pickle_round_trip():
+    records = to_records(BASELINE.values())
+    assert pickle.loads(pickle.dumps(records)) == records
+
+def test_to_columns():
+    records = to_records(BASELINE[name] for name in sorted(BASELINE))
+    columns = to_columns(records)
+    assert list(columns) == list(FIELDS)
+    assert columns["playCount"] == [_typed(BASELINE[name])["playCount"] for name in sorted(BASELINE)]
+
+def test_exports(tmp_path):
+    records = to_records(BASELINE[name] for name in sorted(BASELINE))
+    expected = [_typed(BASELINE[name]) for name in sorted(BASELINE)]
+    exporter = Exporter()
+
+    exporter.to_json(records, str(tmp_path / "out.json"))
+    with open(tmp_path / "out.json", encoding="utf-8") as f:
+        assert json.load(f) == expected
+
+    exporter.to_ndjson(records, str(tmp_path / "out.ndjson"))
+    with open(tmp_path / "out.ndjson", encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == expected
+
+    exporter.to_csv(records, str(tmp_path / "out.csv"))
+    with open(tmp_path / "out.csv", encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == list(FIELDS)
+    assert rows[1:] == [["" if v is None else str(v) for v in r.to_row()] for r in records]
+
+def test_parquet_types(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    records = [
+        ReelRecord.from_dict(dict(BASELINE["reel_small"], reelDate="2023-11-30", reelDateTime="2023-11-30 09:59")),
+        ReelRecord.from_dict(BASELINE["counts_in_text"]),
+    ]
+    Exporter().to_parquet(records, str(tmp_path / "out.parquet"))
+    table = pq.read_table(str(tmp_path / "out.parquet"))
+    assert table.column_names == list(FIELDS)
+    assert str(table.schema.field("playCount").type) == "int64"
+    rows = table.to_pylist()
+    assert rows[0]["reelDate"] == date(2023, 11, 30)
+    assert rows[0]["reelDateTime"] == datetime(2023, 11, 30, 9, 59)
+    assert rows[1]["likesCount"] == 3 and rows[1]["reelDate"] is None
@@ -0,0 +1,128 @@
+"""
+parse_reel_html against the output of the baseline parser (tests/data/parse_baseline.json),
+and the single-pass scanners against the one-pattern-per-field scans they replaced.
+"""
+import random
+import re
+
+import pytest
+
+from conftest import load_data
+from extractors import reel_parser
+from extractors.reel_parser import parse_reel_html
+from extractors.record import ReelRecord
+from fixtures import SIZES, reel_html
+
+REEL_URL = "https://www.facebook.com/Formula1/reel/7086752381438446/"
+
+# Small pages for the cases the fixtures do not reach
+CASES = {
+    "counts_in_text": (
+        "<html><body><span>1.2K plays</span> <span>3 likes</span> <span>10 comments</span>"
+        " <span>5 shares</span> <span>12 sec</span></body></html>"
+    ),
+    "repeated_counts": "<html><body><p>5 likes 7 likes 100 views 200 plays 2 s 3 seconds</p></body></html>",
+    "adjacent_keywords": "<html><body><p>9 shares4 likes 1,234,567 views 1.5M plays 17.74 seconds</p></body></html>",
+    "counts_in_scripts": (
+        '<html><body><p>88 comments</p><script>{"x":"4.8K likes, 186K views"}</script>'
+        '<script>{"y":"365 shares 58.58 s"}</script></body></html>'
+    ),
+    "script_dates": (
+        '<html><body><script>{"d":"2023-11-29"}</script>'
+        '<script>{"t":"2023-11-30T04:59:00+00:00","page_name":"Formula1 Official","music_title":"F1 · Original audio"}'
+        "</script></body></html>"
+    ),
+    "date_inside_music": '<html><body><script>{"music_title":"Live 2023-01-01 12:00","page_name":"p"}</script></body></html>',
+    "empty_music_value": '<html><body><script>{"music":"","musician":"Band","page_name" : "Spaced"}</script></body></html>',
+    "meta_and_ld_json": (
+        '<html><head><meta property="og:title" content="Title" /><meta name="twitter:description" content="Other" />'
+        '<meta property="og:image:url" content="https://example.com/i.jpg" />'
+        '<script type="application/ld+json">{"@type":"VideoObject","uploadDate":"2024-02-01T10:00:00Z",'
+        '"interactionStatistic":{"userInteractionCount":"42"},"author":{"name":"Author"}}</script>'
+        "</head><body><p>1 view</p></body></html>"
+    ),
+}
+
+def _corpus():
+    corpus = {f"reel_{size}": reel_html(size) for size in SIZES}
+    corpus.update(CASES)
+    return corpus
+
+CORPUS = _corpus()
+BASELINE = load_data("parse_baseline.json")
+
+@pytest.mark.parametrize("engine", ["bs4", "lxml"])
+@pytest.mark.parametrize("name", sorted(CORPUS))
+def test_parse_matches_baseline(name, engine):
+    if engine == "lxml":
+        pytest.importorskip("lxml")
+    record = parse_reel_html(CORPUS[name], REEL_URL, engine=engine)
+    assert record.to_dict() == ReelRecord.from_dict(BASELINE[name]).to_dict()
+
+def test_baseline_covers_corpus():
+    assert sorted(BASELINE) == sorted(CORPUS)
+
+# The per-field scans the single-pass scanners replaced
+
+def _reference_scan_text(text, out):
+    for key, pattern in (
+        ("playCount", reel_parser.PLAY_COUNT_RE),
+        ("likesCount", reel_parser.LIKES_RE),
+        ("commentsCount", reel_parser.COMMENTS_RE),
+        ("sharesCount", reel_parser.SHARES_RE),
+        ("reelDuration", reel_parser.DURATION_RE),
+    ):
+        if key not in out:
+            m = pattern.search(text)
+            if m:
+                out[key] = m.group(1) if key == "reelDuration" else reel_parser._num(m.group(1))
+
+def _reference_scan_script(text, out):
+    m = reel_parser.DATETIME_RE.search(text)
+    if m:
+        if m.group(2):
+            out.setdefault("reelDateTime", f"{m.group(1)} {m.group(2)}")
+        else:
+            out.setdefault("reelDate", m.group(1))
+    if "page_name" in text and "ownerUsername" not in out:
+        m2 = re.search(r'"page_name"\s*:\s*"([^"]+)"', text)
+        if m2:
+            out["ownerUsername"] = m2.group(1)
+    if "music" not in out:
+        m3 = re.search(r'"music[^"]*"\s*:\s*"([^"]+)"', text)
+        if m3:
+            out["music"] = m3.group(1)
+
+TOKENS = [
+    "1", "42", "1,200", "3.5", "1.5K", ".", "plays", "views", "view", "like", "likes", "comment", "comments",
+    "share", "shares", "s", "sec", "seconds", "secs", "x", "2023-11-30", "2023-11-30T04:59", "2023-11-30 04:59:00",
+    '"page_name":"A"', '"page_name" : "B"', '"music_title":"C"', '"music":""', '"musician":"D 2024-01-02"', '"',
+]
+SEPARATORS = [" ", "", ",", "\n", " | "]
+PREFILLED = ["playCount", "likesCount", "reelDuration", "reelDate", "reelDateTime", "ownerUsername", "music"]
+
+def _random_text(rng):
+    return "".join(rng.choice(TOKENS) + rng.choice(SEPARATORS) for _ in range(rng.randrange(1, 25)))
+
+def test_scan_text_matches_per_field_patterns():
+    rng = random.Random(14)
+    for _ in range(3000):
+        text = _random_text(rng)
+        prior = {k: "known" for k in rng.sample(PREFILLED, rng.randrange(0, 3))}
+        expected, got = dict(prior), dict(prior)
+        _reference_scan_text(text, expected)
+        reel_parser._scan_text_for_metrics(text, got)
+        assert got == expected, text
+
+def test_scan_script_matches_per_field_patterns():
+    rng = random.Random(140)
+    for _ in range(3000):
+        texts = [_random_text(rng) for _ in range(rng.randrange(1, 4))]
+        prior = {k: "known" for k in rng.sample(PREFILLED, rng.randrange(0, 3))}
+        expected, got = dict(prior), dict(prior)
+        for text in texts:
+            _reference_scan_script(text, expected)
+            _reference_scan_text(text, expected)
+            reel_parser._scan_script(text, got)
+            reel_parser._scan_text_for_metrics(text, got)
+        assert got == expected, texts
@@ -0,0 +1,158 @@
+"""
+BodyReader and the stop checks, fed the benchmark fixtures in chunks of many sizes.
+"""
+import json
+import random
+
+import pytest
+
+from extractors.frontier import reel_key
+from extractors.reel_parser import parse_reel_html
+from extractors.streaming import REEL_LINK_RE, SCRIPT_END, BodyReader, ReelFieldsStop, ReelLinksStop, read_body
+from extractors.utils_date import DateWindow
+from fixtures import page_html, reel_html
+
+REEL_ID = "7086752381438446"
+REEL_URL = f"https://www.facebook.com/Formula1/reel/{REEL_ID}/"
+PAYLOAD = json.dumps({
+    "video": {
+        "id": REEL_ID,
+        "play_count": 186500,
+        "unified_reactors": {"count": 4812},
+        "comment_count": {"total_count": 91},
+        "share_count": {"count": 365},
+        "playable_duration_in_ms": 17740,
+        "creation_time": 1701320340,
+        "music_title": "F1 · Original audio",
+    }
+})
+
+def _chunks(data, sizes):
+    out, pos = [], 0
+    while pos < len(data):
+        n = next(sizes)
+        out.append(data[pos:pos + n])
+        pos += n
+    return out
+
+def _random_sizes(seed, low, high):
+    rng = random.Random(seed)
+    while True:
+        yield rng.randint(low, high)
+
+def _fixed(n):
+    while True:
+        yield n
+
+def _with_payload(size):
+    return reel_html(size).replace('<div id="mount">', f'<div id="mount"><script type="application/json">{PAYLOAD}</script>', 1)
+
+@pytest.mark.parametrize("sizes", [lambda: _fixed(1), lambda: _fixed(3), lambda: _random_sizes(1, 1, 7), lambda: _fixed(65536)])
+def test_multibyte_characters_split_across_chunks(sizes):
+    html = reel_html("small")
+    data = html.encode("utf-8")
+    assert len(data) > len(html)  # the fixture has multi-byte characters
+    body = read_body(_chunks(data, sizes()), "text/html; charset=utf-8")
+    assert body.text == html and body.nbytes == len(data) and body.complete
+
+def test_charset_from_header_and_meta():
+    text = "<html><p>café – ok</p></html>"
+    assert read_body([text.encode("cp1252")], "text/html; charset=windows-1252").text == text
+    # The meta tag is looked for in the first chunk
+    meta = '<meta charset="iso-8859-1"><p>café</p>' + "x" * 100
+    assert read_body(_chunks(meta.encode("latin-1"), _fixed(64)), None).text == meta
+
+@pytest.mark.parametrize("cap", [1, 100_000, 100_001, 100_002])
+def test_byte_cap(cap):
+    data = reel_html("typical").encode("utf-8")
+    body = read_body(_chunks(data, _fixed(4096)), "text/html", max_bytes=cap)
+    assert body.reason == "limit" and not body.complete
+    assert body.nbytes == cap
+    # A character cut by the cap becomes a replacement character, as a whole-body decode gives
+    assert body.text == data[:cap].decode("utf-8", "replace")
+
+def test_no_cap_reached():
+    data = reel_html("small").encode("utf-8")
+    body = read_body(_chunks(data, _fixed(4096)), "text/html", max_bytes=len(data))
+    assert body.complete and body.nbytes == len(data)
+
+def _links_cut(html, limit, known):
+    # Where ReelLinksStop should cut: the end of the tag holding the `limit`-th new reel link
+    keys = set()
+    for m in REEL_LINK_RE.finditer(html):
+        key = reel_key(m.group(0))
+        if key in keys or known(key):
+            continue
+        keys.add(key)
+        if len(keys) == limit:
+            return html.index(">", m.end()) + 1
+    return None
+
+@pytest.mark.parametrize("seed", range(5))
+def test_links_stop_cuts_after_the_limit_th_new_link(seed):
+    html = page_html("small", reels=25)
+    ids = [reel_key(m.group(0)) for m in REEL_LINK_RE.finditer(html)]
+    known = {ids[1], ids[2]}
+    expected = _links_cut(html, 6, known.__contains__)
+    body = read_body(
+        _chunks(html.encode("utf-8"), _random_sizes(seed, 1, 64)), "text/html", stop=ReelLinksStop(6, known.__contains__)
+    )
+    assert body.reason == "links"
+    assert body.text == html[:expected]
+
+def test_links_stop_with_a_reel_id_split_at_a_chunk_boundary():
+    html = page_html("small", reels=25)
+    data = html.encode("utf-8")
+    expected = _links_cut(html, 5, lambda key: False)
+    # Split inside the digits of the fifth reel's id
+    last = [m for m in REEL_LINK_RE.finditer(html)]
+    keys, split_at = set(), None
+    for m in last:
+        keys.add(reel_key(m.group(0)))
+        if len(keys) == 5:
+            split_at = len(html[: m.start() + len("/reel/") + 4].encode("utf-8"))
+            break
+    body = read_body([data[:split_at], data[split_at:split_at + 100], data[split_at + 100:]], "text/html",
+                     stop=ReelLinksStop(5, lambda key: False))
+    assert body.text == html[:expected]
+
+def test_links_stop_reads_everything_below_the_limit():
+    html = page_html("small", reels=3)
+    body = read_body(_chunks(html.encode("utf-8"), _fixed(4096)), "text/html", stop=ReelLinksStop(50, lambda key: False))
+    assert body.complete and body.text == html
+
+def test_fields_stop_cut_offset():
+    html = _with_payload("typical")
+    end_of_payload = html.index(PAYLOAD) + len(PAYLOAD) + len(SCRIPT_END)
+    # A prefix that ends inside a later script is cut after the last complete one
+    prefix = html[: html.index("<script", end_of_payload + 5000) + 20]
+    stop = ReelFieldsStop(REEL_URL)
+    cut = stop.feed(prefix, lambda: prefix)
+    assert cut == prefix.rfind(SCRIPT_END) + len(SCRIPT_END)
+    assert stop.reason == "complete"
+
+@pytest.mark.parametrize("size", ["typical", "large"])
+def test_fields_stop_keeps_a_prefix_that_parses_like_the_page(size):
+    html = _with_payload(size)
+    body = read_body(_chunks(html.encode("utf-8"), _fixed(65536)), "text/html", stop=ReelFieldsStop(REEL_URL))
+    assert body.reason == "complete"
+    assert html.startswith(body.text) and body.text.endswith(SCRIPT_END)
+    assert len(body.text) < len(html) // 2
+    assert parse_reel_html(body.text, REEL_URL) == parse_reel_html(html, REEL_URL)
+
+def test_fields_stop_outside_window(monkeypatch):
+    monkeypatch.setenv("SCRAPER_TZ", "UTC")
+    html = reel_html("large")  # dated 2023-11-30 in its JSON-LD, no embedded payload
+    window = DateWindow.from_settings("2024-01-01")
+    body = read_body(_chunks(html.encode("utf-8"), _fixed(65536)), "text/html", stop=ReelFieldsStop(REEL_URL, window))
+    assert body.reason == "window" and body.text.endswith(SCRIPT_END) and len(body.text) <= 2 * 65536
+    assert window.position(parse_reel_html(body.text, REEL_URL).reelDateTime) == -1
+
+def test_fields_stop_reads_pages_that_never_qualify():
+    # Without the reel's embedded payload the counters come from text that may be further down
+    html = reel_html("large")
+    reader = BodyReader("text/html", stop=ReelFieldsStop(REEL_URL))
+    for chunk in _chunks(html.encode("utf-8"), _fixed(65536)):
+        assert not reader.feed(chunk)
+    body = reader.finish()
+    assert body.complete and body.text == html
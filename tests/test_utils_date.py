@@ -0,0 +1,92 @@
+"""
+normalize_datetime (memoized) and normalize_datetime_series against the baseline
+normalize_datetime's output (tests/data/dates_baseline.json) in several time zones,
+and DateWindow bounds.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from conftest import load_data
+from extractors.utils_date import DateWindow, normalize_datetime, normalize_datetime_series
+
+DATES = load_data("dates_baseline.json")
+ZONES = sorted(DATES["expected"])
+
+@pytest.mark.parametrize("date_only", [False, True])
+@pytest.mark.parametrize("zone", ZONES)
+def test_normalize_matches_baseline(monkeypatch, zone, date_only):
+    monkeypatch.setenv("SCRAPER_TZ", zone)
+    expected = DATES["expected"][zone]["date" if date_only else "datetime"]
+    assert [normalize_datetime(v, date_only) for v in DATES["values"]] == expected
+
+@pytest.mark.parametrize("date_only", [False, True])
+@pytest.mark.parametrize("zone", ZONES)
+def test_series_matches_baseline(monkeypatch, zone, date_only):
+    pytest.importorskip("pandas")
+    monkeypatch.setenv("SCRAPER_TZ", zone)
+    expected = DATES["expected"][zone]["date" if date_only else "datetime"]
+    assert list(normalize_datetime_series(DATES["values"], date_only)) == expected
+
+def test_series_keeps_index_and_blanks_missing(monkeypatch):
+    pd = pytest.importorskip("pandas")
+    monkeypatch.setenv("SCRAPER_TZ", "UTC")
+    values = pd.Series(["2023-11-30 04:59:00", None, float("nan"), "garbage"], index=[10, 11, 12, 13])
+    result = normalize_datetime_series(values)
+    assert list(result.index) == [10, 11, 12, 13]
+    assert list(result) == ["2023-11-30 04:59", "", "", "garbage"]
+
+@pytest.fixture
+def berlin(monkeypatch):
+    monkeypatch.setenv("SCRAPER_TZ", "Europe/Berlin")
+
+def test_window_bounds_are_inclusive(berlin):
+    window = DateWindow.from_settings("2024-01-01 10:00", "2024-01-31 18:30")
+    assert window.record_position({"reelDateTime": "2024-01-01 10:00"}) == 0
+    assert window.record_position({"reelDateTime": "2024-01-01 09:59"}) == -1
+    assert window.record_position({"reelDateTime": "2024-01-31 18:30"}) == 0
+    assert window.record_position({"reelDateTime": "2024-01-31 18:31"}) == 1
+    # Naive bounds are in SCRAPER_TZ; values with an offset compare as instants
+    assert window.position("2024-01-01T09:00:00+00:00") == 0
+    assert window.position("2024-01-01T08:59:00+00:00") == -1
+
+def test_date_only_until_covers_the_whole_day(berlin):
+    window = DateWindow.from_settings("2024-01-01", "2024-01-31")
+    assert window.record_position({"reelDateTime": "2024-01-01 00:00"}) == 0
+    assert window.record_position({"reelDateTime": "2023-12-31 23:59"}) == -1
+    assert window.record_position({"reelDateTime": "2024-01-31 23:59"}) == 0
+    assert window.record_position({"reelDateTime": "2024-02-01 00:00"}) == 1
+
+def test_date_only_records_compare_by_whole_day(berlin):
+    window = DateWindow.from_settings("2024-01-15 12:00", "2024-01-20 08:00")
+    # A reel dated the 15th may have been published after noon
+    assert window.record_position({"reelDate": "2024-01-15"}) == 0
+    assert window.record_position({"reelDate": "2024-01-14"}) == -1
+    assert window.record_position({"reelDate": "2024-01-20"}) == 0
+    assert window.record_position({"reelDate": "2024-01-21"}) == 1
+    # The full date and time wins over the bare date
+    assert window.record_position({"reelDateTime": "2024-01-15 11:00", "reelDate": "2024-01-15"}) == -1
+
+@pytest.mark.parametrize("bound, age", [("7d", timedelta(days=7)), ("12h", timedelta(hours=12)), ("2w", timedelta(weeks=2)),
+                                        (" 1.5D ", timedelta(days=1.5))])
+def test_relative_bounds(bound, age):
+    before = datetime.now(timezone.utc)
+    window = DateWindow.from_settings(bound)
+    assert before - age <= window.since <= datetime.now(timezone.utc) - age
+    assert window.until is None
+    inside = (before - age + timedelta(minutes=1)).isoformat()
+    outside = (before - age - timedelta(minutes=1)).isoformat()
+    assert window.position(inside) == 0 and window.position(outside) == -1
+
+@pytest.mark.parametrize("value", ["last week", "7 days", "-7d", "2024-13-01", "2024/01/01x"])
+def test_malformed_bounds_are_rejected(value):
+    with pytest.raises(ValueError):
+        DateWindow.from_settings(value)
+    with pytest.raises(ValueError):
+        DateWindow.from_settings(None, value)
+
+def test_no_window_and_unparseable_values(berlin):
+    assert DateWindow.from_settings(None, None) is None and DateWindow.from_settings("", "") is None
+    window = DateWindow.from_settings("2024-01-01")
+    assert window.position(None) == 0 and window.position("yesterday") == 0
+    assert window.record_position({}) == 0 and window.record_position({"reelDate": "garbage"}) == 0
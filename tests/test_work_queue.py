@@ -0,0 +1,135 @@
+"""
+WorkQueue leasing, lease expiry, attempt limits, reel claims, run resets and merge order.
+"""
+import pytest
+
+from extractors import work_queue
+from extractors.frontier import reel_key
+from extractors.record import ReelRecord
+from extractors.work_queue import QueueFrontier, WorkQueue
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(work_queue, "time", clock)
+    return clock
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"), lease_sec=60, max_attempts=2)
+    queue.reset()
+    yield queue
+    queue.close()
+
+def _reel(n):
+    return f"https://www.facebook.com/reel/{n}/"
+
+def test_lease_complete_and_fail(queue):
+    assert queue.enqueue("page", "p1", {"url": "p1"})
+    assert not queue.enqueue("page", "p1", {"url": "other"})
+    queue.enqueue("page", "p2", {"url": "p2"})
+
+    first = queue.lease("w1")
+    second = queue.lease("w2")
+    assert (first.key, first.payload, first.attempts) == ("p1", {"url": "p1"}, 1)
+    assert second.key == "p2"
+    assert queue.lease("w3") is None
+    assert queue.counts() == {"queued": 0, "leased": 2, "done": 0, "failed": 0}
+
+    queue.complete(first, "w1")
+    queue.fail(second, "w2", "boom")
+    assert queue.counts() == {"queued": 1, "leased": 0, "done": 1, "failed": 0}
+    again = queue.lease("w3")
+    assert (again.key, again.attempts) == ("p2", 2)
+
+def test_complete_by_other_owner_is_ignored(queue):
+    queue.enqueue("page", "p1", {})
+    task = queue.lease("w1")
+    queue.complete(task, "w2")
+    assert queue.counts()["leased"] == 1
+    assert queue.extend(task, "w1") and not queue.extend(task, "w2")
+
+def test_expired_lease_is_leased_again(queue, clock):
+    queue.enqueue("page", "p1", {})
+    task = queue.lease("w1")
+    clock.now += 59
+    assert queue.lease("w2") is None
+    clock.now += 2
+    retry = queue.lease("w2")
+    assert (retry.id, retry.attempts) == (task.id, 2)
+    # The stalled worker's late completion no longer counts
+    queue.complete(task, "w1")
+    assert queue.counts()["leased"] == 1
+
+def test_failed_after_max_attempts(queue, clock):
+    queue.enqueue("page", "p1", {})
+    queue.fail(queue.lease("w1"), "w1", "first")
+    task = queue.lease("w1")
+    queue.fail(task, "w1", "second")
+    assert queue.counts() == {"queued": 0, "leased": 0, "done": 0, "failed": 1}
+
+    # A lease that expires on its last attempt is failed when it would be leased again
+    queue.enqueue("page", "p2", {})
+    queue.lease("w1")
+    clock.now += 61
+    queue.lease("w1")
+    clock.now += 61
+    assert queue.lease("w1") is None
+    assert queue.counts()["failed"] == 2
+    assert queue.drained()
+
+def test_claim_reels_dedupes_and_records_referrers(queue):
+    assert queue.claim_reels("pageA", [_reel(1), _reel(2), _reel(1)]) == [_reel(1), _reel(2)]
+    assert queue.claim_reels("pageB", [_reel(2), _reel(3), _reel(4)], limit=1, extra={"since": "7d"}) == [_reel(3)]
+    assert queue.referrers() == {
+        reel_key(_reel(1)): ["pageA"],
+        reel_key(_reel(2)): ["pageA", "pageB"],
+        reel_key(_reel(3)): ["pageB"],
+    }  # reel 4 was over the limit, so it was neither queued nor referred
+    assert queue.has_reel(reel_key(_reel(4))) is False
+    tasks = [queue.lease("w") for _ in range(3)]
+    assert [t.payload for t in tasks] == [
+        {"url": _reel(1), "page": "pageA"},
+        {"url": _reel(2), "page": "pageA"},
+        {"since": "7d", "url": _reel(3), "page": "pageB"},
+    ]
+
+def test_queue_frontier(queue):
+    frontier = QueueFrontier(queue, {"since": None})
+    assert frontier.claim("pageA", [_reel(1)]) == [_reel(1)]
+    assert reel_key(_reel(1)) in frontier
+    assert frontier.claim("pageB", [_reel(1), _reel(2)], limit=0) == []
+
+def test_records_in_queue_order(queue):
+    queue.claim_reels("pageA", [_reel(3), _reel(1), _reel(2)])
+    tasks = [queue.lease("w") for _ in range(3)]
+    # Completed out of order; merged in the order the reels were queued
+    for task in reversed(tasks):
+        queue.complete(task, "w", ReelRecord(reelId=task.key, url=task.payload["url"]))
+    assert [r.url for r in queue.records()] == [_reel(3), _reel(1), _reel(2)]
+
+def test_reset_drops_previous_run(queue, tmp_path):
+    first_run = queue.run_id()
+    queue.claim_reels("pageA", [_reel(1)])
+    task = queue.lease("w")
+    queue.complete(task, "w", ReelRecord(reelId=task.key, url=_reel(1)))
+    queue.seal()
+    assert queue.sealed() and list(queue.records())
+
+    reopened = WorkQueue(queue.path)
+    assert reopened.run_id() == first_run
+    assert [r.url for r in reopened.records()] == [_reel(1)]
+    second_run = reopened.reset()
+    assert second_run != first_run and reopened.run_id() == second_run
+    assert not reopened.sealed()
+    assert list(reopened.records()) == [] and reopened.referrers() == {}
+    assert reopened.counts() == {"queued": 0, "leased": 0, "done": 0, "failed": 0}
+    assert reopened.claim_reels("pageA", [_reel(1)]) == [_reel(1)]
+    reopened.close()